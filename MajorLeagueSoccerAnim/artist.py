@@ -1,9 +1,20 @@
 import pygame
-import random
+import numpy as np
 import math
+import random
 
 # File Imports
 from colors import Color
+from dirty_rects import DirtyRects
+from entity_store import CloudStore, StarStore
+from profiler import FrameProfiler
+from goal_geometry import (
+    GOAL_RECT,
+    GOAL_BORDER_WIDTH,
+    GOAL_BOTTOM_LINES,
+    GOAL_STAND_LINES,
+    NET_LINES
+)
 
 class Artist:
     """
@@ -11,20 +22,124 @@ class Artist:
     
     Attributes
     ----------
-    clouds : list[list[int, int]]
-        A list of [x, y] coordinates for all the clouds that should be drawn
-    stars : list[list[int, int, int, int]]
-        A list of [x, y, r, r] coordinates for all the stars that should be drawn
+    rng : numpy.random.Generator
+        The random generator used to place clouds and stars (seeding it makes
+        every run produce the same frames)
+    clouds : CloudStore
+        An array-backed store of the [x, y] coordinates of every cloud
+    stars : StarStore
+        An array-backed store of the [x, y, size] values of every star
+    dirty_rects : DirtyRects
+        Tracks the regions of the screen that changed since the last update
+    cloud_rects : list[pygame.Rect]
+        The rects the clouds covered the last time they were drawn
+    sun_state : tuple
+        The (is_day, sky_color) the sun or moon was last drawn with
+    cloud_sprites : dict[tuple, pygame.Surface]
+        Pre-rendered cloud sprites, keyed by the cloud's color (at most
+        CLOUD_SPRITE_LIMIT of them, the oldest dropped first)
+    darkness_lut : numpy.ndarray
+        A (3, 256) table of what every R, G and B value turns into under the
+        darkness overlay (None until create_darkness_lut is called)
+    profiler : FrameProfiler
+        Times each draw_x function called by draw_field (as
+        field_rebuild.draw_x stages)
     """
 
-    def __init__(self):
-        """Initializes the cloud and star list for visualization later"""
+    # The regions covered by the bulbs on the left and right light poles
+    LIGHT_RECTS = [
+        pygame.Rect(110, 18, 102, 44),
+        pygame.Rect(590, 18, 102, 44)
+    ]
+    # The left end of each light pole's separators, and the top left corner
+    # of every bulb on it, row by row from the bottom
+    LIGHT_POLES = [
+        (
+            pole_left,
+            [
+                [(pole_left + 20*bulb, 40 - 20*row) for bulb in range(5)]
+                for row in range(2)
+            ]
+        )
+        for pole_left in (110, 590)
+    ]
+    # The width and height of a light bulb
+    BULB_SIZE = 20
+    # The region covered by the sun or the moon
+    SUN_RECT = pygame.Rect(520, 45, 50, 45)
+    # The size of a single cloud
+    CLOUD_SIZE = (30, 18)
+    # How far clouds move to the left every simulation step
+    CLOUD_SPEED = 0.5
+    # How many cloud sprites are kept (a day/night fade passes through a new
+    # cloud color every step)
+    CLOUD_SPRITE_LIMIT = 4
+    # The (color, points) of every polygon of the stands, in drawing order
+    STANDS = [
+        (Color.RED, [[680, 220], [800, 340], [800, 290], [680, 180]]), # Right Bottom
+        (Color.WHITE, [[680, 180], [800, 100], [800, 290]]), # Right Top
+        (Color.RED, [[120, 220], [0, 340], [0, 290], [120, 180]]), # Left Bottom
+        (Color.WHITE, [[120, 180], [0, 100], [0, 290]]) # Left Top
+    ]
+
+    def __init__(
+            self,
+            seed: int | random.Random | np.random.Generator = None):
+        """
+        Initializes the cloud and star stores for visualization later
+
+        Parameters
+        ----------
+        seed : int | random.Random | numpy.random.Generator
+            The seed or random generator that places clouds and stars
+            (default None, which picks a different sky every run)
+        """
+        self.rng: np.random.Generator = self.create_rng(seed)
+
         self.init_clouds()
         self.init_stars()
+
+        # Keep track of what changed between frames
+        self.dirty_rects: DirtyRects = DirtyRects()
+        self.cloud_rects: list[pygame.Rect] = []
+        self.sun_state: tuple = None
+
+        # Clouds are rendered once per color and then simply blitted
+        self.cloud_sprites: dict[tuple, pygame.Surface] = {}
+
+        # Filled in from the darkness surface once the display exists
+        self.darkness_lut: np.ndarray = None
+
+        # Disabled until a handler shares its own profiler
+        self.profiler: FrameProfiler = FrameProfiler()
     
+    @staticmethod
+    def create_rng(
+            seed: int | random.Random | np.random.Generator = None) -> np.random.Generator:
+        """
+        Creates the NumPy random generator used for clouds and stars
+
+        Parameters
+        ----------
+        seed : int | random.Random | numpy.random.Generator
+            An int seed, a random.Random instance to draw a seed from, or a
+            Generator to use as-is (default None, for a random seed)
+
+        Returns
+        -------
+        rng : numpy.random.Generator
+            The generator to place clouds and stars with
+        """
+        if isinstance(seed, np.random.Generator):
+            return seed
+        # A random.Random instance decides the seed
+        if isinstance(seed, random.Random):
+            seed = seed.getrandbits(128)
+        return np.random.default_rng(seed)
+
     def init_clouds(self, cloud_count: int = 20) -> None:
         """
-        Creates a list of 20 random [x,y] coordinates for cloud positions
+        Creates a store of 20 random [x,y] coordinates for cloud positions
         
         Parameters
         ----------
@@ -32,18 +147,14 @@ class Artist:
             The number of clouds to create (default 20)
         """
         
-        # List comprehension to create a list of [rand number x, rand number y]
+        # The store fills every position in bulk
         # x is from -100 to 1600
         # y is from 0 to 150
-        # We do this 20 times
-        self.clouds = [
-            [random.randrange(-100, 1600), random.randrange(0, 150)]
-            for _ in range(cloud_count)
-            ]
+        self.clouds: CloudStore = CloudStore(cloud_count, self.rng)
     
     def init_stars(self, star_count:int = 200, max_star_size:int = 2) -> None:
         """
-        Creates a list of 200 random [x,y,size] coordinates for stars
+        Creates a store of 200 random [x,y,size] coordinates for stars
         
         Parameters
         ----------
@@ -53,63 +164,119 @@ class Artist:
             The maximum size for stars
         """
         
-        # List comprehension to create a list of [rand x, rand y, rand r, r]
-        # These values will be used to create an elipse, so it needs an extra 'rect' variable 
+        # The store fills every star in bulk
         # x is from 0 to 800
         # y is from 0 to 200
-        # r is either 1 or 2
-        # The last item of the list is a repeat of r
-        # We do this 200 times
-        self.stars = [
-            [
-                random.randrange(0, 800), 
-                random.randrange(0, 200),
-                r:=random.randrange(1, max_star_size),
-                r
-            ]
-            for _ in range(star_count)
-        ]
+        # size is from 1 up to max_star_size
+        self.stars: StarStore = StarStore(star_count, max_star_size, self.rng)
 
     def config_darkness(self, darkness: pygame.Surface) -> None:
         """Initializes the darkness surface"""
         darkness.set_alpha(200)
         darkness.fill(Color.BLACK)
     
+    def create_darkness_lut(self, darkness: pygame.Surface) -> None:
+        """
+        Records what the darkness overlay does to every channel value
+
+        The overlay is blitted once over a ramp of every value from 0 to 255,
+        so darkening with the table gives exactly the pixels the full-screen
+        alpha blit would, without blending anything per frame
+
+        Parameters
+        ----------
+        darkness : pygame.Surface
+            The surface that visually darkens the original surface
+        """
+        ramp = pygame.Surface((256, 1)).convert()
+        pixels = pygame.surfarray.pixels3d(ramp)
+        pixels[:, 0] = np.arange(256)[:, np.newaxis]
+        del pixels # Unlock the surface
+
+        ramp.blit(darkness, (0, 0))
+        self.darkness_lut = pygame.surfarray.array3d(ramp)[:, 0].T.copy()
+
+    def darken_color(self, color: tuple) -> tuple:
+        """
+        Returns a color as it looks under the darkness overlay
+
+        Parameters
+        ----------
+        color : tuple
+            A tuple representing the (R, G, B) values of the color
+
+        Returns
+        -------
+        color : tuple
+            A tuple representing the (R, G, B) values of the darkened color
+        """
+        return tuple(
+            int(self.darkness_lut[channel][value])
+            for channel, value in enumerate(color[:3])
+        )
+
+    def darken_surface(
+            self,
+            surface: pygame.Surface,
+            keep: tuple = None) -> None:
+        """
+        Darkens every pixel of a surface in place, as the overlay would
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to darken
+        keep : tuple
+            A color whose pixels are left alone, such as the colorkey
+            (default None, darkening everything)
+        """
+        pixels = pygame.surfarray.pixels3d(surface)
+        if keep is not None:
+            kept = (pixels == keep).all(axis=2)
+
+        for channel in range(3):
+            plane = pixels[..., channel]
+            plane[...] = self.darkness_lut[channel][plane]
+
+        if keep is not None:
+            pixels[kept] = keep
+        del pixels # Unlock the surface
+
     def config_see_through(self, see_through: pygame.Surface) -> None:
         """Initializes the see_through surface"""
         see_through.set_alpha(150)
         see_through.fill(Color.COLOR_KEY)
         see_through.set_colorkey(Color.COLOR_KEY)
 
-    def move_clouds(self, cloud_speed: float = 0.5) -> None:
+    def move_clouds(self, cloud_speed: float = CLOUD_SPEED) -> None:
         """
         Moves each cloud to the left 0.5 units.
+
+        This is called once per fixed simulation step, so clouds move at the
+        same speed no matter how many frames are drawn
         
         Parameters
         ----------
         cloud_speed : float
-            How many units to move clouds each tick
+            How many units to move clouds each step
         """
 
-        # Loop through each cloud in self.clouds and move it to the left 0.5 units
-        for cloud in self.clouds:
-            cloud[0] -= cloud_speed
-
-            # If we reach the edge of the screen, re-randomize its position
-            if cloud[0] < -100:
-                cloud[0] = random.randrange(800, 1600)
-                cloud[1] = random.randrange(0, 150)
+        # Move every cloud to the left at once
+        # Clouds that reach the edge of the screen get re-randomized positions
+        self.clouds.move(cloud_speed)
     
     def draw_clouds(
             self, 
             surface: pygame.Surface, 
             see_through: pygame.Surface, 
-            cloud_color: tuple) -> None:
+            cloud_color: tuple,
+            x_offset: float = 0.0) -> None:
         """
-        Draws every cloud in the cloud list
+        Draws every cloud that overlaps the see_through surface
         
-        Simply uses the draw_single_cloud method to draw each cloud, then places
-        the see_through surface on the main screen
+        Every cloud is the same pre-rendered sprite, so all of them are drawn
+        in a single Surface.blits batch, then the see_through surface is placed
+        on the main screen
 
         Parameters
         ----------
@@ -119,21 +286,90 @@ class Artist:
             The see_through surface to draw clouds onto
         cloud_color : tuple
             A tuple representing the (R,G,B) values of the cloud's color
+        x_offset : float
+            How far to shift the clouds from their simulated positions, used to
+            extrapolate motion between simulation steps (default 0.0)
         """
 
-        # Loop through each cloud in self.clouds and draw it 
-        # using self.draw_single_cloud(...)
+        # Blit the cloud sprite at every cloud's position in one batch
         # We draw the clouds onto the see_through surface
-        for cloud in self.clouds:
-            self.draw_single_cloud(
-                see_through, 
-                cloud[0], 
-                cloud[1], 
-                cloud_color
-            )
+        # Only the clouds overlapping the see_through surface are visited
+        sprite = self.get_cloud_sprite(cloud_color)
+        positions = self.clouds.positions(
+            x_offset,
+            (-self.CLOUD_SIZE[0], see_through.get_width())
+        )
+        see_through.blits(
+            [(sprite, position) for position in positions],
+            False
+        )
         
         # Place the see_through surface on top of the screen
         surface.blit(see_through, (0, 0))
+
+        self.report_clouds(see_through, positions)
+
+    def report_clouds(
+            self,
+            see_through: pygame.Surface,
+            positions: list[tuple]) -> None:
+        """
+        Reports the regions the clouds changed since they were last drawn
+
+        Parameters
+        ----------
+        see_through : pygame.Surface
+            The see_through surface the clouds were drawn onto
+        positions : list[tuple]
+            The (x, y) positions the clouds were drawn at
+        """
+        # With lots of clouds, the whole cloud band is one cheaper update.
+        # It's also where the clouds were, should there be fewer next time
+        if len(positions) > self.dirty_rects.max_rects:
+            self.cloud_rects = [see_through.get_rect()]
+            self.dirty_rects.add(self.cloud_rects[0])
+            return
+
+        # Pad by a pixel since fractional positions get truncated
+        width, height = self.CLOUD_SIZE
+        cloud_rects = [
+            pygame.Rect(x - 1, y, width + 2, height)
+            for x, y in positions
+        ]
+
+        # Both where the clouds were and where they are now changed
+        self.dirty_rects.add_all(self.cloud_rects)
+        self.dirty_rects.add_all(cloud_rects)
+        self.cloud_rects = cloud_rects
+
+    def get_cloud_sprite(self, cloud_color: tuple) -> pygame.Surface:
+        """
+        Returns the pre-rendered cloud sprite for a color, creating it if needed
+
+        Parameters
+        ----------
+        cloud_color : tuple
+            A tuple representing the (R, G, B) values of the cloud's color
+
+        Returns
+        -------
+        sprite : pygame.Surface
+            A colorkeyed surface holding a single cloud
+        """
+        sprite = self.cloud_sprites.get(cloud_color)
+        if sprite is None:
+            # Draw the cloud once using the primitives in draw_single_cloud
+            sprite = pygame.Surface(self.CLOUD_SIZE).convert()
+            sprite.fill(Color.COLOR_KEY)
+            self.draw_single_cloud(sprite, 0, 0, cloud_color)
+            sprite.set_colorkey(Color.COLOR_KEY, pygame.RLEACCEL)
+
+            # Forget the oldest color (dicts keep their insertion order)
+            if len(self.cloud_sprites) >= self.CLOUD_SPRITE_LIMIT:
+                del self.cloud_sprites[next(iter(self.cloud_sprites))]
+            self.cloud_sprites[cloud_color] = sprite
+
+        return sprite
     
     def draw_single_cloud(
             self, 
@@ -183,7 +419,10 @@ class Artist:
             [x + 6, y + 8, 18, 10]
         )
     
-    def draw_stars(self, surface: pygame.Surface) -> None:
+    def draw_stars(
+            self, 
+            surface: pygame.Surface, 
+            star_color = Color.WHITE) -> None:
         """
         Draws every star in the stars list
         
@@ -191,14 +430,31 @@ class Artist:
         ----------
         surface : pygame.Surface
             The surface to draw the stars onto
+        star_color : tuple | int
+            A tuple representing the (R, G, B) values of the stars' color, or
+            an already mapped pixel value such as a palette index
+            (default Color.WHITE)
         """
 
-        # Loop through each star in self.stars and draw an ellipse at the location
-        for star in self.stars:
+        stars = self.stars.data
+        single = stars['size'] == 1
+
+        if isinstance(star_color, int):
+            star_pixel = star_color
+        else:
+            star_pixel = surface.map_rgb(star_color)
+
+        # Stars of size 1 are single pixels, so write all of them at once
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[stars['x'][single], stars['y'][single]] = star_pixel
+        del pixels # Unlock the surface
+
+        # Loop through every larger star and draw an ellipse at the location
+        for x, y, size in stars[~single].tolist():
             pygame.draw.ellipse(
                 surface, 
-                Color.WHITE, 
-                star
+                star_color, 
+                [x, y, size, size]
             )
 
     def draw_fence(self, surface: pygame.Surface) -> None:
@@ -285,6 +541,11 @@ class Artist:
                 [530, 45, 40, 40]
             ) # The moon cutout, for the crescendo shape
 
+        # Only report the sun or moon if it looks different from last time
+        if self.sun_state != (is_day, sky_color):
+            self.sun_state = (is_day, sky_color)
+            self.dirty_rects.add(self.SUN_RECT)
+
     def check_darkness(
             self, 
             is_day: bool, 
@@ -517,52 +778,19 @@ class Artist:
         pygame.draw.rect(
             surface, 
             Color.WHITE, 
-            [320, 140, 
-            160, 80], 
-            5
-        )
-
-        # Goal Bottom Center
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [340, 200], 
-            [460, 200], 
-            3
-        )
-        # Goal Bottom Left
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [320, 220], 
-            [340, 200], 
-            3
-        )
-        # Goal Bottom Right
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [480, 220], 
-            [460, 200], 
-            3
+            GOAL_RECT, 
+            GOAL_BORDER_WIDTH
         )
 
-        # Goal Stand Left
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [320, 140], 
-            [340, 200], 
-            3
-        )
-        # Goal Stand Right
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [480, 140], 
-            [460, 200], 
-            3
-        )
+        # Goal Bottom (Center, Left and Right) and Goal Stands (Left and Right)
+        for start, end, width in GOAL_BOTTOM_LINES + GOAL_STAND_LINES:
+            pygame.draw.line(
+                surface, 
+                Color.WHITE, 
+                start, 
+                end, 
+                width
+            )
 
     def draw_inner_goal_box(self, surface: pygame.Surface) -> None:
         """
@@ -651,61 +879,31 @@ class Artist:
         light_color : tuple
             A tuple representing the (R, G, B) values of the color of the light
         """
-        # Left Pole
-        light_pos1 = 0
-        # Draw the two separator lines on the pole
-        for i in range(1,3):
-            pygame.draw.line(
-                surface, 
-                Color.GRAY, 
-                [110, 80 - 20*i], 
-                [210, 80 - 20*i], 
-                2
-            )
-            # For each separator, draw 6 light bulbs
-            for i in range(1,6):
-                pygame.draw.ellipse(
+        for left, rows in self.LIGHT_POLES:
+            # Draw the separator line under each row of bulbs
+            for row, bulbs in enumerate(rows):
+                pygame.draw.line(
                     surface, 
-                    light_color, 
-                    [90 + 20*i, 40 - light_pos1, 20, 20]
+                    Color.GRAY, 
+                    [left, 60 - 20*row], 
+                    [left + 100, 60 - 20*row], 
+                    2
                 )
-            light_pos1 += 20
-        # Draw the left pole's top border
-        pygame.draw.line(
-            surface, 
-            Color.GRAY, 
-            [110, 20], 
-            [210, 20], 
-            2
-        )
-
-        # Right Pole
-        light_pos2 = 0
-        # Draw the two separator lines on the pole
-        for i in range(1,3):
+                # Draw the row's light bulbs
+                for bulb_left, bulb_top in bulbs:
+                    pygame.draw.ellipse(
+                        surface, 
+                        light_color, 
+                        [bulb_left, bulb_top, self.BULB_SIZE, self.BULB_SIZE]
+                    )
+            # Draw the pole's top border
             pygame.draw.line(
                 surface, 
                 Color.GRAY, 
-                [590, 80 - 20*i], 
-                [690, 80 - 20*i], 
+                [left, 20], 
+                [left + 100, 20], 
                 2
             )
-            # For each separator, draw 6 light bulbs
-            for i in range(1,6):
-                pygame.draw.ellipse(
-                    surface, 
-                    light_color, 
-                    [570 + 20*i, 40 - light_pos2, 20, 20]
-                    )
-            light_pos2 += 20
-        # Draw the right pole's top border
-        pygame.draw.line(
-            surface, 
-            Color.GRAY, 
-            [590, 20], 
-            [690, 20], 
-            2
-        )
 
     def draw_net(self, surface: pygame.Surface) -> None:
         """
@@ -716,125 +914,15 @@ class Artist:
         surface : pygame.Surface
             The surface to draw the grass onto
         """
-        
-        # DOWN
-        # CENTER
-        # Left
-        for i in range(1, 9):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [320 + 5*i, 140], 
-                [338 + 3*i, 200], 
-                1
-            )
-        # MidLeft
-        for i in range(1, 5):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [360 + 4*i, 140], 
-                [361 + 4*i, 200], 
-                1
-            )
-
-        # Mid
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [380, 140], 
-            [380, 200], 
-            1
-        )
-        for i in range(1, 11):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [380 + 4*i, 140], 
-                [380 + 4*i, 200], 
-                1
-            )
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [424, 140], 
-            [423, 200], 
-            1
-        )
 
-        # MidRight
-        for i in range(1, 4):
+        # Every strand of the net (see goal_geometry.NET_LINES)
+        for start, end, width in NET_LINES:
             pygame.draw.line(
                 surface, 
                 Color.WHITE, 
-                [424 + 4*i, 140], 
-                [423 + 4*i, 200], 
-                1
-            )
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [440, 140], 
-            [438, 200], 
-            1
-        )
-        # Right
-        for i in range(1, 8):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [440 + 5*i, 140], 
-                [438 + 3*i, 200], 
-                1
-            )
-
-        # LEFT
-        for i in range(1, 9):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [320, 140], 
-                [322 + i*2, 218 - i*2], 
-                1
-            )
-
-        # RIGHT
-        for i in range(1, 9):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [480, 140], 
-                [478 - i*2, 218 - i*2], 
-                1
-            )
-
-        # ACROSS
-        # TOP
-        for i in range(1, 10):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [324, 140 + i*4], 
-                [476, 140 + i*4], 
-                1
-            )
-        
-        # MIDDLE
-        pygame.draw.line(
-            surface, 
-            Color.WHITE, 
-            [335, 180], 
-            [470, 180], 
-            1
-        )
-
-        # BOTTOM
-        for i in range(1, 5):
-            pygame.draw.line(
-                surface, 
-                Color.WHITE, 
-                [335, 180 + i*4], 
-                [465, 180 + i*4]
+                start, 
+                end, 
+                width
             )
 
     def draw_stands(self, surface: pygame.Surface) -> None:
@@ -846,51 +934,8 @@ class Artist:
         surface : pygame.Surface
             The surface to draw the grass onto
         """
-        # RIGHT
-        # Bottom
-        pygame.draw.polygon(
-            surface, 
-            Color.RED, 
-            [
-                [680, 220], 
-                [800, 340], 
-                [800, 290], 
-                [680, 180]
-            ]
-        )
-        # Top
-        pygame.draw.polygon(
-            surface, 
-            Color.WHITE, 
-            [
-                [680, 180], 
-                [800, 100], 
-                [800, 290]
-            ]
-        )
-
-        # LEFT
-        # Bottom
-        pygame.draw.polygon(
-            surface, 
-            Color.RED, 
-            [
-                [120, 220], 
-                [0, 340], 
-                [0, 290], 
-                [120, 180]
-            ]
-        )
-        # Top
-        pygame.draw.polygon(
-            surface, 
-            Color.WHITE, 
-            [
-                [120, 180], 
-                [0, 100], 
-                [0, 290]
-            ]
-        )
+        for color, points in self.STANDS:
+            pygame.draw.polygon(surface, color, points)
 
     def draw_corner_flags(self, surface: pygame.Surface) -> None:
         """
@@ -965,37 +1010,73 @@ class Artist:
         light_color : tuple
             A tuple representing the (R, G, B) values of the light's color
         """
+        # Each part is timed by the profiler (which is free when disabled).
+        # The field is only drawn when a cached layer is rebuilt, so the
+        # stages are named after the rebuild rather than the frame
+        timed = self.timed
+
         # Draw the grass
-        self.draw_grass(surface, field_color, stripe_color)
+        timed(
+            'field_rebuild.draw_grass',
+            self.draw_grass,
+            surface,
+            field_color,
+            stripe_color
+        )
 
         # Draw the back fence
-        self.draw_fence(surface)
+        timed('field_rebuild.draw_fence', self.draw_fence, surface)
 
         # Draw field markings
-        self.draw_out_of_bounds(surface)
-        self.draw_safety_circle(surface)
-        self.draw_outer_goal_box(surface)
-        self.draw_inner_goal_box(surface)
-        self.draw_arc(surface)
+        timed('field_rebuild.draw_out_of_bounds', self.draw_out_of_bounds, surface)
+        timed('field_rebuild.draw_safety_circle', self.draw_safety_circle, surface)
+        timed('field_rebuild.draw_outer_goal_box', self.draw_outer_goal_box, surface)
+        timed('field_rebuild.draw_inner_goal_box', self.draw_inner_goal_box, surface)
+        timed('field_rebuild.draw_arc', self.draw_arc, surface)
 
         # Draw the scoreboard
-        self.draw_scoreboard(surface)
+        timed('field_rebuild.draw_scoreboard', self.draw_scoreboard, surface)
 
         # Draw the goal frame
-        self.draw_goal(surface)
+        timed('field_rebuild.draw_goal', self.draw_goal, surface)
         # Draw the nets
-        self.draw_net(surface)
+        timed('field_rebuild.draw_net', self.draw_net, surface)
 
         # Draw the light poles and lights
-        self.draw_light_poles(surface)
-        self.draw_lights(surface, light_color)
+        timed('field_rebuild.draw_light_poles', self.draw_light_poles, surface)
+        timed('field_rebuild.draw_lights', self.draw_lights, surface, light_color)
 
         # Draw the audience stands
-        self.draw_stands(surface)
+        timed('field_rebuild.draw_stands', self.draw_stands, surface)
 
         # Draw the corner flags
-        self.draw_corner_flags(surface)
+        timed('field_rebuild.draw_corner_flags', self.draw_corner_flags, surface)
+
+    def timed(self, stage: str, draw_function, *args) -> None:
+        """
+        Calls a draw function, timing it with the profiler
+
+        Parameters
+        ----------
+        stage : str
+            The name the profiler records the time under
+        draw_function : callable
+            The function to call
+        *args
+            The arguments to pass to the function
+        """
+        start = self.profiler.start()
+        draw_function(*args)
+        self.profiler.stop(stage, start)
+
+    def report_lights(self) -> None:
+        """Reports the light bulbs as changed after the lights were toggled"""
+        self.dirty_rects.add_all(self.LIGHT_RECTS)
     
     def update_screen(self) -> None:
-        """Updates the pygame screen by simply calling display.flip()"""
-        pygame.display.flip()
+        """
+        Updates the pygame screen by presenting only the regions that changed
+
+        Falls back to display.flip() when a full repaint was requested
+        """
+        self.dirty_rects.present()
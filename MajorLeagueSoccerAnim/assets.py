@@ -0,0 +1,233 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pygame
+
+class AssetManager:
+    """
+    Loads the image assets once and packs them into a single texture atlas.
+
+    Nothing is read from disk until a sprite is first asked for, so creating
+    the manager costs nothing at startup. The first request decodes every
+    image, converts it to the display format and packs it into one atlas with
+    a simple shelf packer. Sprites are then sub-surfaces of the atlas, so many
+    of them can be drawn from the same source surface in a single `blits`
+    call. Scaled and rotated variants are cached in a bounded LRU.
+
+    Decoding can also be started early on a background thread with preload().
+    Converting needs the display, so it always happens on the main thread
+    once the atlas is built.
+
+    Attributes
+    ----------
+    directory : str
+        The directory the image files are read from
+    cache_size : int
+        The most scaled or rotated variants kept at once
+    images : dict[str, pygame.Surface]
+        The decoded (but not yet converted) images, by name
+    atlas : pygame.Surface
+        The surface every sprite is packed into (None until it's first needed)
+    regions : dict[str, pygame.Rect]
+        Where every sprite is in the atlas
+    sprites : dict[str, pygame.Surface]
+        The sub-surface of the atlas for every sprite
+    variants : collections.OrderedDict
+        The scaled and rotated variants, least recently used first
+    preload_thread : threading.Thread
+        The thread decoding the images in the background (if any)
+    lock : threading.Lock
+        Guards the decoded images shared with the preload thread
+    """
+
+    # The file of every image, by the name it's requested with
+    FILES = {
+        'goalie': 'goalie.png',
+        'ball': 'soccer_ball.png'
+    }
+    # The width of the atlas (sprites wider than this widen it)
+    ATLAS_WIDTH = 256
+
+    def __init__(self, directory: str = None, cache_size: int = 64):
+        """
+        Creates an empty manager without loading anything
+
+        Parameters
+        ----------
+        directory : str
+            The directory the image files are read from
+            (default the directory this file is in)
+        cache_size : int
+            The most scaled or rotated variants kept at once (default 64)
+        """
+        self.directory: str = directory or os.path.dirname(
+                                                    os.path.abspath(__file__)
+                                                )
+        self.cache_size: int = cache_size
+
+        self.images: dict[str, pygame.Surface] = {}
+        self.atlas: pygame.Surface = None
+        self.regions: dict[str, pygame.Rect] = {}
+        self.sprites: dict[str, pygame.Surface] = {}
+        self.variants: OrderedDict = OrderedDict()
+
+        self.preload_thread: threading.Thread = None
+        self.lock: threading.Lock = threading.Lock()
+
+    def preload(self) -> None:
+        """Starts decoding every image on a background thread"""
+        if self.preload_thread is not None or self.atlas is not None:
+            return
+
+        self.preload_thread = threading.Thread(target=self.load_all, daemon=True)
+        self.preload_thread.start()
+
+    def load_all(self) -> None:
+        """Decodes every image that hasn't been decoded yet"""
+        for name, file_name in self.FILES.items():
+            with self.lock:
+                if name in self.images:
+                    continue
+
+            # Decoding doesn't need the lock (or the display)
+            image = pygame.image.load(os.path.join(self.directory, file_name))
+            with self.lock:
+                self.images.setdefault(name, image)
+
+    def build_atlas(self) -> None:
+        """
+        Converts every image and packs them into the atlas
+
+        Images are placed on shelves, tallest first, left to right, and a new
+        shelf is started whenever the current one is full
+        """
+        # Wait for a running preload, then decode whatever is still missing
+        if self.preload_thread is not None:
+            self.preload_thread.join()
+            self.preload_thread = None
+        self.load_all()
+
+        images = {
+            name: image.convert_alpha() for name, image in self.images.items()
+        }
+        width = max(
+            [self.ATLAS_WIDTH] + [image.get_width() for image in images.values()]
+        )
+
+        # Shelf packing
+        x = y = shelf_height = 0
+        for name in sorted(images, key=lambda name: -images[name].get_height()):
+            image_width, image_height = images[name].get_size()
+            if x + image_width > width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+
+            self.regions[name] = pygame.Rect(x, y, image_width, image_height)
+            x += image_width
+            shelf_height = max(shelf_height, image_height)
+
+        self.atlas = pygame.Surface(
+                                        (width, y + shelf_height),
+                                        pygame.SRCALPHA
+                                    ).convert_alpha()
+        self.atlas.fill((0, 0, 0, 0))
+
+        # Copy the pixels and their alpha as they are instead of blending them
+        for name, rect in self.regions.items():
+            self.atlas.blit(images[name], rect, special_flags=pygame.BLEND_RGBA_MAX)
+            self.sprites[name] = self.atlas.subsurface(rect)
+
+        # The decoded copies are no longer needed
+        self.images.clear()
+
+    def get(
+            self,
+            name: str,
+            size: tuple = None,
+            angle: float = 0) -> pygame.Surface:
+        """
+        Returns a sprite, optionally scaled and rotated
+
+        Parameters
+        ----------
+        name : str
+            The name of the sprite (a key of FILES)
+        size : tuple
+            The (width, height) to scale the sprite to (default None, for
+            its own size)
+        angle : float
+            How many degrees to rotate the sprite counterclockwise (default 0).
+            Quantize angles (e.g. to whole degrees) so variants get reused
+
+        Returns
+        -------
+        sprite : pygame.Surface
+            A sub-surface of the atlas, or a cached variant of it
+        """
+        if self.atlas is None:
+            self.build_atlas()
+
+        sprite = self.sprites[name]
+        if (size is None or size == sprite.get_size()) and angle % 360 == 0:
+            return sprite
+
+        key = (name, size, angle % 360)
+        variant = self.variants.get(key)
+        if variant is not None:
+            self.variants.move_to_end(key)
+            return variant
+
+        variant = sprite
+        if size is not None:
+            variant = pygame.transform.smoothscale(variant, size)
+        if angle % 360:
+            variant = pygame.transform.rotate(variant, angle)
+
+        # Forget the least recently used variant once the cache is full
+        self.variants[key] = variant
+        if len(self.variants) > self.cache_size:
+            self.variants.popitem(last=False)
+
+        return variant
+
+    def region(self, name: str) -> pygame.Rect:
+        """
+        Returns where a sprite is within the atlas
+
+        Parameters
+        ----------
+        name : str
+            The name of the sprite (a key of FILES)
+
+        Returns
+        -------
+        rect : pygame.Rect
+            The sprite's area of the atlas
+        """
+        if self.atlas is None:
+            self.build_atlas()
+        return self.regions[name]
+
+    def blit_sequence(self, name: str, positions: list[tuple]) -> list[tuple]:
+        """
+        Builds the blits sequence drawing a sprite at many positions
+
+        Every entry uses the atlas as its source, so sprites of different
+        kinds can be drawn together in a single Surface.blits call
+
+        Parameters
+        ----------
+        name : str
+            The name of the sprite (a key of FILES)
+        positions : list[tuple]
+            The (x, y) positions to draw the sprite at
+
+        Returns
+        -------
+        sequence : list[tuple]
+            (atlas, position, area) tuples to hand to Surface.blits
+        """
+        area = self.region(name)
+        return [(self.atlas, position, area) for position in positions]
@@ -0,0 +1,754 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+# File Imports
+from config import Config
+from entity_store import CloudStore, StarStore
+from headless import HeadlessRenderer
+from artist import Artist
+from players import PlayerField
+from particles import ParticleSystem
+
+def time_call(function, repeat: int) -> float:
+    """
+    Times a function and returns its best average time per call
+
+    Parameters
+    ----------
+    function : callable
+        The function to time (it takes no arguments)
+    repeat : int
+        How many times to call the function per measurement
+
+    Returns
+    -------
+    seconds : float
+        The best average time of a single call, in seconds
+    """
+    best = float('inf')
+    # Take the best of a few rounds to filter out noise
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+def list_init_clouds(cloud_count: int) -> list:
+    """The original list-based cloud initialization, kept for comparison"""
+    return [
+        [random.randrange(-100, 1600), random.randrange(0, 150)]
+        for _ in range(cloud_count)
+    ]
+
+def list_move_clouds(clouds: list, cloud_speed: float = 0.5) -> None:
+    """The original list-based cloud movement, kept for comparison"""
+    for cloud in clouds:
+        cloud[0] -= cloud_speed
+        if cloud[0] < -100:
+            cloud[0] = random.randrange(800, 1600)
+            cloud[1] = random.randrange(0, 150)
+
+def bench_clouds(counts: list[int], repeat: int, seed: int = 0) -> list[dict]:
+    """
+    Compares the list-based and array-backed cloud simulations
+
+    Parameters
+    ----------
+    counts : list[int]
+        The cloud counts to measure
+    repeat : int
+        How many simulation steps to time per measurement
+    seed : int
+        The seed both versions place their clouds with (default 0)
+
+    Returns
+    -------
+    results : list[dict]
+        One entry per cloud count with the time per step of both versions
+    """
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    results = []
+    for count in counts:
+        clouds = list_init_clouds(count)
+        store = CloudStore(count, rng)
+        results.append({
+            'count': count,
+            'list': time_call(lambda: list_move_clouds(clouds), repeat),
+            'numpy': time_call(lambda: store.move(0.5), repeat)
+        })
+    return results
+
+def bench_stars(counts: list[int], seed: int = 0) -> list[dict]:
+    """
+    Measures how long the array-backed star store takes to fill
+
+    Parameters
+    ----------
+    counts : list[int]
+        The star counts to measure
+    seed : int
+        The seed the stars are placed with (default 0)
+
+    Returns
+    -------
+    results : list[dict]
+        One entry per star count with the time to create the store
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'count': count,
+            'numpy': time_call(lambda: StarStore(count, 2, rng), 1)
+        }
+        for count in counts
+    ]
+
+def find_crossover(results: list[dict]) -> int:
+    """
+    Finds the smallest count at which the array-backed version is faster
+
+    Parameters
+    ----------
+    results : list[dict]
+        The results of bench_clouds
+
+    Returns
+    -------
+    count : int
+        The crossover count, or None if the list version always won
+    """
+    for result in results:
+        if result['numpy'] < result['list']:
+            return result['count']
+    return None
+
+def bench_methods(repeat: int, seed: int = 0) -> dict[str, float]:
+    """
+    Times every Artist method against an offscreen surface
+
+    Parameters
+    ----------
+    repeat : int
+        How many calls to time per measurement
+    seed : int
+        The seed the sky is placed with (default 0)
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of a single call of every method, in seconds
+    """
+    renderer = HeadlessRenderer(seed=seed)
+    handler = renderer.handler
+    artist = handler.artist
+    config = handler.config
+    screen = handler.screen
+    see_through = handler.see_through
+    darkness = handler.darkness
+
+    # Every call draws onto the offscreen screen (nothing is presented)
+    methods = {
+        'move_clouds': lambda: artist.move_clouds(),
+        'draw_clouds': lambda: artist.draw_clouds(
+            screen, see_through, config.cloud_color
+        ),
+        'draw_single_cloud': lambda: artist.draw_single_cloud(
+            see_through, 100, 50, config.cloud_color
+        ),
+        'draw_stars': lambda: artist.draw_stars(screen),
+        'draw_sun_or_moon': lambda: artist.draw_sun_or_moon(
+            screen, config.day, config.sky_color
+        ),
+        'check_darkness': lambda: artist.check_darkness(
+            False, False, screen, darkness
+        ),
+        'draw_grass': lambda: artist.draw_grass(
+            screen, config.field_color, config.stripe_color
+        ),
+        'draw_fence': lambda: artist.draw_fence(screen),
+        'draw_out_of_bounds': lambda: artist.draw_out_of_bounds(screen),
+        'draw_safety_circle': lambda: artist.draw_safety_circle(screen),
+        'draw_outer_goal_box': lambda: artist.draw_outer_goal_box(screen),
+        'draw_inner_goal_box': lambda: artist.draw_inner_goal_box(screen),
+        'draw_arc': lambda: artist.draw_arc(screen),
+        'draw_scoreboard': lambda: artist.draw_scoreboard(screen),
+        'draw_goal': lambda: artist.draw_goal(screen),
+        'draw_net': lambda: artist.draw_net(screen),
+        'draw_light_poles': lambda: artist.draw_light_poles(screen),
+        'draw_lights': lambda: artist.draw_lights(screen, config.light_color),
+        'draw_stands': lambda: artist.draw_stands(screen),
+        'draw_corner_flags': lambda: artist.draw_corner_flags(screen),
+        'draw_field': lambda: artist.draw_field(
+            screen, config.field_color, config.stripe_color, config.light_color
+        ),
+        'draw_field_cached': lambda: handler.layer_cache.draw_field(
+            screen, config
+        )
+    }
+
+    results = {}
+    for name, method in methods.items():
+        results[f"method.{name}"] = time_call(method, repeat)
+        # Don't let reported rects pile up between measurements
+        artist.dirty_rects.clear()
+
+    renderer.quit()
+    return results
+
+def bench_frames(repeat: int, seed: int = 0) -> dict[str, float]:
+    """
+    Times full frames for all four day/light combinations
+
+    Parameters
+    ----------
+    repeat : int
+        How many frames to time per measurement
+    seed : int
+        The seed the sky is placed with (default 0)
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of a single frame of every combination, in seconds
+    """
+    results = {}
+    for day in (True, False):
+        for lights_on in (True, False):
+            config = Config()
+            if not day:
+                config.switch_day()
+            if not lights_on:
+                config.switch_light()
+
+            renderer = HeadlessRenderer(config, seed=seed)
+            name = (
+                f"frame.{'day' if day else 'night'}"
+                f".{'lights_on' if lights_on else 'lights_off'}"
+            )
+            results[name] = time_call(renderer.step, repeat)
+            renderer.quit()
+    return results
+
+def bench_scaling(
+        cloud_counts: list[int],
+        star_counts: list[int],
+        repeat: int,
+        seed: int = 0,
+        ball_counts: list[int] = ()) -> dict[str, float]:
+    """
+    Times full frames while sweeping the number of clouds, stars and balls
+
+    Clouds are measured during the day (both as individual clouds and as
+    parallax strips) and stars at night, when they're drawn
+
+    Parameters
+    ----------
+    cloud_counts : list[int]
+        The cloud counts to measure
+    star_counts : list[int]
+        The star counts to measure
+    repeat : int
+        How many frames to time per measurement
+    seed : int
+        The seed the sky is placed with (default 0)
+    ball_counts : list[int]
+        The numbers of balls shot at the goalie to measure (default none)
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of a single frame at every count, in seconds
+    """
+    results = {}
+    for count in cloud_counts:
+        renderer = HeadlessRenderer(seed=seed)
+        renderer.handler.artist.init_clouds(count)
+        results[f"scale.clouds.{count}"] = time_call(renderer.step, repeat)
+        renderer.quit()
+
+        # The same clouds as parallax strips
+        renderer = HeadlessRenderer(seed=seed, parallax=True)
+        renderer.handler.artist.init_clouds(count)
+        renderer.handler.create_parallax(True)
+        results[f"scale.parallax.{count}"] = time_call(renderer.step, repeat)
+        renderer.quit()
+
+    for count in star_counts:
+        config = Config()
+        config.switch_day()
+        renderer = HeadlessRenderer(config, seed=seed)
+        renderer.handler.artist.init_stars(count)
+        results[f"scale.stars.{count}"] = time_call(renderer.step, repeat)
+        renderer.quit()
+
+    for count in ball_counts:
+        renderer = HeadlessRenderer(seed=seed, ball_count=count)
+        results[f"scale.balls.{count}"] = time_call(renderer.step, repeat)
+        renderer.quit()
+    return results
+
+def bench_players(
+        player_counts: list[int],
+        repeat: int,
+        seed: int = 0) -> dict[str, float]:
+    """
+    Times the player simulation alone, and whole frames with the players,
+    while sweeping the number of players
+
+    Parameters
+    ----------
+    player_counts : list[int]
+        The player counts to measure
+    repeat : int
+        How many simulation steps (and frames) to time per measurement
+    seed : int
+        The seed the play is moved with (default 0)
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of a single simulation step and of a single frame (a step
+        and a draw of everything) at every count, in seconds
+    """
+    results = {}
+    for count in player_counts:
+        players = PlayerField(Artist(seed), count)
+        # Let the players leave their lined-up formation first
+        for _ in range(repeat):
+            players.step()
+        results[f"sim.players.{count}"] = time_call(players.step, repeat)
+
+        renderer = HeadlessRenderer(seed=seed, player_count=count)
+        for _ in range(repeat):
+            renderer.step()
+        results[f"frame.players.{count}"] = time_call(renderer.step, repeat)
+        renderer.quit()
+    return results
+
+def over_step_budget(results: dict[str, float]) -> list[str]:
+    """
+    Returns the player frames that take longer than a simulation step
+
+    A frame that takes longer than PlayerField.STEP makes the next frame run
+    more simulation steps to catch up, which makes it longer still, until
+    SimulationClock's max_steps cuts it off, so those counts can't be run
+    interactively
+
+    Parameters
+    ----------
+    results : dict[str, float]
+        The time of every benchmark, in seconds
+
+    Returns
+    -------
+    names : list[str]
+        The frame.players benchmarks over the budget
+    """
+    return [
+        name for name, seconds in results.items()
+        if name.startswith('frame.players.') and seconds > PlayerField.STEP
+    ]
+
+def bench_crowd(
+        densities: list[float],
+        repeat: int,
+        seed: int = 0) -> dict[str, float]:
+    """
+    Times a frame of the crowd (moving it and writing its pixels) while
+    sweeping the crowd density
+
+    Parameters
+    ----------
+    densities : list[float]
+        The crowd densities to measure
+    repeat : int
+        How many frames to time per measurement
+    seed : int
+        The seed the crowd is seated with (default 0)
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of a single crowd frame at every density, in seconds
+    """
+    results = {}
+    for density in densities:
+        renderer = HeadlessRenderer(seed=seed, crowd_density=density)
+        handler = renderer.handler
+
+        def crowd_frame():
+            handler.crowd.step()
+            handler.crowd.draw(handler.screen)
+
+        results[f"crowd.{density:g}"] = time_call(crowd_frame, repeat)
+        renderer.quit()
+    return results
+
+def bench_particles(
+        particle_counts: list[int],
+        repeat: int,
+        seed: int = 0) -> dict[str, float]:
+    """
+    Times full frames with every weather while sweeping the particle count
+
+    Parameters
+    ----------
+    particle_counts : list[int]
+        The particle counts to measure
+    repeat : int
+        How many frames to time per measurement
+    seed : int
+        The seed the particles are placed with (default 0)
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of a single frame of every weather at every count,
+        in seconds
+    """
+    results = {}
+    for count in particle_counts:
+        for weather in ParticleSystem.MODES[1:]:
+            renderer = HeadlessRenderer(
+                                            seed=seed,
+                                            particle_count=count,
+                                            weather=weather
+                                        )
+            results[f"particles.{weather}.{count}"] = time_call(
+                renderer.step, repeat
+            )
+            renderer.quit()
+    return results
+
+def run_suite(
+        repeat: int,
+        cloud_counts: list[int],
+        star_counts: list[int],
+        seed: int = 0,
+        ball_counts: list[int] = (),
+        player_counts: list[int] = (),
+        crowd_densities: list[float] = (),
+        particle_counts: list[int] = ()) -> dict[str, float]:
+    """
+    Runs every benchmark of the suite
+
+    Parameters
+    ----------
+    repeat : int
+        How many calls to time per measurement
+    cloud_counts : list[int]
+        The cloud counts of the scaling sweep
+    star_counts : list[int]
+        The star counts of the scaling sweep
+    seed : int
+        The seed the sky is placed with (default 0)
+    ball_counts : list[int]
+        The ball counts of the scaling sweep (default none)
+    player_counts : list[int]
+        The player counts of the simulation sweep (default none)
+    crowd_densities : list[float]
+        The crowd densities of the crowd sweep (default none)
+    particle_counts : list[int]
+        The particle counts of the weather sweep (default none)
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of every benchmark, in seconds
+    """
+    results = bench_methods(repeat, seed)
+    results.update(bench_frames(repeat, seed))
+    results.update(bench_scaling(
+        cloud_counts,
+        star_counts,
+        repeat,
+        seed,
+        ball_counts
+    ))
+    results.update(bench_players(player_counts, repeat, seed))
+    results.update(bench_crowd(crowd_densities, repeat, seed))
+    results.update(bench_particles(particle_counts, repeat, seed))
+    return results
+
+def save_results(path: str, results: dict[str, float]) -> None:
+    """
+    Writes benchmark results to a JSON baseline file
+
+    Parameters
+    ----------
+    path : str
+        The file to write
+    results : dict[str, float]
+        The time of every benchmark, in seconds
+    """
+    with open(path, 'w') as file:
+        json.dump(
+            {
+                'unit': 's',
+                'python': platform.python_version(),
+                'pygame': pygame.version.ver,
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'results': results
+            },
+            file,
+            indent=2
+        )
+
+def load_results(path: str) -> dict[str, float]:
+    """
+    Reads benchmark results from a JSON baseline file
+
+    Parameters
+    ----------
+    path : str
+        The file to read
+
+    Returns
+    -------
+    results : dict[str, float]
+        The time of every benchmark, in seconds
+    """
+    with open(path) as file:
+        return json.load(file)['results']
+
+def compare_results(
+        baseline: dict[str, float],
+        current: dict[str, float],
+        threshold: float) -> list[tuple]:
+    """
+    Compares two sets of results and finds the regressions
+
+    Parameters
+    ----------
+    baseline : dict[str, float]
+        The results to compare against
+    current : dict[str, float]
+        The new results
+    threshold : float
+        The slowdown, in percent, past which a benchmark counts as regressed
+
+    Returns
+    -------
+    rows : list[tuple]
+        A (name, baseline, current, change in percent, regressed) row for
+        every benchmark in either set. A benchmark missing from the current
+        results has None for its current time and change and counts as
+        regressed, and a new one has None for its baseline and change
+    """
+    rows = []
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current:
+            rows.append((name, baseline[name], None, None, True))
+        elif name not in baseline:
+            rows.append((name, None, current[name], None, False))
+        else:
+            change = (current[name] / baseline[name] - 1) * 100
+            rows.append(
+                (name, baseline[name], current[name], change, change > threshold)
+            )
+    return rows
+
+def print_results(results: dict[str, float]) -> None:
+    """
+    Prints benchmark results as a table
+
+    Parameters
+    ----------
+    results : dict[str, float]
+        The time of every benchmark, in seconds
+    """
+    print(f"{'benchmark':<32} {'time (us)':>12}")
+    for name, seconds in results.items():
+        print(f"{name:<32} {seconds * 1e6:>12.1f}")
+
+def print_entities(args: argparse.Namespace) -> None:
+    """
+    Prints the list-based against array-backed entity comparison
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        The parsed command line options
+    """
+    print(f"{'clouds':>10} {'list (us)':>12} {'numpy (us)':>12} {'speedup':>8}")
+    cloud_results = bench_clouds(args.counts, args.repeat, args.seed)
+    for result in cloud_results:
+        print(
+            f"{result['count']:>10} "
+            f"{result['list'] * 1e6:>12.1f} "
+            f"{result['numpy'] * 1e6:>12.1f} "
+            f"{result['list'] / result['numpy']:>7.1f}x"
+        )
+
+    crossover = find_crossover(cloud_results)
+    if crossover is None:
+        print("The list-based simulation was faster at every count")
+    else:
+        print(f"The array-backed simulation is faster from {crossover} clouds")
+
+    print()
+    print(f"{'stars':>10} {'init (ms)':>12}")
+    for result in bench_stars(args.stars, args.seed):
+        print(f"{result['count']:>10} {result['numpy'] * 1e3:>12.2f}")
+
+def main() -> int:
+    """
+    Runs the benchmark command given on the command line
+
+    Returns
+    -------
+    status : int
+        The exit status (1 if compare found a regression or run found a
+        player frame over the simulation step)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the stadium")
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help="The seed clouds and stars are placed with (default 0)"
+    )
+    # The seed is accepted after a command too, without that command's
+    # default overwriting one given before it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        '--seed', type=int, default=argparse.SUPPRESS,
+        help="The seed clouds and stars are placed with (default 0)"
+    )
+    commands = parser.add_subparsers(dest='command')
+
+    run = commands.add_parser(
+        'run', parents=[common],
+        help="Time every Artist method, full frames and scaling sweeps"
+    )
+    run.add_argument(
+        '--out', metavar='PATH',
+        help="Write the results to a JSON baseline file"
+    )
+    run.add_argument(
+        '--repeat', type=int, default=20,
+        help="How many calls to time per measurement (default 20)"
+    )
+    run.add_argument(
+        '--clouds', type=int, nargs='+', default=[20, 1000, 10_000],
+        help="The cloud counts of the scaling sweep"
+    )
+    run.add_argument(
+        '--stars', type=int, nargs='+', default=[200, 10_000, 1_000_000],
+        help="The star counts of the scaling sweep"
+    )
+    run.add_argument(
+        '--balls', type=int, nargs='+', default=[1, 100, 1000],
+        help="The ball counts of the scaling sweep"
+    )
+    run.add_argument(
+        '--players', type=int, nargs='+', default=[22, 1000, 5000],
+        help="The player counts of the simulation sweep, whose frames must "
+        "fit in one simulation step"
+    )
+    run.add_argument(
+        '--crowd', type=float, nargs='+', default=[0.25, 0.7, 1.0],
+        help="The crowd densities of the crowd sweep"
+    )
+    run.add_argument(
+        '--particles', type=int, nargs='+', default=[10_000, 100_000],
+        help="The particle counts of the weather sweep"
+    )
+
+    compare = commands.add_parser(
+        'compare', parents=[common],
+        help="Flag regressions between two baseline files"
+    )
+    compare.add_argument('baseline', help="The results to compare against")
+    compare.add_argument('current', help="The new results")
+    compare.add_argument(
+        '--threshold', type=float, default=10.0,
+        help="The slowdown in percent that counts as a regression (default 10)"
+    )
+
+    entities = commands.add_parser(
+        'entities', parents=[common],
+        help="Compare the list-based and array-backed simulations"
+    )
+    entities.add_argument(
+        '--counts', type=int, nargs='+',
+        default=[1, 5, 10, 20, 50, 100, 1000, 10_000, 100_000],
+        help="The cloud counts to measure"
+    )
+    entities.add_argument(
+        '--stars', type=int, nargs='+',
+        default=[200, 10_000, 1_000_000],
+        help="The star counts to measure"
+    )
+    entities.add_argument(
+        '--repeat', type=int, default=50,
+        help="How many simulation steps to time per measurement"
+    )
+
+    # Running the whole suite (with its default options) is the default
+    args = parser.parse_args()
+    if args.command is None:
+        args = run.parse_args([], namespace=args)
+        args.command = 'run'
+
+    if args.command == 'entities':
+        print_entities(args)
+        return 0
+
+    if args.command == 'compare':
+        rows = compare_results(
+            load_results(args.baseline),
+            load_results(args.current),
+            args.threshold
+        )
+        print(f"{'benchmark':<32} {'baseline':>10} {'current':>10} {'change':>8}")
+        for name, before, after, change, regressed in rows:
+            if after is None:
+                print(f"{name:<32} {before * 1e6:>10.1f} {'-':>10}  MISSING")
+            elif before is None:
+                print(f"{name:<32} {'-':>10} {after * 1e6:>10.1f}  NEW")
+            else:
+                print(
+                    f"{name:<32} {before * 1e6:>10.1f} {after * 1e6:>10.1f} "
+                    f"{change:>+7.1f}%{'  REGRESSION' if regressed else ''}"
+                )
+
+        missing = sum(row[2] is None for row in rows)
+        regressions = sum(row[4] for row in rows) - missing
+        print(f"{regressions} regression(s) above {args.threshold:g}%")
+        if missing:
+            print(f"{missing} baseline benchmark(s) missing from the results")
+        return 1 if regressions or missing else 0
+
+    results = run_suite(
+        args.repeat,
+        args.clouds,
+        args.stars,
+        args.seed,
+        args.balls,
+        args.players,
+        args.crowd,
+        args.particles
+    )
+    print_results(results)
+    if args.out:
+        save_results(args.out, results)
+
+    over_budget = over_step_budget(results)
+    for name in over_budget:
+        print(
+            f"{name} takes {results[name] * 1e3:.1f} ms, more than a "
+            f"{PlayerField.STEP * 1e3:.1f} ms simulation step"
+        )
+    return 1 if over_budget else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
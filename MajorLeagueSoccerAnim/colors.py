@@ -20,6 +20,7 @@ class Color:
     # World Colors
     DAY_GREEN = (41, 129, 29)
     NIGHT_GREEN = (0, 64, 0)
+    SKIN = (224, 172, 125)
     
     # Amber Colors
     ORANGE = (255, 125, 0)
@@ -46,6 +46,30 @@ class Config:
         """
         return self._day
 
+    @property
+    def dark(self) -> bool:
+        """
+        Returns whether or not the whole scene is darkened
+
+        Returns
+        -------
+        dark : bool
+            True if it's night and the lights are off
+        """
+        return not (self._day or self._lights_on)
+
+    @property
+    def floodlit(self) -> bool:
+        """
+        Returns whether or not the floodlights light up the pitch
+
+        Returns
+        -------
+        floodlit : bool
+            True if it's night and the lights are on
+        """
+        return not self._day and self._lights_on
+
     @property
     def light_color(self) -> tuple:
         """
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+
+# File Imports
+from match_feed import parse_source
+
+class ControlServer:
+    """
+    A line-based control endpoint for the asyncio game loop.
+
+    Clients connect over TCP or a UNIX socket and send one command per line.
+    The toggles are the same the keys run (light, day, hud, pause, weather),
+    'stats' answers with the frame deadline jitter and the live feed's
+    latency as JSON, and 'quit' ends the game. The server is a coroutine on
+    the game loop's own event loop, so commands run between frames without
+    any locking.
+
+    Attributes
+    ----------
+    handler : PygameHandler
+        The handler the commands are run on
+    kind : str
+        One of 'tcp' or 'unix'
+    address : str | tuple
+        The socket path, or the (host, port) of a TCP socket
+    clients : dict[asyncio.Task, asyncio.StreamWriter]
+        The task answering every connected client, and where its replies go
+    """
+
+    def __init__(self, handler, address: str):
+        """
+        Creates the endpoint without listening yet
+
+        Parameters
+        ----------
+        handler : PygameHandler
+            The handler the commands are run on
+        address : str
+            Where to listen, 'tcp://host:port' or 'unix:///path/to/socket'
+        """
+        self.handler = handler
+        self.kind, self.address = parse_source(address)
+        if self.kind == 'file':
+            raise ValueError(
+                f"Expected tcp://host:port or unix:///path, got {address!r}"
+            )
+        self.clients: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def serve(self) -> None:
+        """
+        Listens for clients until cancelled
+
+        Clients still connected then are disconnected, and their tasks are
+        awaited, so they finish before the event loop shuts down instead of
+        being cancelled by it
+        """
+        if self.kind == 'tcp':
+            server = await asyncio.start_server(self.handle_client, *self.address)
+        else:
+            # A socket file left over from an earlier run is replaced
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            server = await asyncio.start_unix_server(
+                self.handle_client,
+                self.address
+            )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            # Closing a client ends its readline, so its task returns
+            for writer in self.clients.values():
+                writer.close()
+            await asyncio.gather(*self.clients, return_exceptions=True)
+
+    async def handle_client(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter) -> None:
+        """
+        Answers every command a client sends until it disconnects
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            The client's commands
+        writer : asyncio.StreamWriter
+            Where the replies go
+        """
+        task = asyncio.current_task()
+        self.clients[task] = writer
+        try:
+            while line := await reader.readline():
+                writer.write(self.run(line.decode().strip()).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            del self.clients[task]
+            writer.close()
+
+    def run(self, command: str) -> str:
+        """
+        Runs a single command
+
+        Parameters
+        ----------
+        command : str
+            One of the handler's KEY_COMMANDS values, 'stats' or 'quit'
+
+        Returns
+        -------
+        reply : str
+            'ok', the stats as JSON, or an error
+        """
+        handler = self.handler
+        if command == 'stats':
+            return json.dumps(self.stats())
+        if command == 'quit':
+            handler.done = True
+            return 'ok'
+        if command in handler.KEY_COMMANDS.values():
+            handler.run_command(command)
+            return 'ok'
+        return f"error: unknown command {command!r}"
+
+    def stats(self) -> dict:
+        """
+        Returns the frame deadline jitter and the live feed's latency
+
+        Returns
+        -------
+        stats : dict
+            The lateness percentiles (in milliseconds) and late frame count
+            of the frame pacer, and the feed's latency percentiles, event
+            counts and reader error if there is a feed
+        """
+        pacer = self.handler.frame_pacer
+        stats = {
+            'frames': pacer.frames,
+            'late_frames': pacer.late_frames,
+            'lateness_ms': dict(zip(('p50', 'p95', 'p99'), pacer.percentiles()))
+        }
+
+        feed = self.handler.feed
+        if feed is not None:
+            stats['feed'] = {
+                'received': feed.received,
+                'applied': feed.applied,
+                'errors': feed.errors,
+                'latency_ms': dict(zip(('p50', 'p95', 'p99'), feed.percentiles())),
+                # Why the reader stopped, if it did
+                'error': None if feed.error is None else repr(feed.error)
+            }
+        return stats
@@ -0,0 +1,261 @@
+import numpy as np
+import pygame
+
+# File Imports
+from colors import Color
+from artist import Artist
+
+class Crowd:
+    """
+    Spectators filling the stands, doing the wave and cheering.
+
+    Every spectator is a tiny block of pixels (a head over a shirt) in a seat
+    of the stands drawn by Artist.draw_stands. Their pixel coordinates and
+    colors are laid out once as flat NumPy arrays, so a frame only works out
+    how far every spectator is lifted and writes every pixel of the crowd
+    into the screen with a single surfarray assignment, instead of thousands
+    of pygame.draw calls.
+
+    The crowd is drawn on top of the field after it's blitted, so the stands
+    underneath are restored every frame for free.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist whose random generator seats the crowd, whose darkness
+        table darkens it and whose dirty rect tracker it reports to
+    density : float
+        The share of seats that are taken, from 0 to 1
+    seat_x : numpy.ndarray
+        The x position of every spectator's top left pixel
+    seat_y : numpy.ndarray
+        The y position of every spectator's top left pixel
+    pixel_x : numpy.ndarray
+        The (spectators, pixels) x positions of every pixel of the crowd
+    pixel_y : numpy.ndarray
+        The (spectators, pixels) y positions of every pixel of the crowd,
+        for seated spectators
+    colors : numpy.ndarray
+        The (spectators * pixels, 3) colors of every pixel of the crowd
+    dark_colors : numpy.ndarray
+        The colors darkened for night with the lights off (None until needed)
+    cheer_phase : numpy.ndarray
+        When in its cheer every spectator is, in steps (-1 for spectators
+        who aren't cheering)
+    wave_x : float
+        Where the wave's crest is
+    frame : int
+        How many simulation steps the crowd has taken
+    lift : numpy.ndarray
+        How many pixels every spectator is lifted
+    moved : bool
+        Whether or not the crowd moved since it was last reported
+    rects : list[pygame.Rect]
+        The regions of the stands the crowd covers
+    """
+
+    # The distance between two seats
+    SEAT_SPACING = (3, 4)
+    # The (x, y) offset of every pixel of a spectator: a head over a shirt
+    HEAD_PIXELS = [(0, 0), (1, 0)]
+    SHIRT_PIXELS = [(0, 1), (1, 1), (0, 2), (1, 2)]
+    # The shirt colors of the crowd
+    SHIRT_COLORS = [
+        Color.RED,
+        Color.BLUE,
+        Color.WHITE,
+        Color.YELLOW,
+        Color.ORANGE,
+        Color.GRAY
+    ]
+
+    # The most pixels a spectator is lifted
+    MAX_LIFT = 2
+    # The wave sweeps across both stands, crossing the field between them
+    WAVE_PERIOD = 1200
+    WAVE_SPEED = 6.0
+    WAVE_WIDTH = 40
+    # The share of spectators cheering on their own, and the length of a
+    # cheer in steps (half of it lifted)
+    CHEER_RATIO = 0.1
+    CHEER_STEPS = 16
+
+    def __init__(self, artist: Artist, density: float = 0.7):
+        """
+        Seats the crowd
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist whose random generator seats the crowd
+        density : float
+            The share of seats that are taken, from 0 to 1 (default 0.7)
+        """
+        self.artist: Artist = artist
+        self.density: float = min(max(density, 0.0), 1.0)
+
+        self.seat_x, self.seat_y = self.find_seats()
+        self.lay_out_pixels()
+
+        rng = artist.rng
+        spectator_count = len(self.seat_x)
+        self.cheer_phase: np.ndarray = np.where(
+            rng.random(spectator_count) < self.CHEER_RATIO,
+            rng.integers(0, self.CHEER_STEPS, spectator_count),
+            -1
+        )
+        self.wave_x: float = 0.0
+        self.frame: int = 0
+        self.lift: np.ndarray = np.zeros(spectator_count, dtype=np.int64)
+        self.moved: bool = True
+
+        self.rects: list[pygame.Rect] = self.stand_rects()
+
+    def __len__(self) -> int:
+        """Returns the number of spectators"""
+        return len(self.seat_x)
+
+    def stand_mask(self) -> np.ndarray:
+        """
+        Returns which pixels of the screen belong to the stands
+
+        Returns
+        -------
+        mask : numpy.ndarray
+            A (width, height) boolean array, True inside the stands
+        """
+        surface = pygame.Surface((800, 600))
+        for _, points in self.artist.STANDS:
+            pygame.draw.polygon(surface, Color.WHITE, points)
+        return pygame.surfarray.pixels_red(surface) > 0
+
+    def find_seats(self) -> tuple:
+        """
+        Picks the taken seats among the ones inside the stands
+
+        A seat counts if the spectator fits inside the stands even when
+        lifted all the way
+
+        Returns
+        -------
+        seat_x : numpy.ndarray
+            The x position of every taken seat
+        seat_y : numpy.ndarray
+            The y position of every taken seat
+        """
+        mask = self.stand_mask()
+        width, height = mask.shape
+        spacing_x, spacing_y = self.SEAT_SPACING
+        x, y = np.meshgrid(
+            np.arange(0, width - 1, spacing_x),
+            np.arange(self.MAX_LIFT, height - 2, spacing_y),
+            indexing='ij'
+        )
+        x, y = x.ravel(), y.ravel()
+
+        # Every pixel of the spectator, lifted or not, is inside the stands
+        fits = np.ones(len(x), dtype=bool)
+        for dx, dy in self.HEAD_PIXELS + self.SHIRT_PIXELS:
+            for lift in (0, self.MAX_LIFT):
+                fits &= mask[x + dx, y + dy - lift]
+        x, y = x[fits], y[fits]
+
+        taken = self.artist.rng.random(len(x)) < self.density
+        return x[taken], y[taken]
+
+    def lay_out_pixels(self) -> None:
+        """Lays out the coordinates and colors of every pixel of the crowd"""
+        offsets = np.array(self.HEAD_PIXELS + self.SHIRT_PIXELS)
+        self.pixel_x: np.ndarray = self.seat_x[:, np.newaxis] + offsets[:, 0]
+        self.pixel_y: np.ndarray = self.seat_y[:, np.newaxis] + offsets[:, 1]
+
+        # Every spectator gets a shirt color, and a skin colored head
+        shirts = np.array(self.SHIRT_COLORS, dtype=np.uint8)[
+            self.artist.rng.integers(0, len(self.SHIRT_COLORS), len(self.seat_x))
+        ]
+        colors = np.empty((len(self.seat_x), len(offsets), 3), dtype=np.uint8)
+        colors[:, :len(self.HEAD_PIXELS)] = Color.SKIN
+        colors[:, len(self.HEAD_PIXELS):] = shirts[:, np.newaxis]
+
+        self.colors: np.ndarray = colors.reshape(-1, 3)
+        self.dark_colors: np.ndarray = None
+
+    def stand_rects(self) -> list[pygame.Rect]:
+        """
+        Returns the bounding rect of each side's stands
+
+        Returns
+        -------
+        rects : list[pygame.Rect]
+            The regions the crowd can be drawn in
+        """
+        rects = []
+        for side in (self.seat_x < 400, self.seat_x >= 400):
+            if not side.any():
+                continue
+            left = int(self.seat_x[side].min())
+            top = int(self.seat_y[side].min()) - self.MAX_LIFT
+            right = int(self.pixel_x[side].max()) + 1
+            bottom = int(self.pixel_y[side].max()) + 1
+            rects.append(pygame.Rect(left, top, right - left, bottom - top))
+        return rects
+
+    def step(self) -> None:
+        """Moves the wave and the cheers by a single simulation step"""
+        self.frame += 1
+        self.wave_x = (self.wave_x + self.WAVE_SPEED) % self.WAVE_PERIOD
+
+        # Spectators rise as the wave's crest passes them
+        distance = np.abs(self.seat_x - self.wave_x)
+        distance = np.minimum(distance, self.WAVE_PERIOD - distance)
+        lift = np.maximum(
+            0,
+            self.MAX_LIFT + 1 - distance * (self.MAX_LIFT + 1) // self.WAVE_WIDTH
+        ).astype(np.int64)
+
+        # Cheering spectators jump up for the first half of every cheer
+        cheering = self.cheer_phase >= 0
+        jumping = (
+            cheering
+            & ((self.frame + self.cheer_phase) % self.CHEER_STEPS
+               < self.CHEER_STEPS // 2)
+        )
+        lift = np.minimum(lift + jumping, self.MAX_LIFT)
+
+        if not np.array_equal(lift, self.lift):
+            self.lift = lift
+            self.moved = True
+
+    def draw(self, surface: pygame.Surface, dark: bool = False) -> None:
+        """
+        Writes every pixel of the crowd into the surface in one pass
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the crowd onto (it has to be 24 or 32 bit)
+        dark : bool
+            Whether or not it's night with the lights off (default False)
+        """
+        if not len(self.seat_x):
+            return
+
+        colors = self.colors
+        if dark:
+            if self.dark_colors is None:
+                self.dark_colors = self.artist.darkness_lut[
+                    np.arange(3), self.colors
+                ]
+            colors = self.dark_colors
+
+        y = self.pixel_y - self.lift[:, np.newaxis]
+
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels[self.pixel_x.ravel(), y.ravel()] = colors
+        del pixels # Unlock the surface
+
+        # Only report the stands when the crowd looks different
+        if self.moved:
+            for rect in self.rects:
+                self.artist.dirty_rects.add(rect)
+            self.moved = False
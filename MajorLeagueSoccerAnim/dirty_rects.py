@@ -0,0 +1,97 @@
+import pygame
+
+class DirtyRects:
+    """
+    Tracks the regions of the screen that changed since the last presentation.
+
+    Drawing code reports the rects it changed, and present() only pushes those
+    regions to the display with pygame.display.update(rects) instead of
+    flipping all the pixels of the screen every frame.
+
+    Attributes
+    ----------
+    bounds : pygame.Rect
+        The rect of the whole screen, used to clip reported rects
+    max_rects : int
+        The number of rects past which they are merged into a single union
+        (updating hundreds of tiny rects costs more than one larger one)
+    rects : list[pygame.Rect]
+        The rects reported since the last presentation
+    full : bool
+        Whether or not the whole screen must be presented next time
+    """
+
+    def __init__(self, width: int = 800, height: int = 600, max_rects: int = 64):
+        """
+        Initializes the tracker, requesting a full repaint for the first frame
+
+        Parameters
+        ----------
+        width : int
+            The width of the screen (default 800)
+        height : int
+            The height of the screen (default 600)
+        max_rects : int
+            The number of rects past which they are merged (default 64)
+        """
+        self.bounds: pygame.Rect = pygame.Rect(0, 0, width, height)
+        self.max_rects: int = max_rects
+
+        self.rects: list[pygame.Rect] = []
+        self.full: bool = True # Nothing has been shown yet
+
+    def add(self, rect) -> None:
+        """
+        Reports a single changed region
+
+        Parameters
+        ----------
+        rect : pygame.Rect | list | tuple
+            The region of the screen that changed
+        """
+        # No need to track rects once the whole screen is going out
+        if self.full:
+            return
+
+        # Only keep the part of the rect that is actually on screen
+        rect = self.bounds.clip(rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def add_all(self, rects: list) -> None:
+        """
+        Reports many changed regions at once
+
+        Parameters
+        ----------
+        rects : list
+            The regions of the screen that changed
+        """
+        for rect in rects:
+            self.add(rect)
+
+    def mark_full(self) -> None:
+        """Requests that the whole screen be presented next time"""
+        self.full = True
+        self.rects.clear()
+
+    def present(self) -> None:
+        """
+        Pushes the changed regions to the display and resets the tracker
+
+        A full repaint falls back to pygame.display.flip()
+        """
+        if self.full:
+            pygame.display.flip()
+        elif self.rects:
+            # Too many small updates are slower than a single larger one
+            if len(self.rects) > self.max_rects:
+                self.rects = [self.rects[0].unionall(self.rects[1:])]
+            pygame.display.update(self.rects)
+
+        self.clear()
+
+    def clear(self) -> None:
+        """Forgets every reported region without presenting anything"""
+        self.full = False
+        self.rects.clear()
@@ -0,0 +1,50 @@
+import time
+
+class DutyCycleMeter:
+    """
+    Measures the share of wall-clock time the process spends on the CPU.
+
+    The meter compares time.process_time (CPU time of every thread of the
+    process) against time.perf_counter (wall-clock time) over a rolling
+    window. A loop that redraws at 60 frames per second shows a high duty
+    cycle, while a loop blocked waiting for events shows one close to 0.
+
+    Attributes
+    ----------
+    window : float
+        How many seconds of wall-clock time every measurement covers
+    duty_cycle : float
+        The share of the last finished window spent on the CPU, from 0 to 1
+        (None until the first window has finished)
+    window_start : float
+        The wall-clock time the current window started at
+    cpu_start : float
+        The CPU time the current window started at
+    """
+
+    def __init__(self, window: float = 1.0):
+        """
+        Starts the first window
+
+        Parameters
+        ----------
+        window : float
+            How many seconds of wall-clock time every measurement covers
+            (default 1.0)
+        """
+        self.window: float = window
+        self.duty_cycle: float = None
+        self.window_start: float = time.perf_counter()
+        self.cpu_start: float = time.process_time()
+
+    def sample(self) -> None:
+        """Finishes the current window if it has lasted long enough"""
+        now = time.perf_counter()
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return
+
+        cpu_now = time.process_time()
+        self.duty_cycle = (cpu_now - self.cpu_start) / elapsed
+        self.window_start = now
+        self.cpu_start = cpu_now
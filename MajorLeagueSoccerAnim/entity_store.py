@@ -0,0 +1,291 @@
+import numpy as np
+
+# The layout of a single cloud: its (x, y) position
+CLOUD_DTYPE = np.dtype([
+    ('x', np.float64),
+    ('y', np.float64)
+])
+
+# The layout of a single star: its (x, y) position and its size
+STAR_DTYPE = np.dtype([
+    ('x', np.int32),
+    ('y', np.int32),
+    ('size', np.int32)
+])
+
+class CloudStore:
+    """
+    An array-backed index of every cloud, ordered by x.
+
+    Every cloud moves left at the same speed, so instead of moving each of them
+    the store keeps their world positions fixed and advances a single scroll
+    offset (a cloud's screen x is its world x minus the scroll). Their order by
+    x then never changes, so:
+
+    - the clouds that drifted off the left edge are always a prefix of the
+      sorted array, which is dropped by advancing a head index
+    - the clouds overlapping the viewport are a contiguous slice found with
+      two binary searches, so offscreen clouds are never visited
+
+    Respawned clouds land in a small unsorted overflow buffer that is merged
+    into the sorted array once it holds an eighth of the clouds, so keeping the
+    index ordered costs amortized O(log n) per respawn.
+
+    Attributes
+    ----------
+    data : numpy.ndarray
+        A structured array of CLOUD_DTYPE sorted by world x (the entries
+        before head have despawned)
+    head : int
+        The index of the first cloud of data that is still alive
+    overflow : numpy.ndarray
+        The unsorted buffer of respawned clouds, in world coordinates
+    overflow_count : int
+        How many entries of the overflow buffer are in use
+    scroll : float
+        How far every cloud has moved to the left since the last merge
+    rng : numpy.random.Generator
+        The random generator used to place new clouds
+    """
+
+    # Clouds start and respawn within these ranges
+    SPAWN_X = (-100, 1600)
+    RESPAWN_X = (800, 1600)
+    SPAWN_Y = (0, 150)
+    # Clouds past this x position have left the screen
+    DESPAWN_X = -100
+    # The smallest overflow buffer, so few clouds don't merge every respawn
+    MIN_OVERFLOW = 16
+
+    def __init__(self, cloud_count: int, rng: np.random.Generator):
+        """
+        Fills the store with randomly placed clouds
+
+        Parameters
+        ----------
+        cloud_count : int
+            The number of clouds to create
+        rng : numpy.random.Generator
+            The random generator used to place clouds
+        """
+        self.rng: np.random.Generator = rng
+
+        # Create every cloud at once
+        # x is from -100 to 1600
+        # y is from 0 to 150
+        clouds = np.empty(cloud_count, dtype=CLOUD_DTYPE)
+        clouds['x'] = rng.integers(*self.SPAWN_X, cloud_count)
+        clouds['y'] = rng.integers(*self.SPAWN_Y, cloud_count)
+
+        # Everything starts out in the overflow buffer and is sorted at once
+        self.data: np.ndarray = clouds[:0]
+        self.head: int = 0
+        self.overflow: np.ndarray = clouds
+        self.overflow_count: int = cloud_count
+        self.scroll: float = 0.0
+        self.merge()
+
+    def __len__(self) -> int:
+        """Returns the number of clouds in the store"""
+        return len(self.data) - self.head + self.overflow_count
+
+    @property
+    def live(self) -> np.ndarray:
+        """
+        Returns every cloud in world coordinates
+
+        Returns
+        -------
+        clouds : numpy.ndarray
+            The sorted clouds followed by the overflow buffer (a new array)
+        """
+        return np.concatenate((
+            self.data[self.head:],
+            self.overflow[:self.overflow_count]
+        ))
+
+    @property
+    def x(self) -> np.ndarray:
+        """
+        Returns the x positions of every cloud
+
+        Returns
+        -------
+        x : numpy.ndarray
+            The screen x position of every cloud (a new array)
+        """
+        return self.live['x'] - self.scroll
+
+    @property
+    def y(self) -> np.ndarray:
+        """
+        Returns the y positions of every cloud
+
+        Returns
+        -------
+        y : numpy.ndarray
+            The y position of every cloud (a new array)
+        """
+        return self.live['y']
+
+    def positions(
+            self,
+            x_offset: float = 0.0,
+            view_x: tuple = None) -> list[tuple]:
+        """
+        Returns the positions of the clouds as plain Python numbers
+
+        Parameters
+        ----------
+        x_offset : float
+            An offset added to every x position (default 0.0)
+        view_x : tuple
+            Only clouds whose x position lies strictly between these two
+            bounds are returned (default None, returning every cloud)
+
+        Returns
+        -------
+        positions : list[tuple[float, float]]
+            A list of (x, y) tuples that can be handed to pygame directly
+        """
+        shift = x_offset - self.scroll
+        sorted_clouds = self.data[self.head:]
+        overflow = self.overflow[:self.overflow_count]
+
+        if view_x is not None:
+            # The sorted clouds in view are one slice, found by binary search
+            low, high = view_x[0] - shift, view_x[1] - shift
+            sorted_x = sorted_clouds['x']
+            sorted_clouds = sorted_clouds[
+                np.searchsorted(sorted_x, low, 'right'):
+                np.searchsorted(sorted_x, high, 'left')
+            ]
+
+            # The overflow buffer is small enough to check directly
+            overflow_x = overflow['x']
+            overflow = overflow[(overflow_x > low) & (overflow_x < high)]
+
+        clouds = np.concatenate((sorted_clouds, overflow))
+        return list(zip((clouds['x'] + shift).tolist(), clouds['y'].tolist()))
+
+    def move(self, cloud_speed: float) -> None:
+        """
+        Moves every cloud to the left and respawns the ones that left the screen
+
+        Parameters
+        ----------
+        cloud_speed : float
+            How many units to move clouds
+        """
+        self.scroll += cloud_speed
+        limit = self.scroll + self.DESPAWN_X
+
+        # The sorted clouds that reached the edge are a prefix
+        sorted_x = self.data['x']
+        despawned = int(np.searchsorted(sorted_x[self.head:], limit, 'left'))
+        self.head += despawned
+
+        # The overflow buffer is small enough to check directly
+        overflow = self.overflow[:self.overflow_count]
+        kept = overflow['x'] >= limit
+        overflow_despawned = self.overflow_count - int(np.count_nonzero(kept))
+        if overflow_despawned:
+            self.overflow_count -= overflow_despawned
+            self.overflow[:self.overflow_count] = overflow[kept]
+
+        # Re-randomize the position of the clouds that reached the edge
+        respawn_count = despawned + overflow_despawned
+        if respawn_count:
+            respawned = np.empty(respawn_count, dtype=CLOUD_DTYPE)
+            respawned['x'] = self.rng.integers(*self.RESPAWN_X, respawn_count)
+            respawned['y'] = self.rng.integers(*self.SPAWN_Y, respawn_count)
+            respawned['x'] += self.scroll
+            self.add_overflow(respawned)
+
+    def add_overflow(self, clouds: np.ndarray) -> None:
+        """
+        Adds clouds to the overflow buffer, merging it once it's full
+
+        Parameters
+        ----------
+        clouds : numpy.ndarray
+            A structured array of CLOUD_DTYPE in world coordinates
+        """
+        count = self.overflow_count + len(clouds)
+        if count > len(self.overflow):
+            self.merge(clouds)
+            return
+
+        self.overflow[self.overflow_count:count] = clouds
+        self.overflow_count = count
+
+    def merge(self, clouds: np.ndarray = None) -> None:
+        """
+        Sorts the overflow buffer (and any extra clouds) into the index
+
+        Positions are rebased to the current scroll while everything is being
+        rewritten anyway, so world positions never grow without bound
+
+        Parameters
+        ----------
+        clouds : numpy.ndarray
+            Extra clouds in world coordinates to merge in (default None)
+        """
+        parts = [self.data[self.head:], self.overflow[:self.overflow_count]]
+        if clouds is not None:
+            parts.append(clouds)
+        merged = np.concatenate(parts)
+        merged['x'] -= self.scroll
+
+        # The sorted part is already in order, so a stable sort is quick
+        self.data = merged[np.argsort(merged['x'], kind='stable')]
+        self.head = 0
+        self.scroll = 0.0
+
+        capacity = max(self.MIN_OVERFLOW, len(merged) // 8)
+        self.overflow = np.empty(capacity, dtype=CLOUD_DTYPE)
+        self.overflow_count = 0
+
+class StarStore:
+    """
+    An array-backed store holding the position and size of every star.
+
+    Attributes
+    ----------
+    data : numpy.ndarray
+        A structured array of STAR_DTYPE with one entry per star
+    """
+
+    # Stars are placed within these ranges
+    SPAWN_X = (0, 800)
+    SPAWN_Y = (0, 200)
+
+    def __init__(
+            self,
+            star_count: int,
+            max_star_size: int,
+            rng: np.random.Generator):
+        """
+        Fills the store with randomly placed stars
+
+        Parameters
+        ----------
+        star_count : int
+            The number of stars to create
+        max_star_size : int
+            The (exclusive) maximum size for stars
+        rng : numpy.random.Generator
+            The random generator used to place stars
+        """
+        # Create every star at once
+        # x is from 0 to 800
+        # y is from 0 to 200
+        # size is from 1 up to (but not including) max_star_size
+        self.data: np.ndarray = np.empty(star_count, dtype=STAR_DTYPE)
+        self.data['x'] = rng.integers(*self.SPAWN_X, star_count)
+        self.data['y'] = rng.integers(*self.SPAWN_Y, star_count)
+        self.data['size'] = rng.integers(1, max_star_size, star_count)
+
+    def __len__(self) -> int:
+        """Returns the number of stars in the store"""
+        return len(self.data)
@@ -0,0 +1,629 @@
+import argparse
+import asyncio
+import os
+import queue
+import random
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+import pygame
+
+# File Imports
+from config import Config
+from headless import HeadlessRenderer, surface_array
+
+# The fixed-point (R, G, B) weights and offset of the Y, Cb and Cr planes
+YCBCR = [
+    (66, 129, 25, 16),
+    (-38, -74, 112, 128),
+    (112, -94, -18, 128)
+]
+# How many rows record_async encodes before it lets the game loop run again
+BAND_ROWS = 30
+
+def y4m_header(width: int, height: int, fps: int) -> bytes:
+    """
+    Returns the header of a 4:4:4 Y4M stream
+
+    Parameters
+    ----------
+    width : int
+        The width of the frames
+    height : int
+        The height of the frames
+    fps : int
+        The frame rate of the stream
+
+    Returns
+    -------
+    header : bytes
+        The stream header, ending with a newline
+    """
+    return (
+        f"YUV4MPEG2 W{width} H{height} F{fps}:1 Ip A1:1 C444\n".encode()
+    )
+
+def encode_png(frame: np.ndarray, level: int = 1) -> bytes:
+    """
+    Encodes an RGB frame as a PNG file
+
+    The heavy lifting is done by zlib, which releases the GIL, so several
+    frames can be encoded in parallel threads
+
+    Parameters
+    ----------
+    frame : numpy.ndarray
+        A (height, width, 3) array of uint8 RGB values
+    level : int
+        The zlib compression level (default 1, the fastest)
+
+    Returns
+    -------
+    png : bytes
+        The contents of the PNG file
+    """
+    height, width, _ = frame.shape
+    return png_file(width, height, zlib.compress(png_rows(frame).tobytes(), level))
+
+def png_rows(frame: np.ndarray) -> np.ndarray:
+    """
+    Lays out the rows of an RGB frame (or of a band of one) the way the
+    compressed image data of a PNG file holds them
+
+    Parameters
+    ----------
+    frame : numpy.ndarray
+        A (height, width, 3) array of uint8 RGB values
+
+    Returns
+    -------
+    rows : numpy.ndarray
+        A (height, width * 3 + 1) array of uint8 values
+    """
+    height, width, _ = frame.shape
+
+    # Every row starts with its filter type (0, no filtering)
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = frame.reshape(height, width * 3)
+    return rows
+
+def png_file(width: int, height: int, image_data: bytes) -> bytes:
+    """
+    Wraps compressed image data in the chunks of a PNG file
+
+    Parameters
+    ----------
+    width : int
+        The width of the image
+    height : int
+        The height of the image
+    image_data : bytes
+        The zlib-compressed rows of the image
+
+    Returns
+    -------
+    png : bytes
+        The contents of the PNG file
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack('>I', len(data)) + kind + data
+            + struct.pack('>I', zlib.crc32(kind + data))
+        )
+
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', image_data)
+        + chunk(b'IEND', b'')
+    )
+
+def encode_y4m(frame: np.ndarray) -> bytes:
+    """
+    Encodes an RGB frame as a 4:4:4 YCbCr frame of a Y4M stream
+
+    Parameters
+    ----------
+    frame : numpy.ndarray
+        A (height, width, 3) array of uint8 RGB values
+
+    Returns
+    -------
+    data : bytes
+        The FRAME header followed by the Y, Cb and Cr planes
+    """
+    return b'FRAME\n' + ycbcr_planes(frame).tobytes()
+
+def ycbcr_planes(frame: np.ndarray) -> np.ndarray:
+    """
+    Converts an RGB frame (or a band of one) to Y, Cb and Cr planes
+
+    Parameters
+    ----------
+    frame : numpy.ndarray
+        A (height, width, 3) array of uint8 RGB values
+
+    Returns
+    -------
+    planes : numpy.ndarray
+        A (3, height, width) array of uint8 Y, Cb and Cr values
+    """
+    # BT.601 studio-range conversion in 8-bit fixed point
+    rgb = frame.astype(np.int32)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+    planes = np.empty((3,) + frame.shape[:2], dtype=np.int32)
+    for plane, (r_weight, g_weight, b_weight, offset) in zip(planes, YCBCR):
+        np.multiply(r, r_weight, out=plane)
+        plane += g_weight * g
+        plane += b_weight * b
+        plane += 128 # Round to the nearest value
+        plane >>= 8
+        plane += offset
+
+    return planes.astype(np.uint8)
+
+def encode_raw(frame: np.ndarray) -> bytes:
+    """
+    Encodes an RGB frame as packed rgb24 rawvideo
+
+    Parameters
+    ----------
+    frame : numpy.ndarray
+        A (height, width, 3) array of uint8 RGB values
+
+    Returns
+    -------
+    data : bytes
+        The frame's pixels, row after row
+    """
+    return frame.tobytes()
+
+class FrameExporter:
+    """
+    Encodes frames on a pool of worker threads and writes them to disk.
+
+    Frames are handed over through a bounded queue, so rendering only stalls
+    when the encoders fall behind far enough to fill it. PNG frames are written
+    to separate files by whichever worker encoded them, while Y4M and raw
+    frames are put back in order before they are appended to a single stream.
+    Every frame holds a slot until it's on disk, which bounds memory no matter
+    how long the clip is.
+
+    Attributes
+    ----------
+    path : str
+        The directory (for PNG) or file (for Y4M and raw) to write to
+    format : str
+        One of 'png', 'y4m' or 'raw'
+    width : int
+        The width of the frames
+    height : int
+        The height of the frames
+    fps : int
+        The frame rate written to the Y4M header
+    frames : queue.Queue
+        The bounded queue of (index, frame) pairs waiting to be encoded
+    slots : threading.BoundedSemaphore
+        Limits how many frames can be queued, encoding or waiting to be written
+    workers : list[threading.Thread]
+        The threads encoding frames
+    stream : io.BufferedWriter
+        The file Y4M and raw frames are appended to (None for PNG)
+    pending : dict[int, bytes]
+        Encoded stream frames waiting for the frames before them
+    next_index : int
+        The index of the next frame to append to the stream
+    write_lock : threading.Lock
+        Guards the pending frames and the stream
+    submitted : int
+        The number of frames submitted so far
+    error : BaseException
+        The first error raised by a worker, re-raised to the caller
+    """
+
+    FORMATS = {
+        'png': encode_png,
+        'y4m': encode_y4m,
+        'raw': encode_raw
+    }
+
+    def __init__(
+            self,
+            path: str,
+            format: str = 'png',
+            width: int = 800,
+            height: int = 600,
+            fps: int = 30,
+            workers: int = None,
+            queue_size: int = 16):
+        """
+        Opens the output and starts the worker threads
+
+        Parameters
+        ----------
+        path : str
+            The directory (for PNG) or file (for Y4M and raw) to write to
+        format : str
+            One of 'png', 'y4m' or 'raw' (default 'png')
+        width : int
+            The width of the frames (default 800)
+        height : int
+            The height of the frames (default 600)
+        fps : int
+            The frame rate of the clip (default 30)
+        workers : int
+            The number of encoding threads (default the number of CPUs)
+        queue_size : int
+            The most frames waiting to be encoded (default 16)
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown export format {format!r}")
+
+        self.path: str = path
+        self.format: str = format
+        self.width: int = width
+        self.height: int = height
+        self.fps: int = fps
+
+        worker_count = workers or os.cpu_count() or 1
+        self.frames: queue.Queue = queue.Queue(queue_size)
+        self.slots: threading.BoundedSemaphore = threading.BoundedSemaphore(
+                                                    queue_size + worker_count
+                                                )
+
+        self.stream = None
+        self.pending: dict[int, bytes] = {}
+        self.next_index: int = 0
+        self.write_lock: threading.Lock = threading.Lock()
+        self.submitted: int = 0
+        self.error: BaseException = None
+
+        self.open_output()
+
+        self.workers: list[threading.Thread] = [
+            threading.Thread(target=self.work, daemon=True)
+            for _ in range(worker_count)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def open_output(self) -> None:
+        """Creates the PNG directory, or opens the stream and writes its header"""
+        if self.format == 'png':
+            os.makedirs(self.path, exist_ok=True)
+            return
+
+        self.stream = open(self.path, 'wb')
+        if self.format == 'y4m':
+            self.stream.write(y4m_header(self.width, self.height, self.fps))
+
+    def submit(self, frame: np.ndarray) -> None:
+        """
+        Queues a frame for encoding, waiting only if the queue is full
+
+        Parameters
+        ----------
+        frame : numpy.ndarray
+            A (height, width, 3) array of uint8 RGB values (it must not be
+            modified afterwards)
+        """
+        # Wait for a free slot, giving up if a worker has failed meanwhile
+        while not self.slots.acquire(timeout=0.1):
+            if self.error is not None:
+                raise self.error
+        if self.error is not None:
+            raise self.error
+
+        self.frames.put((self.submitted, frame))
+        self.submitted += 1
+
+    def work(self) -> None:
+        """Encodes and writes queued frames until a stop marker comes through"""
+        encode = self.FORMATS[self.format]
+        while True:
+            item = self.frames.get()
+            if item is None:
+                return
+
+            index, frame = item
+            try:
+                data = encode(frame)
+                if self.stream is None:
+                    self.write_file(index, data)
+                    self.slots.release()
+                else:
+                    self.write_stream(index, data)
+            except BaseException as error:
+                # Keep the first error so the renderer can raise it
+                if self.error is None:
+                    self.error = error
+                self.slots.release()
+
+    def write_file(self, index: int, data: bytes) -> None:
+        """
+        Writes an encoded frame to its own numbered file
+
+        Parameters
+        ----------
+        index : int
+            The index of the frame
+        data : bytes
+            The encoded frame
+        """
+        file_path = os.path.join(self.path, f"frame_{index:06d}.{self.format}")
+        with open(file_path, 'wb') as file:
+            file.write(data)
+
+    def write_stream(self, index: int, data: bytes) -> None:
+        """
+        Appends encoded frames to the stream in order
+
+        Parameters
+        ----------
+        index : int
+            The index of the frame
+        data : bytes
+            The encoded frame
+        """
+        with self.write_lock:
+            self.pending[index] = data
+
+            # Write every frame that is next in line
+            while self.next_index in self.pending:
+                self.stream.write(self.pending.pop(self.next_index))
+                self.next_index += 1
+                self.slots.release()
+
+    def close(self) -> None:
+        """Waits for every frame to be written and closes the output"""
+        for _ in self.workers:
+            self.frames.put(None)
+        for worker in self.workers:
+            worker.join()
+
+        if self.stream is not None:
+            self.stream.close()
+
+        if self.error is not None:
+            raise self.error
+
+def export_clip(
+        path: str,
+        format: str = 'png',
+        seconds: float = 10.0,
+        fps: int = 30,
+        config: Config = None,
+        workers: int = None,
+        queue_size: int = 16,
+        seed: int | random.Random | np.random.Generator = None) -> float:
+    """
+    Renders a clip of the stadium through the Artist pipeline and exports it
+
+    Parameters
+    ----------
+    path : str
+        The directory (for PNG) or file (for Y4M and raw) to write to
+    format : str
+        One of 'png', 'y4m' or 'raw' (default 'png')
+    seconds : float
+        The length of the clip (default 10.0)
+    fps : int
+        The frame rate of the clip (default 30)
+    config : Config
+        The Config to render with (default a new Config)
+    workers : int
+        The number of encoding threads (default the number of CPUs)
+    queue_size : int
+        The most frames waiting to be encoded (default 16)
+    seed : int | random.Random | numpy.random.Generator
+        The seed of the sky, so the same seed exports the same clip
+        (default None, for a different sky every time)
+
+    Returns
+    -------
+    speed : float
+        How many times faster than real time the clip was exported
+    """
+    renderer = HeadlessRenderer(config, fps=fps, seed=seed)
+    screen = renderer.handler.screen
+    exporter = FrameExporter(
+        path,
+        format,
+        screen.get_width(),
+        screen.get_height(),
+        fps,
+        workers,
+        queue_size
+    )
+
+    start = time.perf_counter()
+    try:
+        for frame in renderer.frames(round(seconds * fps)):
+            exporter.submit(frame)
+    finally:
+        exporter.close()
+        renderer.quit()
+
+    return seconds / (time.perf_counter() - start)
+
+async def encode_async(
+        surface: pygame.Surface,
+        format: str,
+        band_rows: int = BAND_ROWS) -> bytes:
+    """
+    Encodes a surface a band of rows at a time, letting the event loop run
+    other coroutines between the bands
+
+    Parameters
+    ----------
+    surface : pygame.Surface
+        The surface to encode, which mustn't change until it's encoded
+    format : str
+        One of 'png', 'y4m' or 'raw'
+    band_rows : int
+        How many rows to encode between two yields (default BAND_ROWS)
+
+    Returns
+    -------
+    data : bytes
+        The same data FrameExporter.FORMATS[format] returns for the frame
+    """
+    width, height = surface.get_size()
+    parts = []
+    if format == 'png':
+        compressor = zlib.compressobj(1)
+    elif format == 'y4m':
+        planes = np.empty((3, height, width), dtype=np.uint8)
+
+    for top in range(0, height, band_rows):
+        rows = min(band_rows, height - top)
+        band = surface_array(surface.subsurface((0, top, width, rows)))
+        if format == 'png':
+            parts.append(compressor.compress(png_rows(band).tobytes()))
+        elif format == 'y4m':
+            planes[:, top:top + rows] = ycbcr_planes(band)
+        else:
+            parts.append(band.tobytes())
+        await asyncio.sleep(0)
+
+    if format == 'png':
+        parts.append(compressor.flush())
+        return png_file(width, height, b''.join(parts))
+    if format == 'y4m':
+        return b'FRAME\n' + planes.tobytes()
+    return b''.join(parts)
+
+async def record_async(
+        handler,
+        path: str,
+        format: str = 'y4m',
+        frame_count: int = None) -> int:
+    """
+    Records the frames the asyncio game loop shows, as a coroutine
+
+    Every frame is copied in one blit right after it's shown, on the game
+    loop's own thread, so nothing runs in parallel and there's nothing to
+    lock. The copy is then encoded a band of rows at a time, letting the
+    game loop render between the bands, so recording doesn't push back the
+    next frame deadlines. The tradeoff is that frames shown while the last
+    one is still being encoded and written are not recorded: when the
+    renderer and the encoder together need more than a frame's time, the
+    recording drops frames (and plays back faster) instead of the game
+    stuttering. Y4M and raw encode fastest and drop the fewest frames, while
+    PNG's larger bands take the longest between two yields.
+
+    Parameters
+    ----------
+    handler : PygameHandler
+        The handler running game_loop_async
+    path : str
+        The directory (for PNG) or file (for Y4M and raw) to write to
+    format : str
+        One of 'png', 'y4m' or 'raw' (default 'y4m')
+    frame_count : int
+        How many frames to record (default None, until cancelled)
+
+    Returns
+    -------
+    written : int
+        The number of frames written
+    """
+    if format not in FrameExporter.FORMATS:
+        raise ValueError(f"Unknown export format {format!r}")
+    width, height = handler.screen.get_size()
+    # The shown frame is copied here, so the game loop can draw the next one
+    snapshot = handler.screen.copy()
+
+    stream = None
+    if format == 'png':
+        os.makedirs(path, exist_ok=True)
+    else:
+        stream = open(path, 'wb')
+        if format == 'y4m':
+            stream.write(y4m_header(width, height, handler.refresh_rate or 60))
+
+    written = 0
+    try:
+        while frame_count is None or written < frame_count:
+            await handler.next_frame()
+            snapshot.blit(handler.screen, (0, 0))
+            data = await encode_async(snapshot, format)
+            if stream is None:
+                file_path = os.path.join(path, f"frame_{written:06d}.png")
+                with open(file_path, 'wb') as file:
+                    file.write(data)
+            else:
+                stream.write(data)
+            written += 1
+    finally:
+        if stream is not None:
+            stream.close()
+    return written
+
+def main() -> None:
+    """Exports a clip of the stadium animation"""
+    parser = argparse.ArgumentParser(
+        description="Export the stadium animation as video"
+    )
+    parser.add_argument(
+        'path',
+        help="The directory (for png) or file (for y4m and raw) to write to"
+    )
+    parser.add_argument(
+        '--format', choices=sorted(FrameExporter.FORMATS), default='png',
+        help="The output format (default png)"
+    )
+    parser.add_argument(
+        '--seconds', type=float, default=10.0,
+        help="The length of the clip (default 10)"
+    )
+    parser.add_argument(
+        '--fps', type=int, default=30,
+        help="The frame rate of the clip (default 30)"
+    )
+    parser.add_argument(
+        '--workers', type=int,
+        help="The number of encoding threads (default the number of CPUs)"
+    )
+    parser.add_argument(
+        '--queue-size', type=int, default=16,
+        help="The most frames waiting to be encoded (default 16)"
+    )
+    parser.add_argument(
+        '--seed', type=int,
+        help="Seed the sky so the same seed exports the same clip"
+    )
+    parser.add_argument(
+        '--night', action='store_true',
+        help="Render at night instead of during the day"
+    )
+    parser.add_argument(
+        '--lights-off', action='store_true',
+        help="Render with the lights turned off"
+    )
+    args = parser.parse_args()
+
+    config = Config()
+    if args.night:
+        config.switch_day()
+    if args.lights_off:
+        config.switch_light()
+
+    speed = export_clip(
+        args.path,
+        args.format,
+        args.seconds,
+        args.fps,
+        config,
+        args.workers,
+        args.queue_size,
+        args.seed
+    )
+    print(f"Exported {args.seconds:g} s to {args.path} at {speed:.1f}x real time")
+
+if __name__ == '__main__':
+    main()
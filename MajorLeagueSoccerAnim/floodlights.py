@@ -0,0 +1,209 @@
+import numpy as np
+import pygame
+
+# File Imports
+from artist import Artist
+
+class FloodLights:
+    """
+    The pools of light the pole floodlights throw onto the pitch at night.
+
+    Every bulb drawn by Artist.draw_lights shines a faint cone down onto the
+    pitch, where it lights an elliptical pool that is smaller the farther
+    away it lands. All of that is worked out once per resolution into a
+    grayscale light map (at a fraction of the resolution, then smoothly
+    scaled up, since it's only gradients), tinted once per light color with
+    a BLEND_RGB_MULT fill, and added onto the frame with a single BLEND_RGB_ADD
+    blit. Switching the lights on or off only decides whether that blit
+    happens, so nothing is ever recomputed per pixel.
+
+    Attributes
+    ----------
+    masks : dict[tuple, pygame.Surface]
+        The grayscale light map of every resolution
+    rects : dict[tuple, pygame.Rect]
+        The region every resolution's light map covers
+    layers : dict[tuple, pygame.Surface]
+        The tinted light map of every (resolution, light color)
+    """
+
+    # The size of the scene the bulbs and pools are laid out in
+    SCENE_SIZE = (800, 600)
+    # How much coarser the light map is worked out before it's scaled up
+    SCALE = 4
+    # Where the bulbs aim: the pitch row each row of bulbs lights (the
+    # lower bulbs light the near side), how far the pools are spread around
+    # the pole's own aim, and how far the poles aim in from the sides
+    TARGET_Y = (450, 320)
+    SPREAD = 2.5
+    AIM_IN = 0.7
+    # Where the pitch would vanish, which shrinks the farther pools
+    HORIZON_Y = 180
+    # The horizontal and vertical radius of a pool on the near side
+    POOL_SIZE = (140, 50)
+    # The radius of a cone where it leaves the bulb and where it lands
+    BEAM_WIDTH = (6, 50)
+    # The most a pool and a cone add to every channel
+    POOL_BRIGHTNESS = 90
+    BEAM_BRIGHTNESS = 28
+
+    def __init__(self):
+        """Creates the floodlights without working out any light map"""
+        self.masks: dict[tuple, pygame.Surface] = {}
+        self.rects: dict[tuple, pygame.Rect] = {}
+        self.layers: dict[tuple, pygame.Surface] = {}
+
+    def aims(self) -> list[tuple]:
+        """
+        Returns where every bulb is and where on the pitch it aims
+
+        Returns
+        -------
+        aims : list[tuple]
+            The ((x, y) bulb center, (x, y) target) of every bulb
+        """
+        center_x = self.SCENE_SIZE[0] / 2
+        half = Artist.BULB_SIZE / 2
+        aims = []
+        for left, rows in Artist.LIGHT_POLES:
+            pole_x = left + 50
+            # Each pole aims toward the middle, and its bulbs fan out from there
+            aim_x = pole_x + (center_x - pole_x) * self.AIM_IN
+            for target_y, bulbs in zip(self.TARGET_Y, rows):
+                for bulb_left, bulb_top in bulbs:
+                    bulb = (bulb_left + half, bulb_top + half)
+                    target = (aim_x + (bulb[0] - pole_x) * self.SPREAD, target_y)
+                    aims.append((bulb, target))
+        return aims
+
+    def light_map(self, size: tuple) -> np.ndarray:
+        """
+        Works out how brightly every pixel is lit
+
+        Parameters
+        ----------
+        size : tuple
+            The (width, height) of the light map
+
+        Returns
+        -------
+        light : numpy.ndarray
+            A (width, height) array of uint8 values to add to every channel
+        """
+        width, height = size
+        scene_width, scene_height = self.SCENE_SIZE
+        x = (np.arange(width, dtype=np.float32) + 0.5) * (scene_width / width)
+        y = (np.arange(height, dtype=np.float32) + 0.5) * (scene_height / height)
+        x, y = x[:, np.newaxis], y[np.newaxis, :]
+
+        pools = np.zeros(size, dtype=np.float32)
+        beams = np.zeros(size, dtype=np.float32)
+        pool_width, pool_height = self.POOL_SIZE
+        beam_start, beam_end = self.BEAM_WIDTH
+        for (bulb_x, bulb_y), (target_x, target_y) in self.aims():
+            # Farther pools are smaller
+            depth = (target_y - self.HORIZON_Y) / (self.TARGET_Y[0] - self.HORIZON_Y)
+            falloff = (
+                ((x - target_x) / (pool_width * depth)) ** 2
+                + ((y - target_y) / (pool_height * depth)) ** 2
+            )
+            pools += np.maximum(1 - falloff, 0) ** 2
+
+            # How far along the cone and how far off its axis every pixel is
+            axis_x, axis_y = target_x - bulb_x, target_y - bulb_y
+            length = np.hypot(axis_x, axis_y)
+            along = ((x - bulb_x) * axis_x + (y - bulb_y) * axis_y) / length**2
+            off = np.abs((x - bulb_x) * axis_y - (y - bulb_y) * axis_x) / length
+            radius = beam_start + np.clip(along, 0, 1) * (beam_end - beam_start)
+            inside = (along > 0) & (along < 1)
+            beams += inside * np.maximum(1 - off / radius, 0) * (1 - along / 2)
+
+        # Overlapping pools saturate instead of clipping
+        light = (
+            (1 - np.exp(-pools)) * self.POOL_BRIGHTNESS
+            + np.minimum(beams, 1) * self.BEAM_BRIGHTNESS
+        )
+        return np.minimum(light, 255).astype(np.uint8)
+
+    def mask(self, size: tuple) -> pygame.Surface:
+        """
+        Returns the grayscale light map of a resolution, working it out the
+        first time
+
+        Parameters
+        ----------
+        size : tuple
+            The (width, height) of the surface the light falls on
+
+        Returns
+        -------
+        mask : pygame.Surface
+            The light map, in gray
+        """
+        mask = self.masks.get(size)
+        if mask is None:
+            coarse_size = (
+                max(size[0] // self.SCALE, 1),
+                max(size[1] // self.SCALE, 1)
+            )
+            light = self.light_map(coarse_size)
+            coarse = pygame.surfarray.make_surface(
+                np.repeat(light[:, :, np.newaxis], 3, axis=2)
+            )
+            mask = pygame.transform.smoothscale(coarse, size).convert()
+            self.masks[size] = mask
+
+            # Only the lit region is ever blended
+            lit = pygame.surfarray.pixels_red(mask)
+            columns = np.flatnonzero(lit.any(axis=1))
+            rows = np.flatnonzero(lit.any(axis=0))
+            del lit # Unlock the surface
+            self.rects[size] = pygame.Rect(
+                columns[0],
+                rows[0],
+                columns[-1] + 1 - columns[0],
+                rows[-1] + 1 - rows[0]
+            )
+        return mask
+
+    def layer(self, size: tuple, light_color: tuple) -> pygame.Surface:
+        """
+        Returns the light map tinted by the bulbs, tinting it the first time
+
+        Parameters
+        ----------
+        size : tuple
+            The (width, height) of the surface the light falls on
+        light_color : tuple
+            A tuple representing the (R, G, B) values of the light's color
+
+        Returns
+        -------
+        layer : pygame.Surface
+            The tinted light map
+        """
+        key = (size, light_color)
+        layer = self.layers.get(key)
+        if layer is None:
+            layer = self.mask(size).copy()
+            # Floodlights are a warm white, only partly taking the bulb's color
+            tint = tuple((channel + 255) // 2 for channel in light_color)
+            layer.fill(tint, special_flags=pygame.BLEND_RGB_MULT)
+            self.layers[key] = layer
+        return layer
+
+    def draw(self, surface: pygame.Surface, light_color: tuple) -> None:
+        """
+        Adds the light onto the surface with a single blit
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface the light falls on
+        light_color : tuple
+            A tuple representing the (R, G, B) values of the light's color
+        """
+        size = surface.get_size()
+        layer = self.layer(size, light_color)
+        rect = self.rects[size]
+        surface.blit(layer, rect, rect, special_flags=pygame.BLEND_RGB_ADD)
@@ -0,0 +1,125 @@
+import asyncio
+from collections import deque
+
+import numpy as np
+
+class FramePacer:
+    """
+    Paces frames to evenly spaced deadlines with awaitable sleeps.
+
+    Where clock.tick blocks the whole thread until the next frame is due,
+    wait() awaits asyncio.sleep, so other coroutines (feeds, writers,
+    control endpoints) run while the renderer waits. How late every frame
+    starts after its deadline is kept, so coroutines that hog the event loop
+    and starve rendering show up as jitter.
+
+    Attributes
+    ----------
+    period : float
+        The time between two frame deadlines, in seconds (0 for uncapped)
+    deadline : float
+        When the next frame is due, in event loop time (None until the
+        first frame or after a reset)
+    lateness : collections.deque
+        How late each of the last `window` frames started, in seconds
+    frames : int
+        The number of frames paced so far
+    late_frames : int
+        The number of frames that started later than LATE_AFTER
+    """
+
+    # A frame starting later than this after its deadline is late (seconds)
+    LATE_AFTER = 0.002
+
+    def __init__(self, refresh_rate: int = 60, window: int = 600):
+        """
+        Creates a pacer without any deadline yet
+
+        Parameters
+        ----------
+        refresh_rate : int
+            The frames per second to pace to, 0 for uncapped (default 60)
+        window : int
+            The number of frames the statistics cover (default 600)
+        """
+        self.period: float = 1 / refresh_rate if refresh_rate else 0.0
+        self.deadline: float = None
+        self.lateness: deque = deque(maxlen=window)
+        self.frames: int = 0
+        self.late_frames: int = 0
+
+    def reset(self) -> None:
+        """Forgets the deadline, so time spent idle isn't counted as lateness"""
+        self.deadline = None
+
+    async def wait(self) -> None:
+        """
+        Sleeps until the next frame is due
+
+        Uncapped frames still yield to the event loop once, so the other
+        coroutines keep running. A frame that overran its deadline by more
+        than a whole period starts the deadlines over instead of rushing
+        through frames to catch up.
+        """
+        if not self.period:
+            await asyncio.sleep(0)
+            return
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.period
+        await asyncio.sleep(max(self.deadline - now, 0))
+
+        lateness = loop.time() - self.deadline
+        self.lateness.append(lateness)
+        self.frames += 1
+        if lateness > self.LATE_AFTER:
+            self.late_frames += 1
+        if lateness > self.period:
+            self.deadline = loop.time()
+
+    @property
+    def late_share(self) -> float:
+        """
+        Returns the share of recent frames that started late
+
+        Returns
+        -------
+        share : float
+            From 0 to 1 (None before the first paced frame)
+        """
+        if not self.lateness:
+            return None
+        late = sum(1 for lateness in self.lateness if lateness > self.LATE_AFTER)
+        return late / len(self.lateness)
+
+    def percentiles(self) -> tuple:
+        """
+        Returns the rolling p50, p95 and p99 lateness of the frame deadlines
+
+        Returns
+        -------
+        percentiles : tuple[float, float, float]
+            The (p50, p95, p99) lateness in milliseconds
+        """
+        if not self.lateness:
+            return (0.0, 0.0, 0.0)
+        return tuple(np.percentile(self.lateness, (50, 95, 99)) * 1000)
+
+    def report(self) -> str:
+        """
+        Returns a line summing up the jitter of the frame deadlines
+
+        Returns
+        -------
+        report : str
+            The lateness percentiles and how many frames were late
+        """
+        p50, p95, p99 = self.percentiles()
+        return (
+            f"Frame deadline lateness p50 {p50:.2f} ms, p95 {p95:.2f} ms, "
+            f"p99 {p99:.2f} ms; {self.late_frames} of {self.frames} frames "
+            f"more than {self.LATE_AFTER * 1000:g} ms late"
+        )
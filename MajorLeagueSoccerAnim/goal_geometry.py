@@ -0,0 +1,72 @@
+# The coordinates of the goal, shared by Artist.draw_goal/draw_net and the
+# ball physics, so what is drawn is exactly what balls collide with.
+# Every line is a ((x1, y1), (x2, y2), width) tuple
+
+# The goal's border, drawn as a rect outline
+GOAL_RECT = (320, 140, 160, 80)
+GOAL_BORDER_WIDTH = 5
+
+# The goal's bottom, lying on the ground
+GOAL_BOTTOM_LINES = [
+    ((340, 200), (460, 200), 3), # Bottom Center
+    ((320, 220), (340, 200), 3), # Bottom Left
+    ((480, 220), (460, 200), 3) # Bottom Right
+]
+
+# The goal's stands, from the top corners to the back of the bottom
+GOAL_STAND_LINES = [
+    ((320, 140), (340, 200), 3), # Stand Left
+    ((480, 140), (460, 200), 3) # Stand Right
+]
+
+# The net inside the goal, in the order it's drawn
+NET_LINES = (
+    # DOWN
+    # CENTER
+    # Left
+    [((320 + 5*i, 140), (338 + 3*i, 200), 1) for i in range(1, 9)]
+    # MidLeft
+    + [((360 + 4*i, 140), (361 + 4*i, 200), 1) for i in range(1, 5)]
+    # Mid
+    + [((380, 140), (380, 200), 1)]
+    + [((380 + 4*i, 140), (380 + 4*i, 200), 1) for i in range(1, 11)]
+    + [((424, 140), (423, 200), 1)]
+    # MidRight
+    + [((424 + 4*i, 140), (423 + 4*i, 200), 1) for i in range(1, 4)]
+    + [((440, 140), (438, 200), 1)]
+    # Right
+    + [((440 + 5*i, 140), (438 + 3*i, 200), 1) for i in range(1, 8)]
+
+    # LEFT
+    + [((320, 140), (322 + i*2, 218 - i*2), 1) for i in range(1, 9)]
+
+    # RIGHT
+    + [((480, 140), (478 - i*2, 218 - i*2), 1) for i in range(1, 9)]
+
+    # ACROSS
+    # TOP
+    + [((324, 140 + i*4), (476, 140 + i*4), 1) for i in range(1, 10)]
+    # MIDDLE
+    + [((335, 180), (470, 180), 1)]
+    # BOTTOM
+    + [((335, 180 + i*4), (465, 180 + i*4), 1) for i in range(1, 5)]
+)
+
+def goal_frame_lines() -> list[tuple]:
+    """
+    Returns the parts of the goal's frame a ball can hit
+
+    The goal line and the bottom lie on the ground, so balls roll over them
+
+    Returns
+    -------
+    lines : list[tuple]
+        The crossbar, the posts and the stands
+    """
+    x, y, width, height = GOAL_RECT
+    right, bottom = x + width, y + height
+    return [
+        ((x, y), (right, y), GOAL_BORDER_WIDTH), # Crossbar
+        ((x, y), (x, bottom), GOAL_BORDER_WIDTH), # Left Post
+        ((right, y), (right, bottom), GOAL_BORDER_WIDTH) # Right Post
+    ] + GOAL_STAND_LINES
@@ -1,14 +1,150 @@
+import argparse
+import asyncio
+
 # File imports
 from pygame_handler import PygameHandler
 from config import Config
 from artist import Artist
+from profiler import FrameProfiler
+from particles import ParticleSystem
+from control import ControlServer
+from exporter import FrameExporter, record_async
+
+def parse_args() -> argparse.Namespace:
+    """Parses the command line options of the game"""
+    parser = argparse.ArgumentParser(description="Major League Soccer")
+    parser.add_argument(
+        '--fps', type=int, default=60,
+        help="The most frames drawn per second, 0 for uncapped (default 60)"
+    )
+    parser.add_argument(
+        '--vsync', action='store_true',
+        help="Wait for the display's refresh when presenting frames"
+    )
+    parser.add_argument(
+        '--seed', type=int,
+        help="Seed the sky so every run starts from the same clouds and stars"
+    )
+    parser.add_argument(
+        '--indexed', action='store_true',
+        help="Render the sky and field with palettes, fading between day and night"
+    )
+    parser.add_argument(
+        '--parallax', action='store_true',
+        help="Draw the clouds as scrolling strips at several depths"
+    )
+    parser.add_argument(
+        '--preload-assets', action='store_true',
+        help="Decode the images on a background thread at startup"
+    )
+    parser.add_argument(
+        '--balls', type=int, default=1,
+        help="How many balls are shot at the goalie at once (default 1)"
+    )
+    parser.add_argument(
+        '--players', type=int, default=22,
+        help="How many players run on the pitch, thousands for a stress test "
+        "(about 3000 keep 60 fps on a single core; default 22)"
+    )
+    parser.add_argument(
+        '--crowd', type=float, default=0.7,
+        help="The share of seats in the stands that are taken (default 0.7)"
+    )
+    parser.add_argument(
+        '--weather', choices=ParticleSystem.MODES, default='off',
+        help="Start with rain, snow or confetti (W cycles through them)"
+    )
+    parser.add_argument(
+        '--particles', type=int, default=100_000,
+        help="How many particles the weather uses (default 100000)"
+    )
+    parser.add_argument(
+        '--feed', metavar='SOURCE',
+        help="Drive the scoreboard from live match data: a JSONL file to follow, "
+             "tcp://host:port or unix:///path"
+    )
+    parser.add_argument(
+        '--async', dest='use_async', action='store_true',
+        help="Run the game loop as an asyncio task, pacing frames with "
+             "awaitable sleeps, and report the frame deadline jitter on exit"
+    )
+    parser.add_argument(
+        '--control', metavar='ADDRESS',
+        help="With --async, accept commands (light, day, hud, pause, weather, "
+             "stats, quit) on tcp://host:port or unix:///path"
+    )
+    parser.add_argument(
+        '--record', metavar='PATH',
+        help="With --async, write every shown frame to PATH"
+    )
+    parser.add_argument(
+        '--record-format', choices=sorted(FrameExporter.FORMATS), default='y4m',
+        help="The format --record writes (default y4m)"
+    )
+    parser.add_argument(
+        '--paused', action='store_true',
+        help="Start with all motion paused, so the idle loop sleeps (space resumes)"
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help="Time every stage of each frame (press P to show the HUD)"
+    )
+    parser.add_argument(
+        '--trace', metavar='PATH',
+        help="Write a per-frame JSON (or .csv) trace to PATH on exit"
+    )
+    args = parser.parse_args()
+    if (args.control or args.record) and not args.use_async:
+        parser.error("--control and --record need --async")
+    return args
+
+async def run_async(handler: PygameHandler, args: argparse.Namespace) -> None:
+    """
+    Runs the game loop as an asyncio task next to the requested coroutines
 
-# Create the config and artist for the handler
-config = Config()
-artist = Artist()
-# Create the handler by using the config and artist
-handler = PygameHandler(config, artist)
+    Parameters
+    ----------
+    handler : PygameHandler
+        The handler to run
+    args : argparse.Namespace
+        The command line options
+    """
+    coroutines = []
+    if args.control:
+        coroutines.append(ControlServer(handler, args.control).serve())
+    if args.record:
+        coroutines.append(record_async(handler, args.record, args.record_format))
+    await handler.game_loop_async(*coroutines)
 
 if __name__ == '__main__':
+    args = parse_args()
+
+    # Create the config and artist for the handler
+    config = Config()
+    artist = Artist(args.seed)
+    profiler = FrameProfiler(enabled=args.profile, trace_path=args.trace)
+    # Create the handler by using the config, artist and options
+    handler = PygameHandler(
+        config,
+        artist,
+        profiler=profiler,
+        refresh_rate=args.fps,
+        vsync=args.vsync,
+        indexed=args.indexed,
+        paused=args.paused,
+        parallax=args.parallax,
+        preload_assets=args.preload_assets,
+        ball_count=args.balls,
+        player_count=args.players,
+        crowd_density=args.crowd,
+        particle_count=args.particles,
+        weather=args.weather,
+        feed_source=args.feed
+    )
+
     # Start the game
-    handler.game_loop()
\ No newline at end of file
+    if args.use_async:
+        asyncio.run(run_async(handler, args))
+        print(handler.frame_pacer.report())
+    else:
+        handler.game_loop()
@@ -0,0 +1,323 @@
+import argparse
+import random
+import time
+from typing import Iterator
+
+import numpy as np
+import pygame
+
+# File Imports
+from config import Config
+from artist import Artist
+from pygame_handler import PygameHandler
+from particles import ParticleSystem
+from match_feed import DemoFeed
+
+def surface_array(surface: pygame.Surface) -> np.ndarray:
+    """
+    Copies a surface's pixels into a NumPy array
+
+    Parameters
+    ----------
+    surface : pygame.Surface
+        The surface to copy, such as the screen
+
+    Returns
+    -------
+    frame : numpy.ndarray
+        A (height, width, 3) array of uint8 RGB values
+    """
+    return np.frombuffer(
+        pygame.image.tobytes(surface, 'RGB'),
+        dtype=np.uint8
+    ).reshape(surface.get_height(), surface.get_width(), 3)
+
+class HeadlessRenderer:
+    """
+    Renders the stadium offscreen, without a window or a display server.
+
+    The renderer drives a headless PygameHandler (which uses SDL's dummy video
+    driver) as fast as possible, skipping the clock_tick throttle, and returns
+    each frame as a NumPy array.
+
+    Attributes
+    ----------
+    handler : PygameHandler
+        The headless handler that simulates and draws the frames
+    frame_count : int
+        The number of frames rendered so far
+    frame_seconds : float
+        The simulated time between two frames, in seconds
+    """
+
+    def __init__(
+            self,
+            config: Config = None,
+            artist: Artist = None,
+            fps: int = 60,
+            seed: int | random.Random | np.random.Generator = None,
+            indexed: bool = False,
+            parallax: bool = False,
+            ball_count: int = 1,
+            player_count: int = 22,
+            crowd_density: float = 0.7,
+            particle_count: int = 100_000,
+            weather: str = 'off',
+            feed_source: str = None):
+        """
+        Creates the headless handler
+
+        Parameters
+        ----------
+        config : Config
+            The Config to render with (default a new Config)
+        artist : Artist
+            The Artist to render with (default a new Artist)
+        fps : int
+            The frame rate of the rendered frames in simulated time,
+            no matter how quickly they are actually rendered (default 60)
+        seed : int | random.Random | numpy.random.Generator
+            The seed of the new Artist, so the same seed renders the same
+            frames bit for bit (ignored if an Artist is given)
+        indexed : bool
+            Whether or not to render in palette-indexed mode (default False)
+        parallax : bool
+            Whether or not to draw the clouds as parallax strips (default False)
+        ball_count : int
+            How many balls are shot at the goalie at once (default 1)
+        player_count : int
+            How many players run on the pitch (default 22)
+        crowd_density : float
+            The share of seats in the stands that are taken (default 0.7)
+        particle_count : int
+            How many particles the weather pool holds (default 100_000)
+        weather : str
+            The weather, one of ParticleSystem.MODES (default 'off')
+        feed_source : str
+            Where live match data for the scoreboard comes from
+            (default None, which shows the shootout)
+        """
+        self.handler: PygameHandler = PygameHandler(
+                                                    config or Config(),
+                                                    artist or Artist(seed),
+                                                    headless=True,
+                                                    indexed=indexed,
+                                                    parallax=parallax,
+                                                    ball_count=ball_count,
+                                                    player_count=player_count,
+                                                    crowd_density=crowd_density,
+                                                    particle_count=particle_count,
+                                                    weather=weather,
+                                                    feed_source=feed_source
+                                                )
+        self.frame_count: int = 0
+        self.frame_seconds: float = 1 / fps
+
+        # There's no game loop to start reading the feed
+        if self.handler.feed is not None:
+            self.handler.feed.start()
+
+    def step(self) -> None:
+        """Simulates and draws the next frame onto the offscreen surface"""
+        self.handler.profiler.begin_frame()
+        # Frames are a fixed simulated time apart, however long they take
+        self.handler.update_simulation(self.frame_seconds)
+        self.handler.render_frame()
+        self.handler.profiler.end_frame()
+
+        # The frame counts as shown once it's drawn
+        if self.handler.feed is not None:
+            self.handler.feed.mark_shown()
+
+        # Nothing is presented, so forget what changed
+        self.handler.artist.dirty_rects.clear()
+        self.frame_count += 1
+
+    def frame_array(self) -> np.ndarray:
+        """
+        Returns the current frame as a NumPy array
+
+        Returns
+        -------
+        frame : numpy.ndarray
+            A (height, width, 3) array of uint8 RGB values
+        """
+        return surface_array(self.handler.screen)
+
+    def frames(self, count: int) -> Iterator[np.ndarray]:
+        """
+        Renders frames one after the other, yielding each one as an array
+
+        Parameters
+        ----------
+        count : int
+            The number of frames to render
+
+        Yields
+        ------
+        frame : numpy.ndarray
+            A (height, width, 3) array of uint8 RGB values
+        """
+        for _ in range(count):
+            self.step()
+            yield self.frame_array()
+
+    def render_frames(self, count: int) -> list[np.ndarray]:
+        """
+        Renders a number of frames and returns all of them
+
+        Parameters
+        ----------
+        count : int
+            The number of frames to render
+
+        Returns
+        -------
+        frames : list[numpy.ndarray]
+            The rendered frames, as (height, width, 3) arrays
+        """
+        return list(self.frames(count))
+
+    def measure_throughput(self, count: int, arrays: bool = True) -> float:
+        """
+        Renders frames as fast as possible and reports the frame rate
+
+        Parameters
+        ----------
+        count : int
+            The number of frames to render
+        arrays : bool
+            Whether or not to include copying each frame into an array
+            (default True)
+
+        Returns
+        -------
+        fps : float
+            The number of frames rendered per second
+        """
+        start = time.perf_counter()
+        for _ in range(count):
+            self.step()
+            if arrays:
+                self.frame_array()
+        return count / (time.perf_counter() - start)
+
+    def quit(self) -> None:
+        """Quits the Pygame instance behind the renderer"""
+        self.handler.quit()
+
+def main() -> None:
+    """Reports how many frames per second can be rendered headlessly"""
+    parser = argparse.ArgumentParser(
+        description="Measure headless rendering throughput"
+    )
+    parser.add_argument(
+        '--frames', type=int, default=600,
+        help="The number of frames to render"
+    )
+    parser.add_argument(
+        '--night', action='store_true',
+        help="Render at night instead of during the day"
+    )
+    parser.add_argument(
+        '--lights-off', action='store_true',
+        help="Render with the lights turned off"
+    )
+    parser.add_argument(
+        '--seed', type=int,
+        help="Seed the sky so every run renders the same frames"
+    )
+    parser.add_argument(
+        '--indexed', action='store_true',
+        help="Render the sky and field as palette-indexed layers"
+    )
+    parser.add_argument(
+        '--parallax', action='store_true',
+        help="Draw the clouds as scrolling strips at several depths"
+    )
+    parser.add_argument(
+        '--balls', type=int, default=1,
+        help="How many balls are shot at the goalie at once (default 1)"
+    )
+    parser.add_argument(
+        '--players', type=int, default=22,
+        help="How many players run on the pitch (default 22)"
+    )
+    parser.add_argument(
+        '--crowd', type=float, default=0.7,
+        help="The share of seats in the stands that are taken (default 0.7)"
+    )
+    parser.add_argument(
+        '--weather', choices=ParticleSystem.MODES, default='off',
+        help="Render with rain, snow or confetti (default off)"
+    )
+    parser.add_argument(
+        '--particles', type=int, default=100_000,
+        help="How many particles the weather uses (default 100000)"
+    )
+    parser.add_argument(
+        '--feed', metavar='SOURCE',
+        help="Drive the scoreboard from live match data and report its latency"
+    )
+    parser.add_argument(
+        '--demo-feed', type=float, metavar='RATE',
+        help="Serve a stand-in feed to --feed at RATE events per second"
+    )
+    parser.add_argument(
+        '--no-arrays', action='store_true',
+        help="Skip copying each frame into a NumPy array"
+    )
+    args = parser.parse_args()
+
+    config = Config()
+    if args.night:
+        config.switch_day()
+    if args.lights_off:
+        config.switch_light()
+
+    demo = None
+    if args.demo_feed is not None:
+        if args.feed is None:
+            parser.error("--demo-feed needs --feed")
+        demo = DemoFeed(args.feed, args.demo_feed, seed=args.seed)
+        demo.start()
+
+    renderer = HeadlessRenderer(
+        config,
+        seed=args.seed,
+        indexed=args.indexed,
+        parallax=args.parallax,
+        ball_count=args.balls,
+        player_count=args.players,
+        crowd_density=args.crowd,
+        particle_count=args.particles,
+        weather=args.weather,
+        feed_source=args.feed
+    )
+    feed = renderer.handler.feed
+    if feed is not None:
+        renderer.handler.profiler.enabled = True
+    fps = renderer.measure_throughput(args.frames, not args.no_arrays)
+
+    print(f"Rendered {args.frames} frames at {fps:.1f} frames per second")
+    if feed is not None:
+        frame = renderer.handler.profiler.percentiles('frame')
+        p50, p95, p99 = feed.percentiles()
+        print(
+            f"Frame time p50 {frame[0]:.2f} ms, p95 {frame[1]:.2f} ms, "
+            f"p99 {frame[2]:.2f} ms"
+        )
+        print(
+            f"Applied {feed.applied} of {feed.received} match events "
+            f"({feed.errors} invalid), latency from reading to display "
+            f"p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms"
+        )
+        if feed.error is not None:
+            print(f"The feed stopped reading: {feed.error!r}")
+
+    renderer.quit()
+    if demo is not None:
+        demo.close()
+
+if __name__ == '__main__':
+    main()
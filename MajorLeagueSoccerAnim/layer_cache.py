@@ -0,0 +1,247 @@
+import pygame
+
+# File Imports
+from colors import Color
+from config import Config
+from artist import Artist
+
+class LayerCache:
+    """
+    Caches pre-rendered copies of the static stadium geometry.
+
+    The field, fence, net, goal, poles, stands and flags never move, so they
+    are rendered once into a colorkeyed surface for every distinct
+    (field_color, stripe_color, light_color, dark) tuple coming from the
+    Config. The four day/light combinations therefore each get exactly one
+    surface, and drawing the field costs a single blit instead of hundreds of
+    draw calls. At night with the lights off, the darkness is baked into the
+    cached field and sky, so the full-screen darkness blit is never needed.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist whose draw_field method renders the static layer
+    width : int
+        The width of the cached layers
+    height : int
+        The height of the cached layers
+    layers : dict[tuple, pygame.Surface]
+        The rendered static layers, keyed by their Config color tuple
+    sky_layers : dict[tuple, pygame.Surface]
+        The rendered skies (with their stars and sun or moon), keyed by their
+        Config color tuple
+    drawn_key : tuple
+        The key of the layer that was drawn last
+    """
+
+    def __init__(self, artist: Artist, width: int, height: int):
+        """
+        Initializes an empty cache
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist whose draw_field method renders the static layer
+        width : int
+            The width of the cached layers
+        height : int
+            The height of the cached layers
+        """
+        self.artist: Artist = artist
+        self.width: int = width
+        self.height: int = height
+
+        self.layers: dict[tuple, pygame.Surface] = {}
+        self.sky_layers: dict[tuple, pygame.Surface] = {}
+        self.drawn_key: tuple = None
+
+    def layer_key(self, config: Config) -> tuple:
+        """
+        Returns the cache key describing the static layer for a Config
+
+        Only the Config values the static geometry depends on are part of the
+        key, so any other change will not trigger a rebuild
+
+        Parameters
+        ----------
+        config : Config
+            The Config to read the colors from
+
+        Returns
+        -------
+        key : tuple
+            A (field_color, stripe_color, light_color, dark) tuple
+        """
+        return (
+            config.field_color,
+            config.stripe_color,
+            config.light_color,
+            config.dark
+        )
+
+    def get_layer(self, config: Config) -> pygame.Surface:
+        """
+        Returns the static layer for the Config, rendering it on a cache miss
+
+        Parameters
+        ----------
+        config : Config
+            The Config to read the colors from
+
+        Returns
+        -------
+        layer : pygame.Surface
+            The colorkeyed surface holding the pre-rendered field
+        """
+        key = self.layer_key(config)
+
+        # Only render the field if we've never seen this combination before
+        layer = self.layers.get(key)
+        if layer is None:
+            layer = self.render_layer(*key)
+            self.layers[key] = layer
+
+        return layer
+
+    def render_layer(
+            self,
+            field_color: tuple,
+            stripe_color: tuple,
+            light_color: tuple,
+            dark: bool = False) -> pygame.Surface:
+        """
+        Renders the static geometry into a new colorkeyed surface
+
+        Parameters
+        ----------
+        field_color : tuple
+            A tuple representing the (R, G, B) values of the field's color
+        stripe_color : tuple
+            A tuple representing the (R, G, B) values of the stripe's color
+        light_color : tuple
+            A tuple representing the (R, G, B) values of the light's color
+        dark : bool
+            Whether or not to darken the field as the darkness overlay would
+            (default False)
+
+        Returns
+        -------
+        layer : pygame.Surface
+            The surface holding the rendered field
+        """
+        # Everything that isn't part of the field stays see-through
+        layer = pygame.Surface((self.width, self.height)).convert()
+        layer.fill(Color.COLOR_KEY)
+
+        self.artist.draw_field(layer, field_color, stripe_color, light_color)
+        if dark:
+            self.artist.darken_surface(layer, Color.COLOR_KEY)
+
+        # RLE acceleration makes the large transparent areas nearly free to blit
+        layer.set_colorkey(Color.COLOR_KEY, pygame.RLEACCEL)
+        return layer
+
+    def get_sky(self, config: Config) -> pygame.Surface:
+        """
+        Returns the sky for the Config, rendering it on a cache miss
+
+        Parameters
+        ----------
+        config : Config
+            The Config to read the colors from
+
+        Returns
+        -------
+        sky : pygame.Surface
+            The surface holding the sky, its stars and the sun or moon
+        """
+        key = (config.sky_color, config.day, config.dark)
+
+        sky = self.sky_layers.get(key)
+        if sky is None:
+            sky = self.render_sky(*key)
+            self.sky_layers[key] = sky
+
+        return sky
+
+    def render_sky(
+            self,
+            sky_color: tuple,
+            is_day: bool,
+            dark: bool) -> pygame.Surface:
+        """
+        Renders the sky, the stars and the sun or moon into a new surface
+
+        Parameters
+        ----------
+        sky_color : tuple
+            A tuple representing the (R, G, B) values of the sky's color
+        is_day : bool
+            A bool denoting whether or not it's day
+        dark : bool
+            Whether or not to darken the sky as the darkness overlay would
+
+        Returns
+        -------
+        sky : pygame.Surface
+            The surface holding the rendered sky
+        """
+        sky = pygame.Surface((self.width, self.height)).convert()
+        sky.fill(sky_color)
+
+        # Stars only show at night
+        if not is_day:
+            self.artist.draw_stars(sky)
+        self.artist.draw_sun_or_moon(sky, is_day, sky_color)
+
+        if dark:
+            self.artist.darken_surface(sky)
+        return sky
+
+    def draw_field(self, surface: pygame.Surface, config: Config) -> None:
+        """
+        Draws the cached static layer onto the surface
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the field onto
+        config : Config
+            The Config to read the colors from
+        """
+        surface.blit(self.get_layer(config), (0, 0))
+
+        # Report what changed if the layer differs from the last one drawn
+        key = self.layer_key(config)
+        if key != self.drawn_key:
+            self.report_change(self.drawn_key, key, config.day)
+            self.drawn_key = key
+
+    def report_change(
+            self,
+            old_key: tuple,
+            new_key: tuple,
+            is_day: bool) -> None:
+        """
+        Reports the regions that differ between two static layers
+
+        Parameters
+        ----------
+        old_key : tuple
+            The key of the layer that was drawn before
+        new_key : tuple
+            The key of the layer that is drawn now
+        is_day : bool
+            A bool denoting whether or not it's day
+        """
+        # If only the light color changed during the day, only the bulbs
+        # look different (at night the whole scene darkens or brightens too)
+        if is_day and old_key is not None and old_key[:2] == new_key[:2]:
+            self.artist.report_lights()
+        else:
+            self.artist.dirty_rects.mark_full()
+
+    def clear(self) -> None:
+        """Drops every cached layer so they are rebuilt on their next use"""
+        self.layers.clear()
+        self.sky_layers.clear()
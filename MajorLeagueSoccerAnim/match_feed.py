@@ -0,0 +1,832 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Iterator
+
+import numpy as np
+import pygame
+
+def parse_source(source: str) -> tuple:
+    """
+    Splits a feed source into its kind and address
+
+    Parameters
+    ----------
+    source : str
+        A JSONL file path, 'tcp://host:port' or 'unix:///path/to/socket'
+
+    Returns
+    -------
+    kind : str
+        One of 'file', 'tcp' or 'unix'
+    address : str | tuple
+        The file or socket path, or the (host, port) of a TCP socket
+    """
+    if source.startswith('tcp://'):
+        host, _, port = source[len('tcp://'):].rpartition(':')
+        if not host or not port.isdigit():
+            raise ValueError(f"Expected tcp://host:port, got {source!r}")
+        return 'tcp', (host, int(port))
+    if source.startswith('unix://'):
+        return 'unix', source[len('unix://'):]
+    return 'file', source
+
+def parse_event(data: dict) -> tuple:
+    """
+    Turns one event of the feed into a compact tuple
+
+    Parameters
+    ----------
+    data : dict
+        A decoded JSON object, one of {"type": "goal", "team": "home" | "away"},
+        {"type": "score", "home": int, "away": int} or
+        {"type": "clock", "seconds": float}
+
+    Returns
+    -------
+    event : tuple
+        ('goal', team index), ('score', home, away) or ('clock', seconds)
+
+    Raises
+    ------
+    ValueError
+        If the object isn't one of the events above
+    """
+    if not isinstance(data, dict):
+        raise ValueError("An event has to be a JSON object")
+
+    kind = data.get('type')
+    if kind == 'goal':
+        return ('goal', MatchFeed.TEAMS.index(data['team']))
+    if kind == 'score':
+        return ('score', int(data['home']), int(data['away']))
+    if kind == 'clock':
+        return ('clock', float(data['seconds']))
+    raise ValueError(f"Unknown event type {kind!r}")
+
+class MatchFeed:
+    """
+    A live feed of match data that drives the scoreboard without blocking.
+
+    A background thread (or, next to the asyncio game loop, a coroutine)
+    reads newline-delimited JSON events from a tailed file or a TCP or UNIX
+    socket, parses everything a read brought in with a single json.loads
+    call and hands the batch to the game loop through a bounded queue. When
+    the queue is full the reader waits (and the socket or file backs up), so
+    a flood of events never grows memory and never blocks the game loop.
+    Once per frame the game loop drains what arrived, folds it into a single
+    score and clock, and updates the scoreboard once, however many events
+    there were.
+
+    Every event is stamped when it's read, and once the frame showing it is
+    on screen the time since then is kept as its latency.
+
+    Attributes
+    ----------
+    source : str
+        Where the events come from (see parse_source)
+    kind : str
+        One of 'file', 'tcp' or 'unix'
+    address : str | tuple
+        The file or socket path, or the (host, port) of a TCP socket
+    batches : queue.Queue
+        The bounded queue of (read time, events) batches waiting to be applied
+    max_per_poll : int
+        The most events a single frame applies, so a backlog is caught up on
+        over a few frames instead of stalling one
+    home : int
+        The home team's goals
+    away : int
+        The away team's goals
+    clock : float
+        The match time of the newest clock event not applied yet (None if
+        there isn't one)
+    partial : bytes
+        The unfinished last line of the latest read
+    unshown : list[tuple]
+        The (read time, event count) of the batches applied but not on
+        screen yet
+    latencies : collections.deque
+        The last `window` latencies from reading an event to showing it,
+        in seconds
+    received : int
+        The number of events read so far
+    applied : int
+        The number of events applied so far
+    errors : int
+        The number of lines that weren't valid events
+    error : BaseException
+        The error that stopped the reader (None while it's fine)
+    stopping : threading.Event
+        Set when the reader should stop
+    wake_posted : bool
+        Whether or not the reader already woke up the game loop since the
+        last poll
+    thread : threading.Thread
+        The thread reading the feed (None until started)
+    """
+
+    # The teams, in the order of the score
+    TEAMS = ('home', 'away')
+    # Posted when events arrive, so an idle game loop wakes up to show them
+    WAKE_EVENT = pygame.USEREVENT
+    # How long the reader waits for data before checking whether to stop,
+    # and how long it waits before trying to reconnect (in seconds)
+    POLL_INTERVAL = 0.002
+    RETRY_INTERVAL = 0.5
+    # How much the reader takes in at once
+    READ_SIZE = 65536
+
+    def __init__(
+            self,
+            source: str,
+            max_pending: int = 64,
+            max_per_poll: int = 2048,
+            window: int = 10_000):
+        """
+        Creates the feed without starting to read it
+
+        Parameters
+        ----------
+        source : str
+            A JSONL file path, 'tcp://host:port' or 'unix:///path/to/socket'
+        max_pending : int
+            How many batches (each at most one read) can wait in the queue
+            (default 64)
+        max_per_poll : int
+            The most events a single frame applies (default 2048)
+        window : int
+            The number of latencies the statistics cover (default 10_000)
+        """
+        self.source: str = source
+        self.kind, self.address = parse_source(source)
+        self.batches: queue.Queue = queue.Queue(max_pending)
+        self.max_per_poll: int = max_per_poll
+
+        self.home: int = 0
+        self.away: int = 0
+        self.clock: float = None
+
+        self.unshown: list[tuple] = []
+        self.latencies: deque = deque(maxlen=window)
+        self.received: int = 0
+        self.applied: int = 0
+        self.errors: int = 0
+        self.error: BaseException = None
+
+        self.partial: bytes = b''
+        self.stopping: threading.Event = threading.Event()
+        self.wake_posted: bool = False
+        self.thread: threading.Thread = None
+
+    def start(self) -> None:
+        """Starts reading the feed on a background thread"""
+        self.thread = threading.Thread(
+            target=self.run,
+            name='match-feed',
+            daemon=True
+        )
+        self.thread.start()
+
+    def close(self) -> None:
+        """Stops the reader and waits for its thread to finish"""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self) -> None:
+        """Reads the feed until closed (runs on the reader thread)"""
+        reads = self.read_file() if self.kind == 'file' else self.read_socket()
+        try:
+            for data in reads:
+                received = time.perf_counter()
+                self.push(self.parse_lines(self.take_lines(data)), received)
+        except Exception as error:
+            self.error = error
+
+    async def run_async(self) -> None:
+        """
+        Reads the feed until cancelled, as a coroutine instead of a thread
+
+        The queue is filled without blocking, so this runs on the same event
+        loop as the asyncio game loop
+        """
+        if self.kind == 'file':
+            reads = self.read_file_async()
+        else:
+            reads = self.read_socket_async()
+        try:
+            async for data in reads:
+                received = time.perf_counter()
+                await self.push_async(
+                    self.parse_lines(self.take_lines(data)),
+                    received
+                )
+        except Exception as error:
+            self.error = error
+
+    def take_lines(self, data: bytes) -> list[bytes]:
+        """
+        Returns the lines a read completed
+
+        A line can be split between two reads, so an unfinished last line is
+        kept for the next one
+
+        Parameters
+        ----------
+        data : bytes
+            What was read (None when the stream started over, which drops
+            the unfinished line)
+
+        Returns
+        -------
+        lines : list[bytes]
+            The complete lines
+        """
+        if data is None:
+            self.partial = b''
+            return []
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        return lines
+
+    def follow_file(self) -> Iterator[bytes]:
+        """
+        Follows the end of the file, like `tail -f`
+
+        Only lines written after the feed started are read. If the file is
+        truncated, it's read again from the start, and if it isn't there
+        yet (or is deleted or rotated away), whichever file shows up at the
+        path next is read from the start.
+
+        Yields
+        ------
+        data : bytes
+            What was appended to the file, empty when there's nothing new
+            (so the caller waits a little) and None when it was truncated
+            or replaced
+        """
+        file = None
+        # Only a file that's there when the feed starts is followed from its end
+        from_end = True
+        try:
+            while True:
+                if file is None:
+                    try:
+                        file = open(self.address, 'rb')
+                    except FileNotFoundError:
+                        from_end = False
+                        yield b''
+                        continue
+                    if from_end:
+                        file.seek(0, os.SEEK_END)
+                        from_end = False
+
+                data = file.read(self.READ_SIZE)
+                if data:
+                    yield data
+                    continue
+
+                # Nothing new, so check for truncation or a new file first
+                try:
+                    stat = os.stat(self.address)
+                except FileNotFoundError:
+                    stat = None
+                if stat is None or stat.st_ino != os.fstat(file.fileno()).st_ino:
+                    file.close()
+                    file = None
+                    yield None
+                elif stat.st_size < file.tell():
+                    file.seek(0)
+                    yield None
+                yield b''
+        finally:
+            if file is not None:
+                file.close()
+
+    def read_file(self) -> Iterator[bytes]:
+        """
+        Follows the file until the feed is closed
+
+        Yields
+        ------
+        data : bytes
+            What was appended to the file (None when it was truncated)
+        """
+        for data in self.follow_file():
+            if self.stopping.is_set():
+                break
+            if data == b'':
+                self.stopping.wait(self.POLL_INTERVAL)
+                continue
+            yield data
+
+    async def read_file_async(self) -> AsyncIterator[bytes]:
+        """
+        Follows the file, sleeping on the event loop while there's nothing new
+
+        Yields
+        ------
+        data : bytes
+            What was appended to the file (None when it was truncated)
+        """
+        reads = self.follow_file()
+        try:
+            for data in reads:
+                if data == b'':
+                    await asyncio.sleep(self.POLL_INTERVAL)
+                    continue
+                yield data
+        finally:
+            reads.close()
+
+    def read_socket(self) -> Iterator[bytes]:
+        """
+        Reads from the socket, reconnecting whenever the connection drops
+
+        Yields
+        ------
+        data : bytes
+            What was received (None when the connection was lost)
+        """
+        family = socket.AF_INET if self.kind == 'tcp' else socket.AF_UNIX
+        while not self.stopping.is_set():
+            connection = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                connection.connect(self.address)
+            except OSError:
+                connection.close()
+                self.stopping.wait(self.RETRY_INTERVAL)
+                continue
+
+            # Wake up regularly to check whether the feed was closed
+            connection.settimeout(self.POLL_INTERVAL)
+            with connection:
+                while not self.stopping.is_set():
+                    try:
+                        data = connection.recv(self.READ_SIZE)
+                    except socket.timeout:
+                        continue
+                    except OSError:
+                        break
+                    if not data:
+                        break
+                    yield data
+            yield None
+
+    async def read_socket_async(self) -> AsyncIterator[bytes]:
+        """
+        Reads from the socket with asyncio streams, reconnecting whenever the
+        connection drops
+
+        Yields
+        ------
+        data : bytes
+            What was received (None when the connection was lost)
+        """
+        while True:
+            try:
+                if self.kind == 'tcp':
+                    reader, writer = await asyncio.open_connection(*self.address)
+                else:
+                    reader, writer = await asyncio.open_unix_connection(
+                        self.address
+                    )
+            except OSError:
+                await asyncio.sleep(self.RETRY_INTERVAL)
+                continue
+
+            try:
+                while True:
+                    try:
+                        data = await reader.read(self.READ_SIZE)
+                    except OSError:
+                        break
+                    if not data:
+                        break
+                    yield data
+            finally:
+                writer.close()
+            yield None
+
+    def parse_lines(self, lines: list[bytes]) -> list[tuple]:
+        """
+        Parses the lines of a read (runs on the reader thread)
+
+        All the lines are decoded as one JSON array, which is several times
+        faster than decoding them one by one. Only if that fails, or if it
+        doesn't give exactly one value per line (a line holding several
+        comma-separated values is invalid JSONL), are they decoded
+        separately, to skip just the invalid ones.
+
+        Parameters
+        ----------
+        lines : list[bytes]
+            The complete lines read at once
+
+        Returns
+        -------
+        events : list[tuple]
+            The valid events, in order (see parse_event)
+        """
+        lines = [line for line in lines if line.strip()]
+        try:
+            objects = json.loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            objects = None
+        if objects is None or len(objects) != len(lines):
+            objects = []
+            for line in lines:
+                try:
+                    objects.append(json.loads(line))
+                except ValueError:
+                    self.errors += 1
+
+        events = []
+        for data in objects:
+            try:
+                events.append(parse_event(data))
+            except (ValueError, KeyError, TypeError):
+                self.errors += 1
+        return events
+
+    def push(self, events: list[tuple], received: float) -> None:
+        """
+        Queues a batch of events (runs on the reader thread)
+
+        Parameters
+        ----------
+        events : list[tuple]
+            The events read at once
+        received : float
+            When the events were read (time.perf_counter)
+        """
+        if not events:
+            return
+
+        # Wait for room instead of dropping events, but keep checking
+        # whether the feed was closed
+        while not self.stopping.is_set():
+            try:
+                self.batches.put((received, events), timeout=self.RETRY_INTERVAL)
+            except queue.Full:
+                continue
+            self.received += len(events)
+            break
+        self.wake()
+
+    async def push_async(self, events: list[tuple], received: float) -> None:
+        """
+        Queues a batch of events, sleeping on the event loop while the queue
+        is full
+
+        Parameters
+        ----------
+        events : list[tuple]
+            The events read at once
+        received : float
+            When the events were read (time.perf_counter)
+        """
+        if not events:
+            return
+
+        while True:
+            try:
+                self.batches.put_nowait((received, events))
+            except queue.Full:
+                await asyncio.sleep(self.POLL_INTERVAL)
+                continue
+            self.received += len(events)
+            break
+        self.wake()
+
+    def wake(self) -> None:
+        """Wakes up an idle game loop, once per poll, to show the new events"""
+        if self.wake_posted:
+            return
+        self.wake_posted = True
+        try:
+            pygame.event.post(pygame.event.Event(self.WAKE_EVENT))
+        except pygame.error:
+            pass # Without a display there's no loop to wake up
+
+    def poll(self) -> bool:
+        """
+        Folds the events that arrived into the score and the clock
+
+        Returns
+        -------
+        changed : bool
+            Whether or not any event was applied
+        """
+        self.wake_posted = False
+        applied = 0
+        while applied < self.max_per_poll:
+            try:
+                received, events = self.batches.get_nowait()
+            except queue.Empty:
+                break
+            applied += len(events)
+            self.unshown.append((received, len(events)))
+
+            for event in events:
+                kind = event[0]
+                if kind == 'goal':
+                    if event[1] == 0:
+                        self.home += 1
+                    else:
+                        self.away += 1
+                elif kind == 'score':
+                    self.home, self.away = event[1], event[2]
+                else:
+                    self.clock = event[1]
+
+        self.applied += applied
+        return applied > 0
+
+    def apply(self, scoreboard) -> bool:
+        """
+        Shows everything that arrived since the last frame on the scoreboard
+
+        Parameters
+        ----------
+        scoreboard : Scoreboard
+            The scoreboard the feed drives
+
+        Returns
+        -------
+        changed : bool
+            Whether or not any event was applied
+        """
+        if not self.poll():
+            return False
+        scoreboard.set_score(self.home, self.away)
+        if self.clock is not None:
+            scoreboard.elapsed = self.clock
+            self.clock = None
+        return True
+
+    @property
+    def pending(self) -> bool:
+        """
+        Returns whether or not events are waiting to be applied
+
+        Returns
+        -------
+        pending : bool
+            True while the queue isn't empty
+        """
+        return not self.batches.empty()
+
+    def mark_shown(self, now: float = None) -> None:
+        """
+        Records the latency of the events the frame on screen applied
+
+        Parameters
+        ----------
+        now : float
+            When the frame was shown (default the current time.perf_counter)
+        """
+        if not self.unshown:
+            return
+        if now is None:
+            now = time.perf_counter()
+        for received, count in self.unshown:
+            self.latencies.extend(itertools.repeat(now - received, count))
+        self.unshown.clear()
+
+    def percentiles(self) -> tuple:
+        """
+        Returns the rolling p50, p95 and p99 latencies
+
+        Returns
+        -------
+        percentiles : tuple[float, float, float]
+            The (p50, p95, p99) latencies in milliseconds
+        """
+        if not self.latencies:
+            return (0.0, 0.0, 0.0)
+        return tuple(
+            np.percentile(self.latencies, (50, 95, 99)) * 1000
+        )
+
+class DemoFeed:
+    """
+    A local stand-in for a live match-data feed.
+
+    Writes a steady stream of clock, goal and score events to a JSONL file,
+    or serves it to whoever connects to a TCP or UNIX socket, at a set rate
+    per second. Events are sent in small batches every few milliseconds, so
+    rates of thousands of events per second are reached without a sleep
+    per event.
+
+    Attributes
+    ----------
+    source : str
+        Where the events go (see parse_source)
+    kind : str
+        One of 'file', 'tcp' or 'unix'
+    address : str | tuple
+        The file or socket path, or the (host, port) of a TCP socket
+    rate : float
+        How many events are sent per second
+    speed : float
+        How many match seconds pass per real second
+    rng : numpy.random.Generator
+        Decides when goals are scored and by whom
+    score : list[int]
+        The (home, away) score sent so far
+    sent : int
+        The number of events sent so far
+    stopping : threading.Event
+        Set when the feed should stop
+    server : socket.socket
+        The listening socket (None for a file)
+    thread : threading.Thread
+        The thread sending the events (None until started)
+    """
+
+    # How often a batch of events is sent (in seconds)
+    BATCH_INTERVAL = 0.005
+    # The chance that an event is a goal, and how often the whole score is
+    # sent (in events), so a reader that joins late catches up
+    GOAL_CHANCE = 0.0005
+    SCORE_EVERY = 500
+
+    def __init__(
+            self,
+            source: str,
+            rate: float = 1000,
+            speed: float = 1.0,
+            seed: int = None):
+        """
+        Creates the stand-in feed without starting it
+
+        Parameters
+        ----------
+        source : str
+            A JSONL file path, 'tcp://host:port' or 'unix:///path/to/socket'
+        rate : float
+            How many events are sent per second (default 1000)
+        speed : float
+            How many match seconds pass per real second (default 1.0)
+        seed : int
+            Seeds when goals are scored (default None)
+        """
+        self.source: str = source
+        self.kind, self.address = parse_source(source)
+        self.rate: float = rate
+        self.speed: float = speed
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.score: list[int] = [0, 0]
+        self.sent: int = 0
+
+        self.stopping: threading.Event = threading.Event()
+        self.server: socket.socket = None
+        self.thread: threading.Thread = None
+
+    def start(self) -> None:
+        """Starts sending events on a background thread"""
+        if self.kind == 'file':
+            # Start from an empty file
+            open(self.address, 'wb').close()
+        else:
+            family = socket.AF_INET if self.kind == 'tcp' else socket.AF_UNIX
+            if self.kind == 'unix' and os.path.exists(self.address):
+                os.unlink(self.address)
+            self.server = socket.socket(family, socket.SOCK_STREAM)
+            if self.kind == 'tcp':
+                self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server.bind(self.address)
+            self.server.listen(1)
+            self.server.settimeout(MatchFeed.RETRY_INTERVAL)
+
+        self.thread = threading.Thread(
+            target=self.run,
+            name='demo-feed',
+            daemon=True
+        )
+        self.thread.start()
+
+    def close(self) -> None:
+        """Stops sending and waits for the thread to finish"""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            if self.kind == 'unix' and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def run(self) -> None:
+        """Sends events until closed (runs on the feed's thread)"""
+        if self.kind == 'file':
+            with open(self.address, 'ab', buffering=0) as file:
+                self.send_batches(file.write)
+            return
+
+        while not self.stopping.is_set():
+            try:
+                connection, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with connection:
+                try:
+                    self.send_batches(connection.sendall)
+                except OSError:
+                    pass # The reader went away, so wait for the next one
+
+    def send_batches(self, write) -> None:
+        """
+        Sends batches of events at the feed's rate until closed
+
+        Parameters
+        ----------
+        write : Callable[[bytes], Any]
+            Writes a batch of lines to the file or the connection
+        """
+        start = time.perf_counter()
+        sent = 0
+        while not self.stopping.wait(self.BATCH_INTERVAL):
+            elapsed = time.perf_counter() - start
+            due = int(elapsed * self.rate) - sent
+            if due <= 0:
+                continue
+            write(b''.join(self.next_event(elapsed) for _ in range(due)))
+            sent += due
+
+    def next_event(self, elapsed: float) -> bytes:
+        """
+        Returns the next event as a line of JSON
+
+        Parameters
+        ----------
+        elapsed : float
+            The real time since the feed started, in seconds
+
+        Returns
+        -------
+        line : bytes
+            The event, ending with a newline
+        """
+        self.sent += 1
+        if self.sent % self.SCORE_EVERY == 0:
+            home, away = self.score
+            event = {'type': 'score', 'home': home, 'away': away}
+        elif self.rng.random() < self.GOAL_CHANCE:
+            team = int(self.rng.integers(0, 2))
+            self.score[team] += 1
+            event = {'type': 'goal', 'team': MatchFeed.TEAMS[team]}
+        else:
+            event = {'type': 'clock', 'seconds': round(elapsed * self.speed, 3)}
+        return json.dumps(event).encode() + b'\n'
+
+def main() -> None:
+    """Runs the stand-in feed until interrupted"""
+    parser = argparse.ArgumentParser(
+        description="Serve a stand-in live match-data feed"
+    )
+    parser.add_argument(
+        'source',
+        help="A JSONL file to append to, tcp://host:port or unix:///path"
+    )
+    parser.add_argument(
+        '--rate', type=float, default=1000,
+        help="How many events to send per second (default 1000)"
+    )
+    parser.add_argument(
+        '--speed', type=float, default=1.0,
+        help="How many match seconds pass per real second (default 1)"
+    )
+    parser.add_argument(
+        '--seed', type=int,
+        help="Seed when goals are scored"
+    )
+    args = parser.parse_args()
+
+    feed = DemoFeed(args.source, args.rate, args.speed, args.seed)
+    feed.start()
+    print(f"Sending {args.rate:g} events per second to {args.source}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.close()
+    print(f"Sent {feed.sent} events")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+import pygame
+
+# File Imports
+from colors import Color
+from config import Config
+from artist import Artist
+
+class PaletteScene:
+    """
+    Renders the static scene once into 8-bit surfaces whose colors are palette slots.
+
+    Every color that changes with the Config (sky, stars, sun/moon, field,
+    stripes, lights and clouds) gets its own palette slot, and the geometry is
+    drawn with those slot indices exactly once. Switching between day and night
+    or turning the lights on and off then only rewrites palette entries and
+    converts the two layers to the display format once, with no geometry
+    redrawn. Interpolating between two palettes gives smooth day/night fades.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist whose draw functions render the geometry
+    width : int
+        The width of the layers
+    height : int
+        The height of the layers
+    sky_indexed : pygame.Surface
+        The 8-bit sky, stars and sun/moon
+    field_indexed : pygame.Surface
+        The 8-bit static field (everything else is the COLOR_KEY slot)
+    sky : pygame.Surface
+        The sky layer converted to the display format with the current palette
+    field : pygame.Surface
+        The field layer converted to the display format with the current palette
+    palette : list[tuple]
+        The palette the converted layers were made with
+    fade_from : list[tuple]
+        The palette a fade started at
+    fade_to : list[tuple]
+        The palette a fade ends at
+    fade_step : int
+        How many steps of the current fade have passed
+    fade_steps : int
+        How many steps the current fade lasts
+    """
+
+    # The palette slots of the colors that change with the Config
+    SKY = 0
+    STAR = 1
+    SUN_BODY = 2
+    SUN_SHADOW = 3
+    FIELD = 4
+    STRIPE = 5
+    LIGHT = 6
+    CLOUD = 7 # Not used by the geometry, but faded along with everything else
+
+    # The colors the geometry is drawn with directly, which never change
+    FIXED_COLORS = [
+        Color.COLOR_KEY,
+        Color.BLACK,
+        Color.WHITE,
+        Color.GRAY,
+        Color.NIGHT_GRAY,
+        Color.RED,
+        Color.BRIGHT_YELLOW
+    ]
+    FIRST_FIXED = 8
+    KEY = FIRST_FIXED # The slot of COLOR_KEY
+
+    # How many simulation steps a day/night fade takes by default
+    FADE_STEPS = 30
+
+    def __init__(
+            self,
+            artist: Artist,
+            width: int,
+            height: int,
+            config: Config):
+        """
+        Renders the geometry and converts it with the Config's palette
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist whose draw functions render the geometry
+        width : int
+            The width of the layers
+        height : int
+            The height of the layers
+        config : Config
+            The Config whose colors the scene starts with
+        """
+        self.artist: Artist = artist
+        self.width: int = width
+        self.height: int = height
+
+        self.render_geometry()
+
+        self.palette: list[tuple] = None
+        self.fade_from: list[tuple] = None
+        self.fade_to: list[tuple] = None
+        self.fade_step: int = 0
+        self.fade_steps: int = 0
+
+        self.apply_palette(self.palette_for(config))
+
+    def palette_for(self, config: Config) -> list[tuple]:
+        """
+        Builds the full 256-color palette for a Config
+
+        Every color but the colorkey is darkened at night with the lights off
+
+        Parameters
+        ----------
+        config : Config
+            The Config to read the colors from
+
+        Returns
+        -------
+        palette : list[tuple]
+            The (R, G, B) color of every slot
+        """
+        sky_color = config.sky_color
+
+        # Stars only show at night, and the moon is the sun with a cutout
+        roles = [
+            sky_color,
+            sky_color if config.day else Color.WHITE,
+            Color.BRIGHT_YELLOW if config.day else Color.WHITE,
+            Color.BRIGHT_YELLOW if config.day else sky_color,
+            config.field_color,
+            config.stripe_color,
+            config.light_color,
+            config.cloud_color
+        ]
+        palette = self.complete_palette(roles)
+
+        # The darkness is part of the palette, so it fades in and out too
+        if config.dark:
+            palette = [
+                color if slot == self.KEY else self.artist.darken_color(color)
+                for slot, color in enumerate(palette)
+            ]
+        return palette
+
+    def complete_palette(self, roles: list[tuple]) -> list[tuple]:
+        """
+        Adds the fixed colors to the role colors and pads the palette
+
+        Parameters
+        ----------
+        roles : list[tuple]
+            The colors of the role slots
+
+        Returns
+        -------
+        palette : list[tuple]
+            All 256 colors of the palette
+        """
+        palette = roles + self.FIXED_COLORS
+        return palette + [Color.BLACK] * (256 - len(palette))
+
+    def render_geometry(self) -> None:
+        """Draws the sky and field once, using palette slots as colors"""
+        # Role slots get placeholder colors that can't be mistaken for any fixed
+        # color, so drawing with a fixed (R, G, B) color maps to its own slot
+        placeholders = self.complete_palette([
+            (slot + 1, 1, 1) for slot in range(self.FIRST_FIXED)
+        ])
+
+        # The sky, stars and sun/moon
+        self.sky_indexed = pygame.Surface((self.width, self.height), depth=8)
+        self.sky_indexed.set_palette(placeholders)
+        self.sky_indexed.fill(self.SKY)
+        self.artist.draw_stars(self.sky_indexed, self.STAR)
+        self.render_sun_and_moon(self.sky_indexed)
+
+        # The static field, see-through everywhere else
+        self.field_indexed = pygame.Surface((self.width, self.height), depth=8)
+        self.field_indexed.set_palette(placeholders)
+        self.field_indexed.fill(self.KEY)
+        self.artist.draw_field(
+            self.field_indexed,
+            self.FIELD,
+            self.STRIPE,
+            self.LIGHT
+        )
+
+    def render_sun_and_moon(self, surface: pygame.Surface) -> None:
+        """
+        Draws the sun and the moon into the same slots
+
+        The sun's disk is SUN_BODY, and the part of it the moon's cutout covers
+        is SUN_SHADOW, so the palette decides which of the two is shown
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The 8-bit surface to draw onto
+        """
+        # The same shapes Artist.draw_sun_or_moon draws
+        pygame.draw.ellipse(surface, self.SUN_BODY, [520, 50, 40, 40])
+
+        cutout = pygame.Surface(surface.get_size(), depth=8)
+        cutout.fill(0)
+        pygame.draw.ellipse(cutout, 1, [530, 45, 40, 40])
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        covered = pygame.surfarray.pixels2d(cutout) == 1
+        body = pixels == self.SUN_BODY
+
+        # The cutout hides the stars behind it and shades the disk
+        pixels[covered & ~body] = self.SKY
+        pixels[covered & body] = self.SUN_SHADOW
+        del pixels # Unlock the surface
+
+    def apply_palette(self, palette: list[tuple]) -> None:
+        """
+        Rewrites the palette and converts both layers to the display format
+
+        Parameters
+        ----------
+        palette : list[tuple]
+            The 256 colors to use
+        """
+        self.palette = palette
+
+        self.sky_indexed.set_palette(palette)
+        self.field_indexed.set_palette(palette)
+
+        self.sky: pygame.Surface = self.sky_indexed.convert()
+        self.field: pygame.Surface = self.field_indexed.convert()
+        self.field.set_colorkey(Color.COLOR_KEY, pygame.RLEACCEL)
+
+        # Every pixel may have changed color
+        self.artist.dirty_rects.mark_full()
+
+    def switch_to(self, config: Config, steps: int = 0) -> None:
+        """
+        Switches to the Config's palette, either at once or with a fade
+
+        A fade only starts when the palette it would end at differs from the
+        one shown (or already being faded to), so toggles that don't change
+        any color don't run a fade
+
+        Parameters
+        ----------
+        config : Config
+            The Config to read the new colors from
+        steps : int
+            How many simulation steps the fade lasts (default 0, no fade)
+        """
+        target = self.palette_for(config)
+        if steps <= 0:
+            self.fade_to = None
+            self.apply_palette(target)
+            return
+
+        current = self.palette if self.fade_to is None else self.fade_to
+        if target == current:
+            return
+
+        self.fade_from = self.palette
+        self.fade_to = target
+        self.fade_step = 0
+        self.fade_steps = steps
+
+    def step(self) -> None:
+        """Advances a running fade by a single simulation step"""
+        if self.fade_to is None:
+            return
+
+        self.fade_step += 1
+        fraction = self.fade_step / self.fade_steps
+        self.apply_palette(blend_palettes(self.fade_from, self.fade_to, fraction))
+
+        if self.fade_step >= self.fade_steps:
+            self.fade_to = None
+
+    @property
+    def fading(self) -> bool:
+        """
+        Returns whether or not a fade is running
+
+        Returns
+        -------
+        fading : bool
+            True until the current fade has reached its target palette
+        """
+        return self.fade_to is not None
+
+    @property
+    def halfway(self) -> bool:
+        """
+        Returns whether or not the palette is at least halfway to its target
+
+        Returns
+        -------
+        halfway : bool
+            True once half of the current fade has passed, or without a fade
+        """
+        return not self.fading or self.fade_step * 2 >= self.fade_steps
+
+    @property
+    def cloud_color(self) -> tuple:
+        """
+        Returns the cloud color of the current (possibly fading) palette
+
+        Returns
+        -------
+        color : tuple
+            A tuple representing the (R, G, B) values of the cloud's color
+        """
+        return self.palette[self.CLOUD]
+
+    def draw_sky(self, surface: pygame.Surface) -> None:
+        """
+        Draws the sky, stars and sun/moon
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the sky onto
+        """
+        surface.blit(self.sky, (0, 0))
+
+    def draw_field(self, surface: pygame.Surface) -> None:
+        """
+        Draws the static field
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the field onto
+        """
+        surface.blit(self.field, (0, 0))
+
+def blend_palettes(
+        start: list[tuple],
+        end: list[tuple],
+        fraction: float) -> list[tuple]:
+    """
+    Linearly interpolates between two palettes
+
+    Parameters
+    ----------
+    start : list[tuple]
+        The palette at fraction 0
+    end : list[tuple]
+        The palette at fraction 1
+    fraction : float
+        How far from start to end to go, from 0 to 1
+
+    Returns
+    -------
+    palette : list[tuple]
+        The blended palette
+    """
+    return [
+        tuple(
+            round(a + (b - a) * fraction)
+            for a, b in zip(start_color, end_color)
+        )
+        for start_color, end_color in zip(start, end)
+    ]
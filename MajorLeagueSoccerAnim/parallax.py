@@ -0,0 +1,355 @@
+import math
+
+import numpy as np
+import pygame
+
+# File Imports
+from colors import Color
+from artist import Artist
+from entity_store import CloudStore
+
+class ParallaxLayer:
+    """
+    A single depth of clouds, pre-rendered into a wide wrap-around strip.
+
+    Every cloud of a layer moves at the same speed, so the layer is one image
+    scrolling to the left. The clouds are drawn once into a strip as wide as
+    the distance a cloud travels between two respawns, and every frame blits
+    the strip at the scrolled offset (twice where the view crosses the seam),
+    no matter how many clouds it holds.
+
+    A cloud that leaves the left edge respawns ahead of the view, just like in
+    a CloudStore. Both the place it left and the place it respawns at are
+    offscreen, so they are only marked dirty and redrawn the next time the
+    strip is drawn.
+
+    Attributes
+    ----------
+    speed : float
+        How many pixels the layer moves to the left every simulation step
+    scale : float
+        The size of this layer's clouds relative to a regular cloud
+    period : int
+        The width of the strip (a cloud's x position wraps around after it)
+    height : int
+        The height of the strip
+    x : numpy.ndarray
+        The x position of every cloud within the strip
+    y : numpy.ndarray
+        The y position of every cloud within the strip
+    scroll : float
+        How far the layer has scrolled, from 0 up to the period
+    rng : numpy.random.Generator
+        The random generator used to place respawned clouds
+    strip : pygame.Surface
+        The colorkeyed strip holding every cloud of the layer
+    sprite : pygame.Surface
+        The (scaled) cloud sprite the strip is drawn with
+    color : tuple
+        The color the strip was drawn with (None until it's first drawn)
+    dirty : list[pygame.Rect]
+        The regions of the strip that have to be redrawn before it's shown
+    """
+
+    def __init__(
+            self,
+            cloud_count: int,
+            speed: float,
+            scale: float,
+            height: int,
+            rng: np.random.Generator):
+        """
+        Places the layer's clouds
+
+        Parameters
+        ----------
+        cloud_count : int
+            The number of clouds in the layer
+        speed : float
+            How many pixels the layer moves to the left every simulation step
+        scale : float
+            The size of this layer's clouds relative to a regular cloud
+        height : int
+            The height of the strip
+        rng : numpy.random.Generator
+            The random generator used to place clouds
+        """
+        self.speed: float = speed
+        self.scale: float = scale
+        self.rng: np.random.Generator = rng
+
+        # A cloud wraps around once it has gone from the right end of the
+        # spawn range past the left edge and fully out of sight
+        self.period: int = (
+            CloudStore.SPAWN_X[1] - CloudStore.SPAWN_X[0] + Artist.CLOUD_SIZE[0]
+        )
+        self.height: int = height
+
+        # Clouds start and respawn within the same ranges as in a CloudStore
+        self.x: np.ndarray = rng.integers(*CloudStore.SPAWN_X, cloud_count)
+        self.y: np.ndarray = rng.integers(*CloudStore.SPAWN_Y, cloud_count)
+        self.x %= self.period
+        self.scroll: float = 0.0
+
+        self.strip: pygame.Surface = None
+        self.sprite: pygame.Surface = None
+        self.color: tuple = None
+        self.dirty: list[pygame.Rect] = []
+
+    def screen_x(self) -> np.ndarray:
+        """
+        Returns where every cloud is on the screen
+
+        Returns
+        -------
+        x : numpy.ndarray
+            The x position of every cloud, from the despawn edge up to a
+            period further right
+        """
+        edge = CloudStore.DESPAWN_X
+        return (self.x - self.scroll - edge) % self.period + edge
+
+    def move(self) -> None:
+        """
+        Scrolls the layer and respawns the clouds that left the screen
+        """
+        # The clouds about to pass the left edge respawn
+        respawned = self.screen_x() - self.speed < CloudStore.DESPAWN_X
+        self.scroll = (self.scroll + self.speed) % self.period
+
+        respawn_count = int(np.count_nonzero(respawned))
+        if not respawn_count:
+            return
+
+        # The old places are redrawn empty, the new ones with the cloud
+        self.mark_clouds(respawned)
+        self.x[respawned] = (
+            self.rng.integers(*CloudStore.RESPAWN_X, respawn_count)
+            + math.ceil(self.scroll)
+        ) % self.period
+        self.y[respawned] = self.rng.integers(*CloudStore.SPAWN_Y, respawn_count)
+        self.mark_clouds(respawned)
+
+    def mark_clouds(self, clouds: np.ndarray) -> None:
+        """
+        Marks the regions of the strip some clouds cover as dirty
+
+        Parameters
+        ----------
+        clouds : numpy.ndarray
+            A boolean mask selecting the clouds
+        """
+        if self.strip is None:
+            return
+
+        width, height = self.sprite.get_size()
+        for x, y in zip(self.x[clouds].tolist(), self.y[clouds].tolist()):
+            # A cloud crossing the seam shows up at both ends of the strip
+            self.dirty.append(pygame.Rect(x, y, width, height))
+            if x + width > self.period:
+                self.dirty.append(pygame.Rect(x - self.period, y, width, height))
+
+    def get_strip(self, sprite: pygame.Surface, color: tuple) -> pygame.Surface:
+        """
+        Returns the strip, redrawing whatever went out of date
+
+        Parameters
+        ----------
+        sprite : pygame.Surface
+            The regular cloud sprite for the color
+        color : tuple
+            A tuple representing the (R, G, B) values of the cloud's color
+
+        Returns
+        -------
+        strip : pygame.Surface
+            The colorkeyed strip holding every cloud of the layer
+        """
+        # A new color invalidates the whole strip
+        if color != self.color:
+            self.color = color
+            self.sprite = self.scale_sprite(sprite)
+            if self.strip is None:
+                # Parts of the strip are redrawn as clouds respawn, which RLE
+                # acceleration would re-encode in full every time
+                self.strip = pygame.Surface((self.period, self.height)).convert()
+                self.strip.set_colorkey(Color.COLOR_KEY)
+            self.dirty = [self.strip.get_rect()]
+
+        for rect in self.dirty:
+            self.redraw(rect)
+        self.dirty.clear()
+
+        return self.strip
+
+    def scale_sprite(self, sprite: pygame.Surface) -> pygame.Surface:
+        """
+        Scales the cloud sprite to the layer's depth
+
+        Parameters
+        ----------
+        sprite : pygame.Surface
+            The regular cloud sprite
+
+        Returns
+        -------
+        sprite : pygame.Surface
+            The colorkeyed sprite for this layer
+        """
+        if self.scale == 1:
+            return sprite
+
+        # Nearest-neighbor scaling keeps the colorkey's edges crisp
+        width, height = sprite.get_size()
+        scaled = pygame.transform.scale(
+            sprite,
+            (round(width * self.scale), round(height * self.scale))
+        )
+        scaled.set_colorkey(Color.COLOR_KEY, pygame.RLEACCEL)
+        return scaled
+
+    def redraw(self, rect: pygame.Rect) -> None:
+        """
+        Redraws a region of the strip from scratch
+
+        Parameters
+        ----------
+        rect : pygame.Rect
+            The region to redraw
+        """
+        rect = rect.clip(self.strip.get_rect())
+        if not rect:
+            return
+
+        self.strip.fill(Color.COLOR_KEY, rect)
+
+        # Only the clouds overlapping the region (at either end of the strip)
+        width, height = self.sprite.get_size()
+        overlapping_y = (self.y < rect.bottom) & (self.y + height > rect.top)
+        positions = []
+        for shift in (0, -self.period):
+            x = self.x + shift
+            overlapping = overlapping_y & (x < rect.right) & (x + width > rect.left)
+            positions.extend(zip(x[overlapping].tolist(), self.y[overlapping].tolist()))
+
+        self.strip.set_clip(rect)
+        self.strip.blits([(self.sprite, position) for position in positions], False)
+        self.strip.set_clip(None)
+
+    def draw(
+            self,
+            surface: pygame.Surface,
+            sprite: pygame.Surface,
+            color: tuple,
+            alpha: float = 0.0) -> None:
+        """
+        Blits the strip at the layer's scroll, wrapping around the seam
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the layer onto
+        sprite : pygame.Surface
+            The regular cloud sprite for the color
+        color : tuple
+            A tuple representing the (R, G, B) values of the cloud's color
+        alpha : float
+            How far into the next simulation step to extrapolate the scroll
+            (default 0.0)
+        """
+        strip = self.get_strip(sprite, color)
+
+        # A cloud at x within the strip is drawn at x - scroll on the screen
+        offset = int(self.scroll + self.speed * alpha) % self.period
+        surface.blit(strip, (-offset, 0))
+        if self.period - offset < surface.get_width():
+            surface.blit(strip, (self.period - offset, 0))
+
+class ParallaxSky:
+    """
+    Several depths of scrolling cloud strips, far layers moving slowest.
+
+    This replaces the per-cloud drawing of Artist.draw_clouds in parallax
+    mode, so the cost of a frame is a couple of strip blits per layer however
+    many clouds there are.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist providing the cloud sprites and dirty rect tracking
+    layers : list[ParallaxLayer]
+        The layers, from the farthest to the nearest
+    """
+
+    # The (speed, size) of every depth relative to regular clouds, far to near
+    DEPTHS = [
+        (0.5, 0.6),
+        (0.75, 0.8),
+        (1.0, 1.0)
+    ]
+
+    def __init__(self, artist: Artist, cloud_count: int, height: int):
+        """
+        Splits the clouds between the depth layers
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist providing the cloud sprites and random generator
+        cloud_count : int
+            The total number of clouds
+        height : int
+            The height of the cloud band
+        """
+        self.artist: Artist = artist
+
+        depth_count = len(self.DEPTHS)
+        self.layers: list[ParallaxLayer] = [
+            ParallaxLayer(
+                cloud_count // depth_count + (depth < cloud_count % depth_count),
+                speed * artist.CLOUD_SPEED,
+                scale,
+                height,
+                artist.rng
+            )
+            for depth, (speed, scale) in enumerate(self.DEPTHS)
+        ]
+
+    def __len__(self) -> int:
+        """Returns the total number of clouds"""
+        return sum(len(layer.x) for layer in self.layers)
+
+    def move(self) -> None:
+        """Scrolls every layer by a single simulation step"""
+        for layer in self.layers:
+            layer.move()
+
+    def draw(
+            self,
+            surface: pygame.Surface,
+            see_through: pygame.Surface,
+            cloud_color: tuple,
+            alpha: float = 0.0) -> None:
+        """
+        Draws every layer onto the see_through surface and places it
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The main screen to draw the see_through surface onto
+        see_through : pygame.Surface
+            The see_through surface to draw the layers onto
+        cloud_color : tuple
+            A tuple representing the (R, G, B) values of the cloud's color
+        alpha : float
+            How far into the next simulation step to extrapolate
+            (default 0.0)
+        """
+        sprite = self.artist.get_cloud_sprite(cloud_color)
+        for layer in self.layers:
+            layer.draw(see_through, sprite, cloud_color, alpha)
+
+        surface.blit(see_through, (0, 0))
+
+        # The whole band scrolls, so it always changes
+        self.artist.dirty_rects.add(see_through.get_rect())
@@ -0,0 +1,324 @@
+import numpy as np
+import pygame
+
+# File Imports
+from colors import Color
+from artist import Artist
+
+class ParticleSystem:
+    """
+    A fixed pool of rain, snow or confetti particles.
+
+    Every particle is a slot of a handful of preallocated NumPy arrays, so
+    there are no per-particle objects, and every update writes into those
+    same arrays in place. Particles that fall off the bottom (or drift off a
+    side) wrap around to the other edge instead of being removed and
+    respawned, so the pool stays full and nothing is allocated while the
+    weather runs or changes. A frame is rasterized by writing the mapped
+    color of every particle straight into the surface's pixels.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist whose random generator places the particles and whose
+        darkness table darkens them
+    capacity : int
+        How many particles the pool holds
+    mode : str
+        The current weather, one of MODES
+    width : int
+        The width of the area the particles fall in
+    height : int
+        The height of the area the particles fall in
+    x : numpy.ndarray
+        The x position of every particle
+    y : numpy.ndarray
+        The y position of every particle
+    fall : numpy.ndarray
+        How far every particle falls every simulation step
+    phase : numpy.ndarray
+        Where in its sideways sway every particle is
+    color_index : numpy.ndarray
+        Which color slot every particle is drawn in
+    frame : int
+        How many simulation steps have passed
+    pixel_x : numpy.ndarray
+        Scratch space for the pixel column of every particle
+    pixel_y : numpy.ndarray
+        Scratch space for the pixel row of every particle
+    scratch : numpy.ndarray
+        Scratch space for the sway and wrapping of every particle
+    outside : numpy.ndarray
+        Scratch space for which particles (or pixels) left the area
+    colors : numpy.ndarray
+        The mapped color of every particle
+    colors_key : tuple
+        The (mode, dark) the colors were mapped for
+    """
+
+    # The weathers the W key cycles through
+    MODES = ['off', 'rain', 'snow', 'confetti']
+
+    # How every weather falls and looks: the range particles fall per step,
+    # how far they drift to the side per step, how far they sway side to
+    # side, their colors, and the (x, y) offsets of the pixels they cover
+    STYLES = {
+        'rain': {
+            'fall': (7.0, 11.0),
+            'drift': -1.0,
+            'sway': 0.0,
+            'colors': [(170, 180, 210), (140, 150, 190)],
+            'pixels': [(0, 0), (0, -1), (1, -2)]
+        },
+        'snow': {
+            'fall': (0.5, 1.5),
+            'drift': 0.2,
+            'sway': 0.6,
+            'colors': [Color.WHITE, Color.SILVER],
+            'pixels': [(0, 0)]
+        },
+        'confetti': {
+            'fall': (1.0, 2.5),
+            'drift': 0.0,
+            'sway': 1.5,
+            'colors': [
+                Color.RED,
+                Color.BLUE,
+                Color.YELLOW,
+                Color.ORANGE,
+                Color.WHITE,
+                Color.GREEN
+            ],
+            'pixels': [(0, 0), (1, 0)]
+        }
+    }
+    # How fast particles sway (radians per step)
+    SWAY_SPEED = 0.05
+    # Every particle picks one of this many color slots, which the colors of
+    # the mode are spread over
+    COLOR_SLOTS = 6
+
+    def __init__(
+            self,
+            artist: Artist,
+            capacity: int = 100_000,
+            size: tuple = (800, 600),
+            mode: str = 'off'):
+        """
+        Allocates the pool
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist whose random generator places the particles
+        capacity : int
+            How many particles the pool holds (default 100_000)
+        size : tuple
+            The (width, height) of the area the particles fall in
+            (default (800, 600))
+        mode : str
+            The weather to start with, one of MODES (default 'off')
+        """
+        self.artist: Artist = artist
+        self.capacity: int = capacity
+        self.width, self.height = size
+        self.mode: str = 'off'
+
+        # Everything is allocated here, once
+        self.x: np.ndarray = np.zeros(capacity, dtype=np.float32)
+        self.y: np.ndarray = np.zeros(capacity, dtype=np.float32)
+        self.fall: np.ndarray = np.zeros(capacity, dtype=np.float32)
+        self.phase: np.ndarray = np.zeros(capacity, dtype=np.float32)
+        self.color_index: np.ndarray = np.arange(capacity) % self.COLOR_SLOTS
+        self.artist.rng.shuffle(self.color_index)
+        self.frame: int = 0
+
+        self.pixel_x: np.ndarray = np.zeros(capacity, dtype=np.intp)
+        self.pixel_y: np.ndarray = np.zeros(capacity, dtype=np.intp)
+        self.scratch: np.ndarray = np.zeros(capacity, dtype=np.float32)
+        self.outside: np.ndarray = np.zeros(capacity, dtype=bool)
+        self.colors: np.ndarray = np.zeros(capacity, dtype=np.uint32)
+        self.colors_key: tuple = None
+
+        self.set_mode(mode)
+
+    @property
+    def active(self) -> bool:
+        """
+        Returns whether or not there is any weather
+
+        Returns
+        -------
+        active : bool
+            False when the mode is 'off'
+        """
+        return self.mode != 'off' and self.capacity > 0
+
+    def set_mode(self, mode: str) -> None:
+        """
+        Switches the weather, scattering the pool in place
+
+        Parameters
+        ----------
+        mode : str
+            The new weather, one of MODES
+        """
+        self.mode = mode
+        if not self.active:
+            return
+
+        rng = self.artist.rng
+        low, high = self.STYLES[mode]['fall']
+
+        # Fill the existing arrays instead of creating new ones
+        rng.random(dtype=np.float32, out=self.x)
+        self.x *= self.width
+        rng.random(dtype=np.float32, out=self.y)
+        self.y *= self.height
+        rng.random(dtype=np.float32, out=self.fall)
+        self.fall *= high - low
+        self.fall += low
+        rng.random(dtype=np.float32, out=self.phase)
+        self.phase *= 2 * np.pi
+
+    def next_mode(self) -> None:
+        """Switches to the next weather of MODES, wrapping around"""
+        index = self.MODES.index(self.mode)
+        self.set_mode(self.MODES[(index + 1) % len(self.MODES)])
+
+    def step(self) -> None:
+        """Moves every particle by a single simulation step"""
+        if not self.active:
+            return
+
+        style = self.STYLES[self.mode]
+        self.frame += 1
+
+        self.y += self.fall
+        self.wrap(self.y, self.height)
+
+        self.x += style['drift']
+        if style['sway']:
+            # The sway's change since the last step moves the particle
+            scratch = self.scratch
+            np.add(self.phase, self.frame * self.SWAY_SPEED, out=scratch)
+            np.cos(scratch, out=scratch)
+            scratch *= style['sway'] * self.SWAY_SPEED
+            self.x += scratch
+        self.wrap(self.x, self.width)
+
+    def wrap(self, values: np.ndarray, size: int) -> None:
+        """
+        Wraps positions that just left the area back around, in place
+
+        Particles move less than the area's size per step, so a single
+        shift is enough (and much cheaper than a floating-point modulo)
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The x or y positions of every particle
+        size : int
+            The width or height of the area
+        """
+        outside = self.outside
+        scratch = self.scratch
+
+        np.less(values, 0, out=outside)
+        np.multiply(outside, size, out=scratch)
+        values += scratch
+
+        np.greater_equal(values, size, out=outside)
+        np.multiply(outside, size, out=scratch)
+        values -= scratch
+
+    def wrap_pixels(self, pixels: np.ndarray, offset: int, size: int) -> None:
+        """
+        Wraps the pixels a particle covers past an edge around, in place
+
+        The particles themselves are always inside the area, so only the
+        pixels offset from them can cross an edge, and only the one they
+        are offset toward
+
+        Parameters
+        ----------
+        pixels : numpy.ndarray
+            The pixel column or row of every particle, plus the offset
+        offset : int
+            How far the pixels are offset from the particles
+        size : int
+            The width or height of the area
+        """
+        outside = self.outside
+        if offset > 0:
+            np.greater_equal(pixels, size, out=outside)
+            np.subtract(pixels, size, out=pixels, where=outside)
+        elif offset < 0:
+            np.less(pixels, 0, out=outside)
+            np.add(pixels, size, out=pixels, where=outside)
+
+    def map_colors(self, surface: pygame.Surface, dark: bool) -> None:
+        """
+        Looks up the surface's pixel value of every particle's color
+
+        The colors only change with the mode or the darkness, so they are
+        looked up again only then
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface the particles are drawn onto
+        dark : bool
+            Whether or not it's night with the lights off
+        """
+        key = (self.mode, dark)
+        if key == self.colors_key:
+            return
+        self.colors_key = key
+
+        palette = self.STYLES[self.mode]['colors']
+        if dark:
+            palette = [self.artist.darken_color(color) for color in palette]
+
+        # The few colors of the mode, repeated to fill every color slot
+        mapped = np.array(
+            [
+                surface.map_rgb(palette[slot % len(palette)])
+                for slot in range(self.COLOR_SLOTS)
+            ],
+            dtype=np.uint32
+        )
+        np.take(mapped, self.color_index, out=self.colors)
+
+    def draw(self, surface: pygame.Surface, dark: bool = False) -> None:
+        """
+        Writes every particle's pixels into the surface
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the particles onto (it has to be 32 bit)
+        dark : bool
+            Whether or not it's night with the lights off (default False)
+        """
+        if not self.active:
+            return
+
+        self.map_colors(surface, dark)
+
+        pixel_x = self.pixel_x
+        pixel_y = self.pixel_y
+        pixels = pygame.surfarray.pixels2d(surface)
+        for dx, dy in self.STYLES[self.mode]['pixels']:
+            np.add(self.x, dx, out=pixel_x, casting='unsafe')
+            np.add(self.y, dy, out=pixel_y, casting='unsafe')
+            # Pixels past an edge wrap around, like the particles do
+            self.wrap_pixels(pixel_x, dx, self.width)
+            self.wrap_pixels(pixel_y, dy, self.height)
+            pixels[pixel_x, pixel_y] = self.colors
+        del pixels # Unlock the surface
+
+        # Particles fall everywhere, so the whole area changes
+        self.artist.dirty_rects.add(
+            pygame.Rect(0, 0, self.width, self.height)
+        )
@@ -0,0 +1,489 @@
+import argparse
+import time
+
+import numpy as np
+
+# File Imports
+from goal_geometry import NET_LINES, goal_frame_lines
+
+class CollisionGrid:
+    """
+    The goal's frame and net as line segments, bucketed into a uniform grid.
+
+    The segments come from the same coordinates Artist.draw_goal and
+    Artist.draw_net draw with. Every grid cell lists the segments that a ball
+    whose center is in that cell could touch, so the broad phase is a single
+    lookup per ball and only a handful of segments are ever tested, however
+    many segments there are. The lists are padded into one rectangular array
+    so whole batches of balls are looked up at once.
+
+    Attributes
+    ----------
+    start : numpy.ndarray
+        The (x, y) start of every segment
+    end : numpy.ndarray
+        The (x, y) end of every segment
+    half_width : numpy.ndarray
+        Half the drawn width of every segment
+    kind : numpy.ndarray
+        FRAME or NET for every segment
+    cell_size : float
+        The width and height of a grid cell
+    origin : numpy.ndarray
+        The (x, y) position of the grid's top left corner
+    columns : int
+        The number of columns of the grid
+    rows : int
+        The number of rows of the grid
+    candidates : numpy.ndarray
+        A (cells + 1, K) array of the segments near every cell, padded with
+        -1 (the extra last row stands for everything outside the grid)
+    """
+
+    # The kinds of segments
+    FRAME = 0
+    NET = 1
+
+    def __init__(self, radius: float, cell_size: float = 8.0):
+        """
+        Collects the segments and buckets them
+
+        Parameters
+        ----------
+        radius : float
+            The largest radius of a ball that will be tested against the grid
+        cell_size : float
+            The width and height of a grid cell (default 8.0)
+        """
+        frame = goal_frame_lines()
+        lines = frame + NET_LINES
+
+        self.start: np.ndarray = np.array([line[0] for line in lines], float)
+        self.end: np.ndarray = np.array([line[1] for line in lines], float)
+        self.half_width: np.ndarray = np.array([line[2] for line in lines]) / 2
+        self.kind: np.ndarray = np.array(
+            [self.FRAME] * len(frame) + [self.NET] * len(NET_LINES)
+        )
+
+        # The grid covers every segment with room for a ball touching it
+        reach = radius + self.half_width.max()
+        low = np.minimum(self.start, self.end).min(axis=0) - reach
+        high = np.maximum(self.start, self.end).max(axis=0) + reach
+
+        self.cell_size: float = cell_size
+        self.origin: np.ndarray = low
+        self.columns: int = int(np.ceil((high[0] - low[0]) / cell_size))
+        self.rows: int = int(np.ceil((high[1] - low[1]) / cell_size))
+
+        self.build_candidates(radius)
+
+    def build_candidates(self, radius: float) -> None:
+        """
+        Lists the segments a ball centered anywhere in each cell could touch
+
+        Parameters
+        ----------
+        radius : float
+            The largest radius of a ball
+        """
+        columns, rows = np.meshgrid(np.arange(self.columns), np.arange(self.rows))
+        centers = (
+            self.origin
+            + (np.stack((columns.ravel(), rows.ravel()), axis=1) + 0.5)
+            * self.cell_size
+        )
+
+        # A segment is near a cell if it passes within reach of the cell's
+        # center, where reach covers the cell's corners as well
+        reach = self.half_width + radius + self.cell_size * np.sqrt(0.5)
+        distance = segment_distance(
+            centers[:, np.newaxis],
+            self.start,
+            self.end
+        )
+        near = distance <= reach
+
+        width = max(1, int(near.sum(axis=1).max()))
+        self.candidates: np.ndarray = np.full((len(centers) + 1, width), -1)
+        for cell, segments in enumerate(near):
+            found = np.flatnonzero(segments)
+            self.candidates[cell, :len(found)] = found
+
+    def cells_of(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Returns the grid cell of every position
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            An (n, 2) array of (x, y) positions
+
+        Returns
+        -------
+        cells : numpy.ndarray
+            The index of every position's cell (the last row of candidates
+            for positions outside the grid)
+        """
+        cell = np.floor((positions - self.origin) / self.cell_size).astype(int)
+        inside = (
+            (cell[:, 0] >= 0) & (cell[:, 0] < self.columns)
+            & (cell[:, 1] >= 0) & (cell[:, 1] < self.rows)
+        )
+        return np.where(
+            inside,
+            cell[:, 1] * self.columns + cell[:, 0],
+            len(self.candidates) - 1
+        )
+
+def segment_distance(
+        points: np.ndarray,
+        start: np.ndarray,
+        end: np.ndarray,
+        closest: bool = False):
+    """
+    Returns the distance from points to line segments
+
+    All arguments broadcast against each other
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        (..., 2) positions
+    start : numpy.ndarray
+        (..., 2) starts of the segments
+    end : numpy.ndarray
+        (..., 2) ends of the segments
+    closest : bool
+        Whether or not to also return the offsets from the closest points
+        (default False)
+
+    Returns
+    -------
+    distance : numpy.ndarray
+        The distance from every point to its segment
+    offset : numpy.ndarray
+        The offset from the closest point of the segment to the point
+        (only if closest is True)
+    """
+    along = end - start
+    length = np.maximum((along * along).sum(axis=-1), 1e-12)
+    t = np.clip(((points - start) * along).sum(axis=-1) / length, 0, 1)
+    offset = points - (start + along * t[..., np.newaxis])
+    distance = np.sqrt((offset * offset).sum(axis=-1))
+    if closest:
+        return distance, offset
+    return distance
+
+class ShotSimulator:
+    """
+    Simulates a batch of shots on goal at a fixed timestep.
+
+    Every ball is a row of NumPy arrays, so a whole batch is integrated and
+    collided at once: a ball's grid cell gives the few segments it could
+    touch, the deepest contact is resolved, and the ball bounces off the
+    frame or is caught by the net. A shot ends once the net catches the ball
+    (a goal), or once the ball comes to rest, leaves the field or runs out of
+    time, and then it either hit the woodwork (it bounced off the frame) or
+    missed.
+
+    Attributes
+    ----------
+    grid : CollisionGrid
+        The goal's segments and broad phase
+    rng : numpy.random.Generator
+        The random generator shots are aimed with
+    position : numpy.ndarray
+        The (x, y) position of every ball
+    velocity : numpy.ndarray
+        The (x, y) velocity of every ball, in pixels per second
+    elapsed : numpy.ndarray
+        How long every shot has been flying, in seconds
+    hit_frame : numpy.ndarray
+        Whether or not every ball has touched the frame
+    hit_net : numpy.ndarray
+        Whether or not every ball has touched the net
+    done : numpy.ndarray
+        Whether or not every shot has ended
+    steps : int
+        How many steps have been simulated
+    """
+
+    # The fixed timestep (small enough that no ball skips past a segment)
+    STEP = 1 / 240
+    BALL_RADIUS = 6.0
+    # The share of its speed a ball loses every second
+    DRAG = 0.6
+    # How much of the speed into a segment is kept after bouncing
+    RESTITUTION = {CollisionGrid.FRAME: 0.7, CollisionGrid.NET: 0.1}
+    # How much of the speed along the net is kept after touching it
+    NET_FRICTION = 0.6
+
+    # Shots start around the penalty spot and are aimed around the goal
+    SHOT_START_X = (330, 470)
+    SHOT_START_Y = (330, 420)
+    SHOT_TARGET_X = (290, 510)
+    SHOT_TARGET_Y = (110, 215)
+    SHOT_TIME = (0.3, 0.8)
+    # Shots end when the ball is this slow, or after this many seconds
+    REST_SPEED = 20.0
+    MAX_TIME = 3.0
+    # The field balls can't leave
+    BOUNDS = (0, 0, 800, 600)
+
+    def __init__(
+            self,
+            shot_count: int,
+            rng: np.random.Generator = None,
+            grid: CollisionGrid = None):
+        """
+        Aims a batch of shots
+
+        Parameters
+        ----------
+        shot_count : int
+            The number of shots to simulate at once
+        rng : numpy.random.Generator
+            The random generator shots are aimed with (default a new one)
+        grid : CollisionGrid
+            The goal's segments (default a new grid, which can be shared
+            between simulators to skip building it again)
+        """
+        self.rng: np.random.Generator = rng or np.random.default_rng()
+        self.grid: CollisionGrid = grid or CollisionGrid(self.BALL_RADIUS)
+
+        rng = self.rng
+        start = np.stack((
+            rng.uniform(*self.SHOT_START_X, shot_count),
+            rng.uniform(*self.SHOT_START_Y, shot_count)
+        ), axis=1)
+        target = np.stack((
+            rng.uniform(*self.SHOT_TARGET_X, shot_count),
+            rng.uniform(*self.SHOT_TARGET_Y, shot_count)
+        ), axis=1)
+        flight = rng.uniform(*self.SHOT_TIME, shot_count)
+
+        self.position: np.ndarray = start
+        self.velocity: np.ndarray = (target - start) / flight[:, np.newaxis]
+        self.elapsed: np.ndarray = np.zeros(shot_count)
+        self.hit_frame: np.ndarray = np.zeros(shot_count, bool)
+        self.hit_net: np.ndarray = np.zeros(shot_count, bool)
+        self.done: np.ndarray = np.zeros(shot_count, bool)
+        self.steps: int = 0
+
+        # The restitution and friction of every segment, looked up per contact
+        grid = self.grid
+        self.restitution: np.ndarray = np.array(
+            [self.RESTITUTION[kind] for kind in grid.kind.tolist()]
+        )
+        self.friction: np.ndarray = np.where(
+            grid.kind == CollisionGrid.NET, self.NET_FRICTION, 1.0
+        )
+
+    def step(self) -> None:
+        """Advances every shot that hasn't ended by a single fixed step"""
+        active = np.flatnonzero(~self.done)
+        if not len(active):
+            return
+
+        velocity = self.velocity[active]
+        velocity *= 1 - self.DRAG * self.STEP
+        position = self.position[active] + velocity * self.STEP
+
+        self.collide(active, position, velocity)
+
+        self.position[active] = position
+        self.velocity[active] = velocity
+        self.elapsed[active] += self.STEP
+        self.steps += 1
+
+        # Shots end when the net catches the ball, or when it rests, leaves
+        # the field or takes too long
+        left, top, right, bottom = self.BOUNDS
+        speed = np.sqrt((velocity * velocity).sum(axis=1))
+        self.done[active] = (
+            self.hit_net[active]
+            | (speed < self.REST_SPEED)
+            | (self.elapsed[active] >= self.MAX_TIME)
+            | (position[:, 0] < left) | (position[:, 0] > right)
+            | (position[:, 1] < top) | (position[:, 1] > bottom)
+        )
+
+    def collide(
+            self,
+            active: np.ndarray,
+            position: np.ndarray,
+            velocity: np.ndarray) -> None:
+        """
+        Resolves every ball's deepest contact, updating them in place
+
+        Parameters
+        ----------
+        active : numpy.ndarray
+            The indices of the balls being moved
+        position : numpy.ndarray
+            The (x, y) positions of those balls
+        velocity : numpy.ndarray
+            The (x, y) velocities of those balls
+        """
+        grid = self.grid
+
+        # Broad phase: only the segments listed for each ball's cell
+        candidates = grid.candidates[grid.cells_of(position)]
+        listed = candidates >= 0
+        touching = listed.any(axis=1)
+        if not touching.any():
+            return
+
+        balls = np.flatnonzero(touching)
+        candidates = candidates[balls]
+        segments = np.where(listed[balls], candidates, 0)
+
+        # Narrow phase: the distance to every listed segment
+        distance, offset = segment_distance(
+            position[balls, np.newaxis],
+            grid.start[segments],
+            grid.end[segments],
+            closest=True
+        )
+        depth = self.BALL_RADIUS + grid.half_width[segments] - distance
+        depth[~listed[balls]] = 0
+
+        deepest = depth.argmax(axis=1)
+        rows = np.arange(len(balls))
+        depth = depth[rows, deepest]
+        contact = depth > 0
+        if not contact.any():
+            return
+
+        balls = balls[contact]
+        rows = rows[contact]
+        segment = segments[rows, deepest[contact]]
+        depth = depth[contact]
+        offset = offset[rows, deepest[contact]]
+        distance = distance[rows, deepest[contact]]
+
+        # The contact normal points from the segment to the ball's center
+        normal = offset / np.maximum(distance, 1e-9)[:, np.newaxis]
+
+        # Push the ball out, then bounce it off (or let the net catch it)
+        position[balls] += normal * depth[:, np.newaxis]
+        ball_velocity = velocity[balls]
+        into = (ball_velocity * normal).sum(axis=1)
+        approaching = (into < 0)[:, np.newaxis]
+        normal_velocity = normal * into[:, np.newaxis]
+        tangent_velocity = ball_velocity - normal_velocity
+        bounced = (
+            tangent_velocity * self.friction[segment][:, np.newaxis]
+            - normal_velocity * self.restitution[segment][:, np.newaxis]
+        )
+        velocity[balls] = np.where(approaching, bounced, ball_velocity)
+
+        kind = grid.kind[segment]
+        shots = active[balls]
+        self.hit_frame[shots[kind == CollisionGrid.FRAME]] = True
+        self.hit_net[shots[kind == CollisionGrid.NET]] = True
+
+    def run(self, record: bool = False):
+        """
+        Steps until every shot has ended
+
+        Parameters
+        ----------
+        record : bool
+            Whether or not to keep every step's positions for a replay
+            (default False)
+
+        Returns
+        -------
+        replay : numpy.ndarray
+            A (steps, shots, 2) array of positions if record is True
+        """
+        frames = []
+        max_steps = int(np.ceil(self.MAX_TIME / self.STEP))
+        while not self.done.all() and self.steps < max_steps:
+            self.step()
+            if record:
+                frames.append(self.position.copy())
+
+        if record:
+            return np.array(frames)
+
+    def outcomes(self) -> dict[str, int]:
+        """
+        Counts how the shots ended
+
+        Returns
+        -------
+        outcomes : dict[str, int]
+            The number of goals, shots off the woodwork and misses
+        """
+        goals = int(self.hit_net.sum())
+        woodwork = int((self.hit_frame & ~self.hit_net).sum())
+        return {
+            'goal': goals,
+            'woodwork': woodwork,
+            'miss': len(self.done) - goals - woodwork
+        }
+
+def simulate_shots(
+        shot_count: int,
+        batch_size: int = 1000,
+        seed: int = None) -> tuple:
+    """
+    Simulates shots headlessly in batches
+
+    Parameters
+    ----------
+    shot_count : int
+        The number of shots to simulate
+    batch_size : int
+        The number of shots simulated at once (default 1000)
+    seed : int
+        The seed the shots are aimed with (default None)
+
+    Returns
+    -------
+    shots_per_second : float
+        How many shots were simulated per second of real time
+    outcomes : dict[str, int]
+        The number of goals, shots off the woodwork and misses
+    """
+    rng = np.random.default_rng(seed)
+    grid = CollisionGrid(ShotSimulator.BALL_RADIUS)
+    outcomes = {'goal': 0, 'woodwork': 0, 'miss': 0}
+
+    start = time.perf_counter()
+    for first in range(0, shot_count, batch_size):
+        simulator = ShotSimulator(min(batch_size, shot_count - first), rng, grid)
+        simulator.run()
+        for outcome, count in simulator.outcomes().items():
+            outcomes[outcome] += count
+
+    return shot_count / (time.perf_counter() - start), outcomes
+
+def main() -> None:
+    """Reports how many shots per second can be simulated headlessly"""
+    parser = argparse.ArgumentParser(
+        description="Simulate shots on goal without rendering them"
+    )
+    parser.add_argument(
+        '--shots', type=int, default=10_000,
+        help="The number of shots to simulate (default 10000)"
+    )
+    parser.add_argument(
+        '--batch', type=int, default=1000,
+        help="The number of shots simulated at once (default 1000)"
+    )
+    parser.add_argument(
+        '--seed', type=int,
+        help="Seed the shots so the same seed gives the same outcomes"
+    )
+    args = parser.parse_args()
+
+    speed, outcomes = simulate_shots(args.shots, args.batch, args.seed)
+    print(f"Simulated {args.shots} shots at {speed:.0f} shots per second")
+    for outcome, count in outcomes.items():
+        print(f"{outcome:>10}: {count}")
+
+if __name__ == '__main__':
+    main()
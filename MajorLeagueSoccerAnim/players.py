@@ -0,0 +1,551 @@
+import numpy as np
+import pygame
+
+# File Imports
+from colors import Color
+from artist import Artist
+from sprites import SpriteArray
+
+class SpatialHash:
+    """
+    A uniform grid over the pitch for finding nearby players.
+
+    Instead of testing every pair of players, every player is filed under
+    the grid cell it stands in by sorting the players by cell. Everything
+    within a cell's width of a player is then in that player's cell or one
+    of the eight around it, and each of those cells is a contiguous run of
+    the sorted order, found in a table of where every cell's run starts.
+    Only half of those cells are scanned (the cell itself and the four
+    after it), since every pair of neighboring cells is then still visited
+    once, and the pairs found are mirrored. Building and querying are a
+    handful of NumPy calls, so the cost grows with the number of players
+    and their neighbors rather than with the number of pairs.
+
+    Attributes
+    ----------
+    cell_size : float
+        The width and height of a cell (the largest neighbor distance)
+    columns : int
+        The number of columns of the grid
+    rows : int
+        The number of rows of the grid
+    order : numpy.ndarray
+        The indices of the players, sorted by cell
+    cell_start : numpy.ndarray
+        Where every cell's run starts in the sorted order (with one more
+        entry for where the last run ends)
+    position_columns : numpy.ndarray
+        The column of every position the grid was built with
+    position_rows : numpy.ndarray
+        The row of every position the grid was built with
+    """
+
+    # The (column, row) shifts of the cells scanned for neighbors: the cell
+    # itself first, then the half of the eight around it that comes after it
+    HALF_NEIGHBORHOOD = np.array([(0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)])
+
+    def __init__(self, size: tuple, cell_size: float):
+        """
+        Creates an empty grid
+
+        Parameters
+        ----------
+        size : tuple
+            The (width, height) of the area the grid covers
+        cell_size : float
+            The width and height of a cell (the largest neighbor distance)
+        """
+        self.cell_size: float = cell_size
+        self.columns: int = int(np.ceil(size[0] / cell_size))
+        self.rows: int = int(np.ceil(size[1] / cell_size))
+        self.order: np.ndarray = np.empty(0, dtype=np.int64)
+        self.cell_start: np.ndarray = np.zeros(
+                                        self.columns * self.rows + 1,
+                                        dtype=np.int64
+                                    )
+        self.position_columns: np.ndarray = np.empty(0, dtype=np.int64)
+        self.position_rows: np.ndarray = np.empty(0, dtype=np.int64)
+
+    def cell_coordinates(self, positions: np.ndarray) -> tuple:
+        """
+        Returns the column and row of every position
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            An (n, 2) array of (x, y) positions
+
+        Returns
+        -------
+        columns : numpy.ndarray
+            The column of every position
+        rows : numpy.ndarray
+            The row of every position
+        """
+        cells = (positions // self.cell_size).astype(np.int64)
+        return (
+            np.clip(cells[:, 0], 0, self.columns - 1),
+            np.clip(cells[:, 1], 0, self.rows - 1)
+        )
+
+    def build(self, positions: np.ndarray) -> None:
+        """
+        Files every position under its cell
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            An (n, 2) array of (x, y) positions
+        """
+        columns, rows = self.cell_coordinates(positions)
+        self.position_columns = columns
+        self.position_rows = rows
+        cells = rows * self.columns + columns
+        self.order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=self.columns * self.rows)
+        np.cumsum(counts, out=self.cell_start[1:])
+
+    def pairs(
+            self,
+            positions: np.ndarray,
+            radius: float,
+            mirror: bool = True) -> tuple:
+        """
+        Finds every pair of positions closer than a radius
+
+        build() has to be called with the same positions first, since the
+        cells are reused
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            The (n, 2) array of (x, y) positions the grid was built with
+        radius : float
+            The distance under which two positions are neighbors
+            (at most the cell size)
+        mirror : bool
+            Whether every pair shows up twice, once from each side, instead
+            of once (default True)
+
+        Returns
+        -------
+        first : numpy.ndarray
+            The index of the first position of every pair
+        second : numpy.ndarray
+            The index of the second position of every pair
+        """
+        count = len(positions)
+        shifts = self.HALF_NEIGHBORHOOD
+        column = self.position_columns + shifts[:, 0, np.newaxis]
+        row = self.position_rows + shifts[:, 1, np.newaxis]
+        # The rows only ever shift down, so they can't go above the grid
+        inside = (column >= 0) & (column < self.columns) & (row < self.rows)
+        cells = (row * self.columns + column)[inside]
+        players = np.broadcast_to(np.arange(count), inside.shape)[inside]
+
+        # The run of sorted players in every scanned cell, expanded into one
+        # candidate per player in it, for all the shifts at once
+        begin = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - begin
+        total = int(counts.sum())
+        run_start = np.repeat(begin - np.cumsum(counts) + counts, counts)
+        first = np.repeat(players, counts)
+        second = self.order[np.arange(total) + run_start]
+
+        x = positions[:, 0]
+        y = positions[:, 1]
+        offset_x = x[first] - x[second]
+        offset_y = y[first] - y[second]
+        close = offset_x * offset_x + offset_y * offset_y < radius * radius
+
+        # Every cell's own candidates come first (no player is ever outside
+        # its own cell), and each of its pairs is found there from both
+        # sides, so keep one side and drop players paired with themselves
+        own = int(counts[:count].sum())
+        close[:own] &= first[:own] < second[:own]
+
+        first = first[close]
+        second = second[close]
+        if not mirror:
+            return first, second
+        return (
+            np.concatenate((first, second)),
+            np.concatenate((second, first))
+        )
+
+class PlayerField:
+    """
+    Two teams of players running on the pitch, simulated as NumPy arrays.
+
+    Players live in pitch coordinates (meters across and down the length of
+    the pitch) and are projected onto the perspective field drawn by
+    Artist.draw_out_of_bounds. Every step, each player steers toward its place
+    in the team's formation, which shifts with the play, the players nearest
+    the play chase it, and everyone keeps apart from the neighbors the
+    spatial hash finds. Every rule is a vectorized expression over all the
+    players, so the same code runs 22 players or thousands in stress mode.
+
+    The players are drawn through a SpriteArray with sprites cached per team,
+    size (players further away are smaller) and darkness, so placing them is
+    vectorized too.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist whose random generator moves the play and whose dirty
+        rect tracker the sprites report to
+    player_count : int
+        How many players are on the pitch
+    team : numpy.ndarray
+        The team (0 or 1) of every player
+    team_players : list[numpy.ndarray]
+        The indices of the players of every team
+    home : numpy.ndarray
+        The (x, y) formation place of every player, in meters
+    position : numpy.ndarray
+        The (x, y) position of every player, in meters
+    velocity : numpy.ndarray
+        The (x, y) velocity of every player, in meters per second
+    play : numpy.ndarray
+        The (x, y) position of the play everyone follows, in meters
+    play_target : numpy.ndarray
+        Where the play is heading, in meters
+    grid : SpatialHash
+        Finds the players near each other
+    batch : SpriteArray
+        The slots the players are drawn with
+    batch_dark : bool
+        Whether or not the batch's table holds the darkened sprites (None
+        until it's filled)
+    sprites : dict[tuple, pygame.Surface]
+        The cached sprites, by (team, size step, dark)
+    """
+
+    # The pitch, in meters (across, then down the length toward the viewer)
+    PITCH_SIZE = (68.0, 105.0)
+    # Where the pitch is drawn (see Artist.draw_out_of_bounds): the far edge
+    # spans TOP_X at TOP_Y, the sides widen at 45 degrees until SIDE_Y, and
+    # the near edge is at BOTTOM_Y
+    TOP_Y = 220
+    TOP_X = (140, 660)
+    SIDE_Y = 360
+    BOTTOM_Y = 580
+
+    # One step of the simulation, in seconds
+    STEP = 1 / 60
+    # The most speed (m/s) and acceleration (m/s^2) of a player
+    MAX_SPEED = 7.0
+    MAX_FORCE = 12.0
+    # How close (m) players get before pushing apart, and how hard they push
+    SEPARATION_RADIUS = 2.5
+    SEPARATION_WEIGHT = 40.0
+    # How far formations follow the play, relative to the play's offset
+    # from the middle of the pitch
+    FORMATION_SHIFT = (0.4, 0.5)
+    # How far from its target a player starts slowing down (m)
+    ARRIVE_RADIUS = 6.0
+    # One in this many players of a team chases the play
+    CHASER_RATIO = 11
+    # How fast the play moves between targets (m/s)
+    PLAY_SPEED = 5.0
+
+    # The formation of a team of 11, as (depth, count) rows from its own
+    # end of the pitch: a keeper, four defenders, four midfielders and two
+    # forwards
+    FORMATION = [(0.05, 1), (0.2, 4), (0.35, 4), (0.45, 2)]
+
+    # The (shirt, shorts) of every team
+    TEAM_COLORS = [
+        (Color.RED, Color.WHITE),
+        (Color.BLUE, Color.WHITE)
+    ]
+    # The size of a player at the near edge, and at the far edge relative
+    # to it, in SIZE_STEPS steps so only a few sprites are ever drawn
+    PLAYER_SIZE = (12, 26)
+    FAR_SCALE = 0.5
+    SIZE_STEPS = 6
+
+    def __init__(self, artist: Artist, player_count: int = 22):
+        """
+        Lines the players up in their formations
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist whose random generator moves the play
+        player_count : int
+            How many players are on the pitch (default 22, thousands for
+            stress testing)
+        """
+        self.artist: Artist = artist
+        self.player_count: int = player_count
+
+        self.team: np.ndarray = np.arange(player_count) % 2
+        self.team_players: list[np.ndarray] = [
+            np.flatnonzero(self.team == team) for team in (0, 1)
+        ]
+        self.home: np.ndarray = self.formation_places()
+        self.position: np.ndarray = self.home.copy()
+        self.velocity: np.ndarray = np.zeros((player_count, 2))
+
+        middle = np.array(self.PITCH_SIZE) / 2
+        self.play: np.ndarray = middle.copy()
+        self.play_target: np.ndarray = middle.copy()
+
+        self.grid: SpatialHash = SpatialHash(
+                                                self.PITCH_SIZE,
+                                                self.SEPARATION_RADIUS
+                                            )
+        self.batch: SpriteArray = SpriteArray(player_count)
+        self.batch_dark: bool = None
+        self.sprites: dict[tuple, pygame.Surface] = {}
+
+    def formation_places(self) -> np.ndarray:
+        """
+        Returns the formation place of every player
+
+        The first 11 players of each team take the places of FORMATION, and
+        any more (in stress mode) are spread randomly over their team's half
+
+        Returns
+        -------
+        home : numpy.ndarray
+            The (x, y) place of every player, in meters
+        """
+        width, length = self.PITCH_SIZE
+        places = []
+        for depth, count in self.FORMATION:
+            for slot in range(count):
+                places.append(((slot + 1) / (count + 1) * width, depth * length))
+        places = np.array(places)
+
+        home = np.empty((self.player_count, 2))
+        rng = self.artist.rng
+        for team, players in enumerate(self.team_players):
+            lined_up = min(len(players), len(places))
+            home[players[:lined_up]] = places[:lined_up]
+
+            extra = len(players) - lined_up
+            home[players[lined_up:], 0] = rng.uniform(0, width, extra)
+            home[players[lined_up:], 1] = rng.uniform(0, length / 2, extra)
+
+            # The second team plays from the other end
+            if team:
+                home[players, 1] = length - home[players, 1]
+        return home
+
+    def move_play(self) -> None:
+        """Moves the play toward its target, picking a new one on arrival"""
+        offset = self.play_target - self.play
+        distance = float(np.hypot(*offset))
+        step = self.PLAY_SPEED * self.STEP
+        if distance <= step:
+            self.play[:] = self.play_target
+            self.play_target = self.artist.rng.uniform((0, 0), self.PITCH_SIZE)
+        else:
+            self.play += offset / distance * step
+
+    def step(self) -> None:
+        """Moves every player by a single simulation step"""
+        self.move_play()
+        if not self.player_count:
+            return
+
+        position = self.position
+        velocity = self.velocity
+
+        # Everyone heads for their place in the shifted formation...
+        middle = np.array(self.PITCH_SIZE) / 2
+        target = self.home + (self.play - middle) * self.FORMATION_SHIFT
+
+        # ...except the players nearest the play, who chase it
+        to_play = ((position - self.play) ** 2).sum(axis=1)
+        for players in self.team_players:
+            if not len(players):
+                continue
+            chasers = max(1, len(players) // self.CHASER_RATIO)
+            nearest = np.argpartition(to_play[players], chasers - 1)[:chasers]
+            target[players[nearest]] = self.play
+
+        # Arrive: full speed far away, slowing down close to the target
+        offset = target - position
+        distance = np.sqrt((offset * offset).sum(axis=1))[:, np.newaxis]
+        speed = self.MAX_SPEED * np.minimum(distance / self.ARRIVE_RADIUS, 1)
+        desired = offset / np.maximum(distance, 1e-9) * speed
+        force = desired - velocity
+
+        # Separate: push away from every close neighbor, harder the closer
+        self.grid.build(position)
+        first, second = self.grid.pairs(
+            position,
+            self.SEPARATION_RADIUS,
+            mirror=False
+        )
+        if len(first):
+            # Each pair is found once, and pushes both players equally apart
+            away_x = position[first, 0] - position[second, 0]
+            away_y = position[first, 1] - position[second, 1]
+            push = self.SEPARATION_WEIGHT / np.maximum(
+                away_x * away_x + away_y * away_y,
+                1e-4
+            )
+            count = self.player_count
+            for axis, away in enumerate((away_x, away_y)):
+                away *= push
+                force[:, axis] += np.bincount(first, away, count)
+                force[:, axis] -= np.bincount(second, away, count)
+
+        # Integrate with limited acceleration and speed
+        force = limit(force, self.MAX_FORCE)
+        velocity += force * self.STEP
+        velocity[:] = limit(velocity, self.MAX_SPEED)
+        position += velocity * self.STEP
+        np.clip(position, 0, self.PITCH_SIZE, out=position)
+
+    def project(self, positions: np.ndarray) -> tuple:
+        """
+        Projects pitch positions onto the drawn field
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+            An (n, 2) array of (x, y) positions, in meters
+
+        Returns
+        -------
+        x : numpy.ndarray
+            The x position of every point on the screen
+        y : numpy.ndarray
+            The y position of every point on the screen
+        depth : numpy.ndarray
+            How near every point is, from 0 at the far edge to 1
+        """
+        depth = positions[:, 1] / self.PITCH_SIZE[1]
+        y = self.TOP_Y + depth * (self.BOTTOM_Y - self.TOP_Y)
+
+        # The sides widen at 45 degrees down to SIDE_Y, then run along the
+        # screen's edges
+        widening = np.minimum(y, self.SIDE_Y) - self.TOP_Y
+        left = self.TOP_X[0] - widening
+        right = self.TOP_X[1] + widening
+        x = left + positions[:, 0] / self.PITCH_SIZE[0] * (right - left)
+        return x, y, depth
+
+    def get_sprite(self, team: int, size_step: int, dark: bool) -> pygame.Surface:
+        """
+        Returns the sprite of a team at a size, drawing it the first time
+
+        Parameters
+        ----------
+        team : int
+            The team (0 or 1)
+        size_step : int
+            The size of the player, from 0 (far) to SIZE_STEPS - 1 (near)
+        dark : bool
+            Whether or not it's night with the lights off
+
+        Returns
+        -------
+        sprite : pygame.Surface
+            The colorkeyed sprite
+        """
+        key = (team, size_step, dark)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            return sprite
+
+        scale = (
+            self.FAR_SCALE
+            + (1 - self.FAR_SCALE) * size_step / (self.SIZE_STEPS - 1)
+        )
+        width = max(3, round(self.PLAYER_SIZE[0] * scale))
+        height = max(6, round(self.PLAYER_SIZE[1] * scale))
+        shirt, shorts = self.TEAM_COLORS[team]
+
+        sprite = pygame.Surface((width, height)).convert()
+        sprite.fill(Color.COLOR_KEY)
+        head = height // 5
+        body = height * 2 // 5
+        legs = head + body + height // 5
+        leg_width = max(1, width // 4)
+
+        # Head
+        pygame.draw.ellipse(
+            sprite, Color.SKIN, [width // 4, 0, width - width // 2, head]
+        )
+        # Shirt
+        pygame.draw.rect(sprite, shirt, [0, head, width, body])
+        # Shorts
+        pygame.draw.rect(
+            sprite,
+            shorts,
+            [width // 6, head + body, width - width // 3, legs - head - body]
+        )
+        # Legs
+        pygame.draw.rect(
+            sprite, Color.SKIN, [width // 6, legs, leg_width, height - legs]
+        )
+        pygame.draw.rect(
+            sprite,
+            Color.SKIN,
+            [width - width // 6 - leg_width, legs, leg_width, height - legs]
+        )
+
+        if dark:
+            self.artist.darken_surface(sprite, Color.COLOR_KEY)
+        sprite.set_colorkey(Color.COLOR_KEY, pygame.RLEACCEL)
+
+        self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface: pygame.Surface, dark: bool = False) -> None:
+        """
+        Draws every player, far to near, and reports what changed
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the players onto
+        dark : bool
+            Whether or not it's night with the lights off (default False)
+        """
+        batch = self.batch
+        # The table holds every team's sprites, from far to near
+        if dark != self.batch_dark:
+            batch.set_table([
+                self.get_sprite(team, step, dark)
+                for team in (0, 1)
+                for step in range(self.SIZE_STEPS)
+            ])
+            self.batch_dark = dark
+
+        x, y, depth = self.project(self.position)
+        size_step = np.rint(depth * (self.SIZE_STEPS - 1)).astype(np.int64)
+
+        # Nearer players are drawn over the ones behind them
+        order = np.argsort(y, kind='stable')
+        sprite = (self.team * self.SIZE_STEPS + size_step)[order]
+
+        # Players stand on their position (the sprite's bottom center)
+        batch.place(sprite, x[order], y[order], anchor=(0.5, 1.0))
+        batch.draw(surface)
+        batch.report(self.artist.dirty_rects)
+
+def limit(vectors: np.ndarray, most: float) -> np.ndarray:
+    """
+    Shortens the vectors longer than a length
+
+    Parameters
+    ----------
+    vectors : numpy.ndarray
+        An (n, 2) array of vectors
+    most : float
+        The longest a vector may be
+
+    Returns
+    -------
+    vectors : numpy.ndarray
+        The vectors, none longer than most
+    """
+    length = np.sqrt((vectors * vectors).sum(axis=1))[:, np.newaxis]
+    return vectors * np.minimum(1, most / np.maximum(length, 1e-9))
@@ -0,0 +1,312 @@
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+
+# File Imports
+from colors import Color
+
+class FrameProfiler:
+    """
+    Times each stage of a frame and keeps rolling statistics about them.
+
+    Stages are timed with time.perf_counter_ns between a start() and a stop()
+    call. When the profiler is disabled, start() returns 0 and stop() returns
+    right away, so the instrumentation left in the game loop costs almost
+    nothing.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether or not stages are being timed
+    window : int
+        The number of frames the rolling statistics cover
+    samples : dict[str, collections.deque]
+        The last `window` durations (in nanoseconds) of each stage
+    frame : dict[str, int]
+        The durations of the stages timed during the current frame
+    frame_start : int
+        The time the current frame started at
+    trace : list[dict]
+        Every finished frame, kept only when a trace will be exported
+    trace_path : str
+        The JSON or CSV file the trace is exported to on exit (if any)
+    show_hud : bool
+        Whether or not the statistics are drawn on top of the screen
+    frames_since_hud : int
+        The number of frames since the HUD was last rebuilt
+    font : pygame.font.Font
+        The font the HUD is drawn with (loaded the first time it's needed)
+    hud : pygame.Surface
+        The translucent, pre-rendered HUD drawn on top of the screen
+    hud_rect : pygame.Rect
+        The region the HUD covered the last time it was drawn
+    gauges : dict[str, float]
+        Fractions from 0 to 1 (such as the CPU duty cycle) shown below the
+        stage statistics in the HUD
+    """
+
+    # The HUD is only rebuilt every so many frames
+    HUD_REFRESH = 30
+    # Where the HUD is drawn on the screen
+    HUD_POSITION = (4, 4)
+
+    def __init__(
+            self,
+            enabled: bool = False,
+            window: int = 300,
+            trace_path: str = None):
+        """
+        Initializes an empty profiler
+
+        Parameters
+        ----------
+        enabled : bool
+            Whether or not stages are being timed (default False)
+        window : int
+            The number of frames the rolling statistics cover (default 300)
+        trace_path : str
+            The JSON or CSV file to export every frame to on exit
+            (default None, which keeps no trace)
+        """
+        # Exporting a trace requires timing the frames
+        self.enabled: bool = enabled or trace_path is not None
+        self.window: int = window
+        self.trace_path: str = trace_path
+
+        self.samples: dict[str, deque] = {}
+        self.frame: dict[str, int] = {}
+        self.frame_start: int = 0
+        self.trace: list[dict] = []
+
+        self.show_hud: bool = False
+        self.frames_since_hud: int = 0
+        self.font: pygame.font.Font = None
+        self.hud: pygame.Surface = None
+        self.hud_rect: pygame.Rect = None
+        self.gauges: dict[str, float] = {}
+
+    def start(self) -> int:
+        """
+        Returns the time a stage starts at
+
+        Returns
+        -------
+        start : int
+            The current time in nanoseconds, or 0 if the profiler is disabled
+        """
+        if not self.enabled:
+            return 0
+        return time.perf_counter_ns()
+
+    def stop(self, stage: str, start: int) -> None:
+        """
+        Records how long a stage took
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage
+        start : int
+            The value start() returned when the stage began
+        """
+        if not self.enabled:
+            return
+        # The same stage can run more than once in a frame
+        elapsed = time.perf_counter_ns() - start
+        self.frame[stage] = self.frame.get(stage, 0) + elapsed
+
+    def begin_frame(self) -> None:
+        """Marks the start of a new frame"""
+        if not self.enabled:
+            return
+        self.frame = {}
+        self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self) -> None:
+        """Marks the end of the frame and folds its timings into the statistics"""
+        if not self.enabled:
+            return
+        self.frame['frame'] = time.perf_counter_ns() - self.frame_start
+
+        for stage, elapsed in self.frame.items():
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=self.window)
+            samples.append(elapsed)
+
+        if self.trace_path is not None:
+            self.trace.append(self.frame)
+
+        self.frames_since_hud += 1
+
+    def percentiles(self, stage: str) -> tuple:
+        """
+        Returns the rolling p50, p95 and p99 durations of a stage
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage
+
+        Returns
+        -------
+        percentiles : tuple[float, float, float]
+            The (p50, p95, p99) durations in milliseconds
+        """
+        ordered = sorted(self.samples.get(stage, ()))
+        if not ordered:
+            return (0.0, 0.0, 0.0)
+
+        last = len(ordered) - 1
+        return tuple(
+            ordered[round(last * fraction)] / 1e6
+            for fraction in (0.50, 0.95, 0.99)
+        )
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Returns the rolling statistics of every stage
+
+        Returns
+        -------
+        summary : dict[str, dict]
+            The p50/p95/p99 durations (in milliseconds) of every stage
+        """
+        return {
+            stage: dict(zip(('p50', 'p95', 'p99'), self.percentiles(stage)))
+            for stage in self.samples
+        }
+
+    def toggle_hud(self) -> None:
+        """Shows or hides the HUD, enabling the profiler if it wasn't already"""
+        self.show_hud = not self.show_hud
+        if self.show_hud:
+            self.enabled = True
+            self.refresh_hud()
+
+    def refresh_hud(self) -> None:
+        """Makes the next draw_hud call rebuild the HUD"""
+        self.frames_since_hud = self.HUD_REFRESH
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Sets a fraction shown in the HUD
+
+        Parameters
+        ----------
+        name : str
+            The name the gauge is shown with
+        value : float
+            The fraction to show, from 0 to 1 (None hides the gauge)
+        """
+        if value is None:
+            self.gauges.pop(name, None)
+        else:
+            self.gauges[name] = value
+
+    def build_hud(self) -> pygame.Surface:
+        """
+        Renders the current statistics into a translucent surface
+
+        Returns
+        -------
+        hud : pygame.Surface
+            The rendered HUD
+        """
+        if self.font is None:
+            self.font = pygame.font.SysFont('monospace', 12)
+
+        # The names are shown in full (field_rebuild.draw_x stages are long)
+        width = max(map(len, [*self.samples, *self.gauges]), default=0) + 1
+        width = max(width, 13)
+        lines = [f"{'stage':<{width}}  p50   p95   p99 (ms)"] + [
+            f"{stage:<{width}}{p50:>6.2f}{p95:>6.2f}{p99:>6.2f}"
+            for stage, (p50, p95, p99) in (
+                (stage, self.percentiles(stage)) for stage in self.samples
+            )
+        ] + [
+            f"{name:<{width}}{value:>6.1%}"
+            for name, value in self.gauges.items()
+        ]
+        texts = [self.font.render(line, True, Color.WHITE) for line in lines]
+
+        # Stack the lines on a black backdrop that lets the scene show through
+        hud = pygame.Surface((
+            max(text.get_width() for text in texts) + 8,
+            sum(text.get_height() for text in texts) + 4
+        ))
+        hud.fill(Color.BLACK)
+        hud.set_alpha(170)
+
+        y = 2
+        for text in texts:
+            hud.blit(text, (4, y))
+            y += text.get_height()
+
+        return hud
+
+    def draw_hud(self, surface: pygame.Surface) -> pygame.Rect:
+        """
+        Draws the rolling statistics on top of the surface
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the HUD onto
+
+        Returns
+        -------
+        rect : pygame.Rect
+            The region the HUD changed, or None if it's hidden
+        """
+        if not self.show_hud:
+            return None
+
+        # Rendering text every frame is wasteful, so refresh it periodically
+        if self.hud is None or self.frames_since_hud >= self.HUD_REFRESH:
+            self.frames_since_hud = 0
+            self.hud = self.build_hud()
+
+        # A rebuilt HUD may be smaller than before, so include the old region
+        rect = surface.blit(self.hud, self.HUD_POSITION)
+        changed = rect.union(self.hud_rect) if self.hud_rect else rect
+        self.hud_rect = rect
+        return changed
+
+    def export(self, path: str = None) -> None:
+        """
+        Writes the per-frame trace to a JSON or CSV file
+
+        The format is picked from the file extension (.csv writes CSV,
+        anything else writes JSON)
+
+        Parameters
+        ----------
+        path : str
+            The file to write the trace to (default the trace_path)
+        """
+        path = path or self.trace_path
+        if path is None:
+            return
+
+        if path.endswith('.csv'):
+            # Every stage gets a column, frames that skipped it are left blank
+            stages = sorted({stage for frame in self.trace for stage in frame})
+            with open(path, 'w', newline='') as file:
+                writer = csv.DictWriter(file, fieldnames=['index'] + stages)
+                writer.writeheader()
+                for index, frame in enumerate(self.trace):
+                    writer.writerow({'index': index, **frame})
+        else:
+            with open(path, 'w') as file:
+                json.dump(
+                    {
+                        'unit': 'ns',
+                        'summary_ms': self.summary(),
+                        'frames': self.trace
+                    },
+                    file
+                )
@@ -1,8 +1,26 @@
+import asyncio
+import copy
+import os
 import pygame
 
 # File Imports
 from config import Config
 from artist import Artist
+from layer_cache import LayerCache
+from profiler import FrameProfiler
+from sim_clock import SimulationClock
+from palette import PaletteScene
+from duty_cycle import DutyCycleMeter
+from parallax import ParallaxSky
+from assets import AssetManager
+from sprites import GoalMouth
+from players import PlayerField
+from crowd import Crowd
+from particles import ParticleSystem
+from scoreboard import Scoreboard
+from match_feed import MatchFeed
+from frame_pacer import FramePacer
+from floodlights import FloodLights
 
 class PygameHandler:
     """
@@ -17,6 +35,10 @@ class PygameHandler:
     config : Config
         An instance of the Config class that contains all the color options
         and day/lights settings for the game
+    layer_config : Config
+        A copy of config that the sprites, crowd, scoreboard, weather and
+        floodlights are drawn with; in indexed mode it only catches up with
+        config halfway through a fade, so they switch with the palette
     artist : Artist
         An instance of the Artist class that houses all the drawing functions
     
@@ -26,24 +48,102 @@ class PygameHandler:
         The height of the screen to initialize
     
     refresh_rate : int
-        The refresh rate of the screen
+        The most frames drawn per second (0 draws as fast as possible)
+    vsync : bool
+        Whether or not presenting a frame waits for the display's refresh
     clock : pygame.time.Clock
         A Pygame Clock object to help keep track of time
         (can be used in the future on the scoreboard to create a countdown)
+    sim_clock : SimulationClock
+        Turns real elapsed time into fixed simulation steps, so motion runs
+        at the same speed regardless of the refresh rate
+    frame_pacer : FramePacer
+        Paces frames with awaitable sleeps in the asyncio game loop, and
+        measures how late they start
+    frame_shown : asyncio.Event
+        Set every time the asyncio game loop shows a frame (None outside of it)
     
     done : bool
         A bool denoting whether or not the user has exited
+    headless : bool
+        A bool denoting whether or not the game runs without a window
     
     screen : pygame.Surface
         The main surface on which the field will be drawn
     darkness : pygame.Surface
-        A surface that will be overlaid onto the screen to imitate darkness
-        (if the lights were turned off, or it was nighttime)
+        The overlay that imitates darkness (at night with the lights off),
+        which the artist turns into a lookup table so the cached layers can
+        be darkened once instead of blending the overlay every frame
     see_through : pygame.Surface
         A surface that will house the clouds and stars
+    layer_cache : LayerCache
+        A cache of the pre-rendered static field, one per color combination
+    profiler : FrameProfiler
+        Times each stage of the game loop (shared with the artist)
+    palette_scene : PaletteScene
+        The palette-indexed sky and field, used instead of the layer cache
+        in indexed mode (None otherwise)
+    parallax : ParallaxSky
+        The scrolling cloud strips, used instead of the artist's clouds in
+        parallax mode (None otherwise)
+    assets : AssetManager
+        Loads the image assets (lazily) and packs them into an atlas
+    goal_mouth : GoalMouth
+        The animated goalie and the shots on goal
+    players : PlayerField
+        The two teams of players running on the pitch
+    crowd : Crowd
+        The spectators in the stands
+    particles : ParticleSystem
+        The rain, snow or confetti (cycled with the W key)
+    scoreboard : Scoreboard
+        The match clock and the score of the shootout
+    floodlights : FloodLights
+        The pools of light the poles throw onto the pitch at night
+    feed : MatchFeed
+        The live match data driving the scoreboard instead of the shootout
+        (None without a feed)
+
+    paused : bool
+        Whether or not all motion is paused (toggled with the space bar)
+    redraw : bool
+        Whether or not something changed that the next frame has to show,
+        even if nothing is animating
+    duty_meter : DutyCycleMeter
+        Measures how much of the time the game loop keeps the CPU busy
     """
 
-    def __init__(self, config: Config, artist: Artist):
+    # How long an idle loop waits for an event before checking in (in ms)
+    IDLE_TIMEOUT = 1000
+    # How often the idle asyncio loop polls for events (in ms)
+    IDLE_POLL = 20
+    # The command every key runs
+    KEY_COMMANDS = {
+        pygame.K_l: 'light',
+        pygame.K_d: 'day',
+        pygame.K_p: 'hud',
+        pygame.K_SPACE: 'pause',
+        pygame.K_w: 'weather'
+    }
+
+    def __init__(
+            self,
+            config: Config,
+            artist: Artist,
+            headless: bool = False,
+            profiler: FrameProfiler = None,
+            refresh_rate: int = 60,
+            vsync: bool = False,
+            indexed: bool = False,
+            paused: bool = False,
+            parallax: bool = False,
+            preload_assets: bool = False,
+            ball_count: int = 1,
+            player_count: int = 22,
+            crowd_density: float = 0.7,
+            particle_count: int = 100_000,
+            weather: str = 'off',
+            feed_source: str = None):
         """Initializes attributes of the Handler class
         
         Parameters
@@ -53,10 +153,53 @@ class PygameHandler:
             and day/lights settings for the game
         artist : Artist
             An instance of the Artist class that houses all the drawing functions
+        headless : bool
+            Whether or not to render offscreen without opening a window
+            (default False)
+        profiler : FrameProfiler
+            The profiler that times each stage of the game loop
+            (default a disabled profiler)
+        refresh_rate : int
+            The most frames drawn per second, 0 for uncapped (default 60)
+        vsync : bool
+            Whether or not to wait for the display's refresh (default False)
+        indexed : bool
+            Whether or not to render the sky and field as palette-indexed
+            layers, so toggles are palette swaps that fade (default False)
+        paused : bool
+            Whether or not all motion starts paused (default False)
+        parallax : bool
+            Whether or not to draw the clouds as scrolling strips at several
+            depths (default False)
+        preload_assets : bool
+            Whether or not to start decoding the images on a background
+            thread right away instead of on first use (default False)
+        ball_count : int
+            How many balls are shot at the goalie at once (default 1)
+        player_count : int
+            How many players run on the pitch (default 22, thousands for
+            stress testing)
+        crowd_density : float
+            The share of seats in the stands that are taken (default 0.7)
+        particle_count : int
+            How many particles the weather pool holds (default 100_000)
+        weather : str
+            The weather to start with, one of ParticleSystem.MODES
+            (default 'off')
+        feed_source : str
+            A JSONL file to follow, 'tcp://host:port' or 'unix:///path' to
+            read live match data from (default None, which shows the shootout)
         """
         # Set the config and artist passed in
         self.config: Config = config
+        self.layer_config: Config = copy.copy(config)
         self.artist: Artist = artist
+        self.headless: bool = headless
+        self.vsync: bool = vsync
+
+        # Share the profiler so the artist's draw functions get timed too
+        self.profiler: FrameProfiler = profiler or FrameProfiler()
+        self.artist.profiler = self.profiler
 
         # Initialize the Pygame module
         self.init_pygame()
@@ -66,18 +209,41 @@ class PygameHandler:
         self.height: int = 600
 
         # Create the background timer
-        self.create_timer()
+        self.create_timer(refresh_rate)
 
         # Create the necessary surfaces
         self.create_display(self.width, self.height) # The main screen
         self.create_darkness() # A darkness overlay
         self.create_see_through() # A see-through overlay
+        self.create_layer_cache() # The pre-rendered static field
+        self.create_palette_scene(indexed) # The palette-indexed scene
+        self.create_parallax(parallax) # The parallax cloud strips
+        self.create_assets(preload_assets) # The image assets
+        self.create_goal_mouth(ball_count) # The goalie and the balls
+        self.create_players(player_count) # The players on the pitch
+        self.create_crowd(crowd_density) # The spectators in the stands
+        self.create_particles(particle_count, weather) # The weather
+        self.create_scoreboard() # The match clock and the score
+        self.create_floodlights() # The pools of light at night
+        self.create_feed(feed_source) # The live match data
 
         # Whether or not the game is done
         self.done: bool = False
+
+        # When nothing moves, the loop sleeps until something changes
+        self.paused: bool = paused
+        self.redraw: bool = True
+        self.duty_meter: DutyCycleMeter = DutyCycleMeter()
     
     def init_pygame(self) -> None:
-        """Quits the Pygame instance by simply calling .init()"""
+        """
+        Initializes the Pygame instance by simply calling .init()
+
+        When running headless, SDL's dummy video driver is selected first so
+        no window (or display server) is needed
+        """
+        if self.headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
         pygame.init()
 
     def create_display(
@@ -96,28 +262,39 @@ class PygameHandler:
             The height of the screen
 
         """
-        self.screen = pygame.display.set_mode((width, height))
+        # VSync is only available on scaled (renderer-backed) displays
+        if self.vsync and not self.headless:
+            self.screen: pygame.Surface = pygame.display.set_mode(
+                                                            (width, height),
+                                                            pygame.SCALED,
+                                                            vsync=1
+                                                        )
+        else:
+            self.screen: pygame.Surface = pygame.display.set_mode(
+                                                            (width, height)
+                                                        )
         pygame.display.set_caption("Major League Soccer")
 
-    def create_timer(self) -> None:
+    def create_timer(self, refresh_rate: int = 60) -> None:
         """
         Creates a timer using the Pygame.time.Clock object which will be used
-        to keep track of time (or to create a countdown in the future)
+        to keep track of time (or to create a countdown in the future), and
+        the simulation clock that paces everything that moves
 
         Parameters
         ----------
-        clock : pygame.time.Clock
-            A Pygame Clock object to help keep track of time
-            (can be used in the future on the scoreboard to create a countdown)
         refresh_rate : int
-            The refresh rate of the screen
+            The most frames drawn per second, 0 for uncapped (default 60)
         """
         self.clock: pygame.time.Clock = pygame.time.Clock()
-        self.refresh_rate: int = 60
+        self.refresh_rate: int = refresh_rate
+        self.sim_clock: SimulationClock = SimulationClock()
+        self.frame_pacer: FramePacer = FramePacer(refresh_rate)
+        self.frame_shown: asyncio.Event = None
     
     def create_darkness(self) -> None:
         """
-        Creates a surface that will be overlaid onto the screen to create darkness.
+        Creates the darkness overlay and records how it darkens every color.
 
         Parameters
         ----------
@@ -130,6 +307,7 @@ class PygameHandler:
                                                         self.height)
                                                     )
         self.artist.config_darkness(self.darkness)
+        self.artist.create_darkness_lut(self.darkness)
     
     def create_see_through(self) -> None:
         """
@@ -141,16 +319,192 @@ class PygameHandler:
                                                         )
         self.artist.config_see_through(self.see_through)
     
-    def handle_events(self) -> None:
+    def create_layer_cache(self) -> None:
+        """
+        Creates the cache that holds the pre-rendered static field layers.
+        """
+        self.layer_cache: LayerCache = LayerCache(
+                                                    self.artist,
+                                                    self.width,
+                                                    self.height
+                                                )
+
+    def create_palette_scene(self, indexed: bool) -> None:
+        """
+        Creates the palette-indexed scene when running in indexed mode
+
+        Parameters
+        ----------
+        indexed : bool
+            Whether or not to run in indexed mode
+        """
+        self.palette_scene: PaletteScene = None
+        if indexed:
+            self.palette_scene = PaletteScene(
+                                                self.artist,
+                                                self.width,
+                                                self.height,
+                                                self.config
+                                            )
+
+    def create_parallax(self, parallax: bool) -> None:
+        """
+        Creates the parallax cloud strips when running in parallax mode
+
+        Parameters
+        ----------
+        parallax : bool
+            Whether or not to run in parallax mode
+        """
+        self.parallax: ParallaxSky = None
+        if parallax:
+            self.parallax = ParallaxSky(
+                                            self.artist,
+                                            len(self.artist.clouds),
+                                            self.see_through.get_height()
+                                        )
+
+    def create_assets(self, preload: bool) -> None:
+        """
+        Creates the asset manager, which loads nothing until it's used
+
+        Parameters
+        ----------
+        preload : bool
+            Whether or not to start decoding the images in the background
+        """
+        self.assets: AssetManager = AssetManager()
+        if preload:
+            self.assets.preload()
+
+    def create_goal_mouth(self, ball_count: int) -> None:
+        """
+        Creates the animated goalie and the shots on goal
+
+        Parameters
+        ----------
+        ball_count : int
+            How many balls are shot at the goalie at once
+        """
+        self.goal_mouth: GoalMouth = GoalMouth(
+                                                self.artist,
+                                                self.assets,
+                                                ball_count
+                                            )
+
+    def create_players(self, player_count: int) -> None:
+        """
+        Creates the players on the pitch
+
+        Parameters
+        ----------
+        player_count : int
+            How many players run on the pitch
+        """
+        self.players: PlayerField = PlayerField(self.artist, player_count)
+
+    def create_crowd(self, density: float) -> None:
+        """
+        Seats the spectators in the stands
+
+        Parameters
+        ----------
+        density : float
+            The share of seats that are taken
+        """
+        self.crowd: Crowd = Crowd(self.artist, density)
+
+    def create_particles(self, particle_count: int, weather: str) -> None:
+        """
+        Allocates the particle pool for the weather
+
+        Parameters
+        ----------
+        particle_count : int
+            How many particles the pool holds
+        weather : str
+            The weather to start with
+        """
+        self.particles: ParticleSystem = ParticleSystem(
+                                                        self.artist,
+                                                        particle_count,
+                                                        (self.width, self.height),
+                                                        weather
+                                                    )
+
+    def create_scoreboard(self) -> None:
+        """
+        Creates the scoreboard, whose clock runs on simulated time
+        """
+        self.scoreboard: Scoreboard = Scoreboard(
+                                                    self.artist,
+                                                    self.sim_clock.step_seconds
+                                                )
+
+    def create_floodlights(self) -> None:
+        """
+        Creates the floodlights, whose light map is only worked out the
+        first time they're switched on at night
+        """
+        self.floodlights: FloodLights = FloodLights()
+
+    def create_feed(self, feed_source: str) -> None:
+        """
+        Creates the reader of the live match data, if any
+
+        The game loop starts reading it, on a background thread or as a
+        coroutine of the asyncio game loop
+
+        Parameters
+        ----------
+        feed_source : str
+            Where the match data comes from (None for no feed)
+        """
+        self.feed: MatchFeed = None
+        if feed_source is not None:
+            self.feed = MatchFeed(feed_source)
+
+    def handle_events(self, timeout: int = None) -> None:
         """
         Handles all events in the Pygame event queue
+
+        Parameters
+        ----------
+        timeout : int
+            If given, block for up to this many milliseconds until an event
+            arrives instead of returning right away (default None)
         """
+        events = pygame.event.get()
+        if timeout is not None and not events:
+            # Sleep until an event arrives or the timeout runs out
+            event = pygame.event.wait(timeout)
+            if event.type == pygame.NOEVENT:
+                self.handle_idle_timeout()
+            else:
+                events = [event] + pygame.event.get()
+
         # The general Pygame event handling method
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT: # If the user is quitting
                 self.done = True # We are done
             elif event.type == pygame.KEYDOWN: # If a key is pressed
                 self.handle_key_events(event) # Delegate to a different function
+            elif event.type == pygame.WINDOWEXPOSED: # If the window was covered
+                self.artist.dirty_rects.mark_full()
+                self.redraw = True
+            elif event.type == MatchFeed.WAKE_EVENT: # If match data arrived
+                self.redraw = True
+
+    def handle_idle_timeout(self) -> None:
+        """
+        Handles an idle wait running out without any event
+
+        Only the HUD changes with time while idle, so it's redrawn to show
+        the duty cycle falling
+        """
+        if self.profiler.show_hud:
+            self.profiler.refresh_hud()
+            self.redraw = True
 
     def handle_key_events(self, event: pygame.event.Event) -> None:
         """
@@ -161,75 +515,431 @@ class PygameHandler:
         event: pygame.event.Event
             A keyboard-press event that will be analyzed in the function
         """
-        # If the key is the L key
-        if event.key == pygame.K_l:
+        # Keys without a command (Shift, the arrows...) change nothing
+        command = self.KEY_COMMANDS.get(event.key)
+        if command is not None:
+            self.run_command(command)
+
+    def run_command(self, command: str) -> None:
+        """
+        Runs a toggle, whether it came from a key or a control endpoint
+
+        Parameters
+        ----------
+        command : str
+            One of the KEY_COMMANDS values
+        """
+        # If the command is to switch the lights
+        if command == 'light':
             self.config.switch_light() # Turn the lights off
-        # If the key is the D key
-        elif event.key == pygame.K_d:
+        # If the command is to switch between day and night
+        elif command == 'day':
             self.config.switch_day() # Switch whether it's day or night
+        # If the command is to toggle the HUD
+        elif command == 'hud':
+            self.profiler.toggle_hud() # Show or hide the profiler's HUD
+        # If the command is to pause
+        elif command == 'pause':
+            self.paused = not self.paused # Pause or resume all motion
+        # If the command is to change the weather
+        elif command == 'weather':
+            self.particles.next_mode() # Switch to the next weather
+
+        # Any toggle repaints the whole screen
+        self.artist.dirty_rects.mark_full()
+        self.redraw = True
+
+        # In indexed mode, toggles fade the palette instead
+        if self.palette_scene is not None:
+            self.palette_scene.switch_to(self.config, PaletteScene.FADE_STEPS)
+
+        # The dynamic layers switch at once, or halfway through the fade
+        if self.palette_scene is None or self.palette_scene.halfway:
+            self.sync_layers()
+
+    def sync_layers(self) -> None:
+        """
+        Lets the dynamic layers catch up with the Config's day and lights
+        """
+        self.layer_config = copy.copy(self.config)
 
     def clock_tick(self) -> None:
         """
         Handles frame rate of the game
+
+        A refresh rate of 0 doesn't wait at all (only vsync, if enabled, does)
         """
         self.clock.tick(self.refresh_rate)
 
-    def game_loop(self) -> None:
+    def update_simulation(self, elapsed: float = None) -> None:
         """
-        The main game loop that calls all the necessary functions to run the game.
+        Runs as many fixed simulation steps as the elapsed time calls for
+
+        Parameters
+        ----------
+        elapsed : float
+            The simulated time to advance by, in seconds
+            (default the real time since the last update)
         """
-        # While the user has not exited
-        while not self.done:
-            # Handle any events if necessary (key presses, exiting)
-            self.handle_events()
+        if elapsed is None:
+            steps = self.sim_clock.tick()
+        else:
+            steps = self.sim_clock.advance(elapsed)
+
+        for _ in range(steps):
+            self.step_simulation()
+
+    def step_simulation(self) -> None:
+        """
+        Advances everything that moves by a single fixed step
+        """
+        start = self.profiler.start()
+        # Move the clouds (or scroll the parallax strips) unless they're paused
+        if not self.paused:
+            if self.parallax is not None:
+                self.parallax.move()
+            else:
+                self.artist.move_clouds()
+        self.profiler.stop('move_clouds', start)
 
-            # Maintain the see-through layer
-            self.screen.fill(self.config.sky_color)
-            self.artist.config_see_through(self.see_through)
+        # Move the goalie and the balls
+        start = self.profiler.start()
+        if not self.paused:
+            self.goal_mouth.step()
+        self.profiler.stop('move_sprites', start)
 
-            # If it's nighttime, draw the stars
-            if not self.config.day:
-                self.artist.draw_stars(self.screen)
+        # Run the match clock and keep the score (a live feed keeps it instead)
+        if not self.paused:
+            self.scoreboard.step()
+            if self.feed is None:
+                self.scoreboard.set_score(*self.goal_mouth.goals)
 
-            # Maintain daytime or nighttime by drawing the sun or moon
-            self.artist.draw_sun_or_moon(
-                self.screen, 
-                self.config.day, 
-                self.config.sky_color
-            )
+        # Move the players
+        start = self.profiler.start()
+        if not self.paused:
+            self.players.step()
+        self.profiler.stop('move_players', start)
+
+        # Move the wave and the cheers
+        start = self.profiler.start()
+        if not self.paused:
+            self.crowd.step()
+        self.profiler.stop('move_crowd', start)
+
+        # Move the rain, snow or confetti
+        start = self.profiler.start()
+        if not self.paused:
+            self.particles.step()
+        self.profiler.stop('move_particles', start)
 
-            # Move the clouds
-            self.artist.move_clouds()
-            # Draw the moved clouds
+        # Advance any running day/night fade, switching the dynamic layers
+        # once it's halfway
+        if self.palette_scene is not None:
+            self.palette_scene.step()
+            if self.palette_scene.halfway:
+                self.sync_layers()
+
+    def render_sky(self) -> None:
+        """
+        Draws the sky, the stars and the sun or moon onto the screen
+        """
+        profiler = self.profiler
+
+        # Maintain the see-through layer
+        start = profiler.start()
+        self.artist.config_see_through(self.see_through)
+
+        # In indexed mode, the whole sky is one converted layer
+        if self.palette_scene is not None:
+            self.palette_scene.draw_sky(self.screen)
+            profiler.stop('sky', start)
+            return
+
+        # In the dark, the darkened sky is one cached layer
+        if self.config.dark:
+            self.screen.blit(self.layer_cache.get_sky(self.config), (0, 0))
+            profiler.stop('sky', start)
+            return
+
+        self.screen.fill(self.config.sky_color)
+        profiler.stop('sky', start)
+
+        # If it's nighttime, draw the stars
+        start = profiler.start()
+        if not self.config.day:
+            self.artist.draw_stars(self.screen)
+        profiler.stop('draw_stars', start)
+
+        # Maintain daytime or nighttime by drawing the sun or moon
+        start = profiler.start()
+        self.artist.draw_sun_or_moon(
+            self.screen, 
+            self.config.day, 
+            self.config.sky_color
+        )
+        profiler.stop('draw_sun_or_moon', start)
+
+    def render_frame(self) -> None:
+        """
+        Draws a complete frame onto the screen surface without presenting it
+        """
+        profiler = self.profiler
+
+        # Draw the sky, the stars and the sun or moon
+        self.render_sky()
+
+        # Draw the moved clouds, extrapolated to the time between steps
+        # (paused clouds stay exactly where they are)
+        start = profiler.start()
+        alpha = 0.0 if self.paused else self.sim_clock.alpha
+        if self.parallax is not None:
+            self.parallax.draw(
+                self.screen,
+                self.see_through,
+                self.cloud_color,
+                alpha
+            )
+        else:
             self.artist.draw_clouds(
                 self.screen, 
                 self.see_through, 
-                self.config.cloud_color
+                self.cloud_color,
+                -self.artist.CLOUD_SPEED * alpha
             )
+        profiler.stop('draw_clouds', start)
 
-            # Maintain the field colors by redrawing the entire field
-            self.artist.draw_field(
-                self.screen, 
-                self.config.field_color, 
-                self.config.stripe_color, 
-                self.config.light_color
-            )
+        # Draw the rain, snow or confetti between the sky and the field
+        start = profiler.start()
+        self.particles.draw(self.screen, self.layer_config.dark)
+        profiler.stop('draw_particles', start)
 
-            # Check if the darkness layer should be added
-            self.artist.check_darkness(
-                self.config.day, 
-                self.config.light_on, 
-                self.screen, 
-                self.darkness
-            ) 
+        # Draw the field from the cached layer for the current colors
+        # (the darkness is already baked into it at night with the lights off)
+        start = profiler.start()
+        if self.palette_scene is not None:
+            self.palette_scene.draw_field(self.screen)
+        else:
+            self.layer_cache.draw_field(self.screen, self.config)
+        profiler.stop('draw_field', start)
+
+        # Fold everything the live feed sent since the last frame into one update
+        if self.feed is not None:
+            start = profiler.start()
+            self.feed.apply(self.scoreboard)
+            profiler.stop('match_feed', start)
+
+        # Place the scoreboard, redrawing only the characters that changed
+        start = profiler.start()
+        self.scoreboard.draw(self.screen, self.layer_config.dark)
+        profiler.stop('scoreboard', start)
+
+        # Write the crowd into the stands
+        start = profiler.start()
+        self.crowd.draw(self.screen, self.layer_config.dark)
+        profiler.stop('draw_crowd', start)
+
+        # Draw the goalie and the balls on the field
+        start = profiler.start()
+        self.goal_mouth.draw(self.screen, self.layer_config.dark, alpha)
+        profiler.stop('draw_sprites', start)
+
+        # Draw the players in front of the goal
+        start = profiler.start()
+        self.players.draw(self.screen, self.layer_config.dark)
+        profiler.stop('draw_players', start)
 
-            # Update the screen and tick via refresh rate
-            self.artist.update_screen()
+        # Add the floodlights' pools of light on top of the pitch at night
+        start = profiler.start()
+        if self.layer_config.floodlit:
+            self.floodlights.draw(self.screen, self.layer_config.light_color)
+        profiler.stop('floodlights', start)
+
+        # Draw the profiler's HUD on top of everything if it's shown
+        hud_rect = profiler.draw_hud(self.screen)
+        if hud_rect:
+            self.artist.dirty_rects.add(hud_rect)
+
+    @property
+    def animating(self) -> bool:
+        """
+        Returns whether or not anything on screen moves by itself
+
+        Returns
+        -------
+        animating : bool
+            True unless motion is paused, or while a day/night fade is running
+        """
+        if not self.paused:
+            return True
+        return self.palette_scene is not None and self.palette_scene.fading
+
+    @property
+    def cloud_color(self) -> tuple:
+        """
+        Returns the color clouds are drawn in
+
+        Returns
+        -------
+        color : tuple
+            The Config's cloud color (darkened at night with the lights off),
+            or the fading one in indexed mode
+        """
+        if self.palette_scene is not None:
+            return self.palette_scene.cloud_color
+        if self.config.dark:
+            return self.artist.darken_color(self.config.cloud_color)
+        return self.config.cloud_color
+
+    def game_loop(self) -> None:
+        """
+        The main game loop that calls all the necessary functions to run the game.
+
+        When nothing is animating and nothing changed, the loop blocks waiting
+        for events instead of redrawing the same frame over and over
+        """
+        if self.feed is not None:
+            self.feed.start()
+
+        # While the user has not exited
+        while not self.done:
+            if not (self.animating or self.redraw):
+                self.wait_idle()
+                continue
+
+            self.run_frame()
+
+            # Tick via refresh rate
             self.clock_tick()
+            self.sample_duty_cycle()
 
         # The user has exited the screen, so quit the Pygame instance
         self.quit()
 
+    async def game_loop_async(self, *coroutines) -> None:
+        """
+        The game loop as a coroutine, sharing the event loop with others.
+
+        Frames are paced by awaiting the frame pacer instead of blocking in
+        clock.tick, and an idle loop polls for events between short sleeps
+        instead of blocking in pygame.event.wait, so the live feed and any
+        given coroutines (writers, control endpoints) run on the same thread
+        next to the renderer. They are cancelled once the game is done.
+
+        Parameters
+        ----------
+        *coroutines : Coroutine
+            Coroutines to run next to the game loop
+        """
+        tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+        if self.feed is not None:
+            tasks.append(asyncio.create_task(self.feed.run_async()))
+        self.frame_shown = asyncio.Event()
+
+        try:
+            # While the user has not exited
+            while not self.done:
+                if not (self.animating or self.redraw):
+                    await self.wait_idle_async()
+                    continue
+
+                self.run_frame()
+
+                # Let the coroutines waiting for a frame know it's shown
+                self.frame_shown.set()
+                self.frame_shown = asyncio.Event()
+
+                # Sleep until the next frame is due
+                await self.frame_pacer.wait()
+                self.sample_duty_cycle()
+                self.profiler.set_gauge('late frames', self.frame_pacer.late_share)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+            # The user has exited the screen, so quit the Pygame instance
+            self.quit()
+
+    async def next_frame(self) -> None:
+        """
+        Waits until the asyncio game loop shows its next frame
+        """
+        await self.frame_shown.wait()
+
+    def run_frame(self) -> None:
+        """
+        Handles the events, then simulates, draws and shows a single frame
+        """
+        profiler = self.profiler
+        profiler.begin_frame()
+
+        # Handle any events if necessary (key presses, exiting)
+        start = profiler.start()
+        self.handle_events()
+        profiler.stop('handle_events', start)
+
+        # Move everything by the time that passed, then draw the new frame
+        self.update_simulation()
+        self.render_frame()
+
+        # Update the screen
+        start = profiler.start()
+        self.artist.update_screen()
+        profiler.stop('update_screen', start)
+        if self.feed is not None:
+            self.feed.mark_shown()
+
+        # The frame is over once it's shown (the wait is not part of it)
+        profiler.end_frame()
+        # A backlog of match data is caught up on over the next frames
+        self.redraw = self.feed is not None and self.feed.pending
+
+    def wait_idle(self) -> None:
+        """
+        Sleeps until an event (or the idle timeout) wakes the loop up
+        """
+        self.handle_events(self.IDLE_TIMEOUT)
+        self.sample_duty_cycle()
+
+        # Time spent asleep shouldn't be caught up on once things move again
+        if self.animating or self.redraw:
+            self.sim_clock.reset()
+
+    async def wait_idle_async(self) -> None:
+        """
+        Polls for events between short sleeps until something wakes the
+        loop up (or the idle timeout runs out)
+        """
+        waited = 0
+        while not (self.animating or self.redraw or self.done):
+            if waited >= self.IDLE_TIMEOUT:
+                self.handle_idle_timeout()
+                break
+            await asyncio.sleep(self.IDLE_POLL / 1000)
+            waited += self.IDLE_POLL
+            self.handle_events()
+        self.sample_duty_cycle()
+
+        # Time spent asleep shouldn't be caught up on once things move again
+        if self.animating or self.redraw:
+            self.sim_clock.reset()
+            self.frame_pacer.reset()
+
+    def sample_duty_cycle(self) -> None:
+        """
+        Updates the duty cycle measurement and shows it in the HUD
+        """
+        self.duty_meter.sample()
+        self.profiler.set_gauge('cpu duty', self.duty_meter.duty_cycle)
+
     def quit(self) -> None:
-        """Quits the Pygame instance by simply calling .quit()"""
+        """
+        Quits the Pygame instance by simply calling .quit()
+
+        The profiler's per-frame trace is written out first, if one was requested,
+        and the live feed stops reading
+        """
+        if self.feed is not None:
+            self.feed.close()
+        self.profiler.export()
         pygame.quit()
\ No newline at end of file
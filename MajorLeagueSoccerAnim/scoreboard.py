@@ -0,0 +1,287 @@
+import pygame
+
+# File Imports
+from colors import Color
+from artist import Artist
+
+class GlyphCache:
+    """
+    Renders every character of a font once and hands out the result.
+
+    Text is composed by blitting cached glyphs into fixed-width cells, so
+    changing a digit costs a single small blit instead of rendering a whole
+    string. The font itself is only loaded when the first glyph is needed,
+    so creating the cache costs nothing at startup.
+
+    Attributes
+    ----------
+    size : int
+        The size of the font
+    font : pygame.font.Font
+        The font glyphs are rendered with (None until it's first needed)
+    glyphs : dict[tuple, pygame.Surface]
+        The rendered glyphs, by (character, color)
+    cell : tuple
+        The (width, height) of a cell (None until the font is loaded)
+    """
+
+    def __init__(self, size: int):
+        """
+        Creates an empty cache without loading the font
+
+        Parameters
+        ----------
+        size : int
+            The size of the font
+        """
+        self.size: int = size
+        self.font: pygame.font.Font = None
+        self.glyphs: dict[tuple, pygame.Surface] = {}
+        self.cell: tuple = None
+
+    def load_font(self) -> pygame.font.Font:
+        """
+        Returns the font, loading it the first time
+
+        pygame's bundled default font is used, so no system fonts are
+        searched
+
+        Returns
+        -------
+        font : pygame.font.Font
+            The font glyphs are rendered with
+        """
+        if self.font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.font = pygame.font.Font(None, self.size)
+        return self.font
+
+    @property
+    def cell_size(self) -> tuple:
+        """
+        Returns the size of the cell every glyph is placed in
+
+        Returns
+        -------
+        size : tuple
+            The (width, height) of the widest digit
+        """
+        if self.cell is None:
+            font = self.load_font()
+            self.cell = (
+                max(font.size(digit)[0] for digit in '0123456789'),
+                font.get_height()
+            )
+        return self.cell
+
+    def get(self, character: str, color: tuple) -> pygame.Surface:
+        """
+        Returns a glyph, rendering it the first time
+
+        Parameters
+        ----------
+        character : str
+            The character to render
+        color : tuple
+            A tuple representing the (R, G, B) values of the glyph's color
+
+        Returns
+        -------
+        glyph : pygame.Surface
+            The rendered glyph
+        """
+        key = (character, color)
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            glyph = self.load_font().render(character, True, color)
+            self.glyphs[key] = glyph
+        return glyph
+
+class Scoreboard:
+    """
+    The match clock and the score, shown on the scoreboard behind the goal.
+
+    The board keeps its own surface, laid out as rows of fixed-width cells
+    that each hold one character. Every frame the new text is compared with
+    what's shown and only the cells whose character changed are cleared and
+    redrawn from the glyph cache, so the clock ticking over redraws a single
+    digit. Only those cells are reported as dirty, and nothing is reported
+    while the board stays the same.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist whose darkness table darkens the board and whose dirty
+        rect tracker the changed cells are reported to
+    step_seconds : float
+        The simulated time of a single step, in seconds
+    elapsed : float
+        The simulated match time, in seconds
+    score : tuple
+        The (home, away) score
+    glyphs : GlyphCache
+        The rendered characters
+    board : pygame.Surface
+        The board's content (None until it's first drawn)
+    shown : list[list[str]]
+        The character shown in every cell of every row
+    shown_dark : bool
+        Whether or not the board was last drawn darkened
+    """
+
+    # The inside of the scoreboard drawn by Artist.draw_scoreboard
+    RECT = pygame.Rect(304, 44, 194, 84)
+    FONT_SIZE = 40
+    # The number of cells of every row
+    CLOCK_CELLS = 5
+    SCORE_CELLS = 7
+    # The largest score that fits in its cells
+    MAX_SCORE = 999
+
+    def __init__(self, artist: Artist, step_seconds: float):
+        """
+        Creates the scoreboard without loading its font
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist whose darkness table darkens the board
+        step_seconds : float
+            The simulated time of a single step, in seconds
+        """
+        self.artist: Artist = artist
+        self.step_seconds: float = step_seconds
+        self.elapsed: float = 0.0
+        self.score: tuple = (0, 0)
+
+        self.glyphs: GlyphCache = GlyphCache(self.FONT_SIZE)
+        self.board: pygame.Surface = None
+        self.shown: list[list[str]] = [
+            [None] * self.CLOCK_CELLS,
+            [None] * self.SCORE_CELLS
+        ]
+        self.shown_dark: bool = False
+
+    def step(self) -> None:
+        """Runs the match clock by a single simulation step"""
+        self.elapsed += self.step_seconds
+
+    def set_score(self, home: int, away: int) -> None:
+        """
+        Updates the score
+
+        Parameters
+        ----------
+        home : int
+            The home team's goals
+        away : int
+            The away team's goals
+        """
+        self.score = (home, away)
+
+    @property
+    def texts(self) -> list[str]:
+        """
+        Returns the text of every row
+
+        Returns
+        -------
+        texts : list[str]
+            The clock as MM:SS (wrapping after 99 minutes) and the score
+        """
+        minutes, seconds = divmod(int(self.elapsed), 60)
+        home, away = (min(goals, self.MAX_SCORE) for goals in self.score)
+        return [
+            f"{minutes % 100:02}:{seconds:02}",
+            f"{home:>3}-{away:<3}"
+        ]
+
+    def cell_color(self, row: int, cell: int) -> tuple:
+        """
+        Returns the color of a cell
+
+        Parameters
+        ----------
+        row : int
+            The row of the cell
+        cell : int
+            The cell within the row
+
+        Returns
+        -------
+        color : tuple
+            The clock is yellow, and each score takes its team's color
+        """
+        if row == 0:
+            return Color.BRIGHT_YELLOW
+        if cell < 3:
+            return Color.RED
+        if cell > 3:
+            return Color.BLUE
+        return Color.WHITE
+
+    def cell_rect(self, row: int, cell: int) -> pygame.Rect:
+        """
+        Returns where a cell is on the board
+
+        Parameters
+        ----------
+        row : int
+            The row of the cell
+        cell : int
+            The cell within the row
+
+        Returns
+        -------
+        rect : pygame.Rect
+            The cell's region of the board surface
+        """
+        width, height = self.glyphs.cell_size
+        cells = len(self.shown[row])
+        left = (self.RECT.width - cells * width) // 2
+        top = (self.RECT.height // 2 - height) // 2 + row * self.RECT.height // 2
+        return pygame.Rect(left + cell * width, top, width, height)
+
+    def draw(self, surface: pygame.Surface, dark: bool = False) -> None:
+        """
+        Redraws the changed cells and places the board
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the board onto
+        dark : bool
+            Whether or not it's night with the lights off (default False)
+        """
+        background = Color.BLACK
+        if dark:
+            background = self.artist.darken_color(background)
+
+        # A new darkness redraws every cell
+        if self.board is None or dark != self.shown_dark:
+            self.board = pygame.Surface(self.RECT.size).convert()
+            self.board.fill(background)
+            for row in self.shown:
+                row[:] = [None] * len(row)
+            self.shown_dark = dark
+
+        for row, text in enumerate(self.texts):
+            shown = self.shown[row]
+            for cell, character in enumerate(text):
+                if shown[cell] == character:
+                    continue
+                shown[cell] = character
+
+                color = self.cell_color(row, cell)
+                if dark:
+                    color = self.artist.darken_color(color)
+                glyph = self.glyphs.get(character, color)
+
+                # Center the glyph in its cell
+                rect = self.cell_rect(row, cell)
+                self.board.fill(background, rect)
+                self.board.blit(glyph, glyph.get_rect(center=rect.center))
+                self.artist.dirty_rects.add(rect.move(self.RECT.topleft))
+
+        surface.blit(self.board, self.RECT)
@@ -0,0 +1,115 @@
+import time
+
+class SimulationClock:
+    """
+    Converts real elapsed time into a number of fixed-length simulation steps.
+
+    Everything that moves is advanced in steps of exactly `step_seconds`, no
+    matter how often frames are drawn. Leftover time is carried over to the
+    next frame, and `alpha` reports how far into the next step the clock is,
+    so rendering can extrapolate positions smoothly between steps.
+
+    Attributes
+    ----------
+    step_seconds : float
+        The length of a single simulation step, in seconds
+    max_steps : int
+        The most steps a single frame may run (so a long stall, like dragging
+        the window, doesn't make the simulation spiral trying to catch up)
+    accumulator : float
+        The real time that hasn't been turned into steps yet, in seconds
+    last_time : float
+        The time the clock was last ticked at (None before the first tick)
+    steps : int
+        The total number of steps taken so far
+    """
+
+    def __init__(self, step_rate: int = 60, max_steps: int = 10):
+        """
+        Initializes the clock
+
+        Parameters
+        ----------
+        step_rate : int
+            How many simulation steps make up a second (default 60)
+        max_steps : int
+            The most steps a single frame may run (default 10)
+        """
+        self.step_seconds: float = 1 / step_rate
+        self.max_steps: int = max_steps
+
+        self.accumulator: float = 0.0
+        self.last_time: float = None
+        self.steps: int = 0
+
+    @property
+    def alpha(self) -> float:
+        """
+        Returns how far the clock is into the next step
+
+        Returns
+        -------
+        alpha : float
+            A fraction from 0 (just stepped) up to 1 (about to step)
+        """
+        return self.accumulator / self.step_seconds
+
+    @property
+    def sim_time(self) -> float:
+        """
+        Returns how much simulated time has passed
+
+        Returns
+        -------
+        sim_time : float
+            The number of simulated seconds
+        """
+        return self.steps * self.step_seconds
+
+    def advance(self, elapsed: float) -> int:
+        """
+        Adds elapsed time to the clock and returns how many steps to run
+
+        Parameters
+        ----------
+        elapsed : float
+            The time that passed since the last call, in seconds
+
+        Returns
+        -------
+        steps : int
+            The number of fixed steps the simulation should run now
+        """
+        self.accumulator += elapsed
+
+        # The small epsilon keeps rounding errors from losing a whole step
+        steps = int(self.accumulator / self.step_seconds + 1e-9)
+        if steps > self.max_steps:
+            # Drop the time we can't catch up on instead of falling behind
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step_seconds
+
+        self.steps += steps
+        return steps
+
+    def tick(self) -> int:
+        """
+        Advances the clock by the real time since the last tick
+
+        Returns
+        -------
+        steps : int
+            The number of fixed steps the simulation should run now
+        """
+        now = time.perf_counter()
+        # The first tick only starts the clock
+        elapsed = 0.0 if self.last_time is None else now - self.last_time
+        self.last_time = now
+        return self.advance(elapsed)
+
+    def reset(self) -> None:
+        """Forgets the last tick, so time spent paused isn't caught up on"""
+        self.last_time = None
+        self.accumulator = 0.0
@@ -0,0 +1,648 @@
+from itertools import islice
+
+import numpy as np
+import pygame
+
+# File Imports
+from artist import Artist
+from assets import AssetManager
+from dirty_rects import DirtyRects
+
+class SpriteBatch:
+    """
+    A pooled group of sprites drawn with a single Surface.blits call.
+
+    Every slot is a [surface, rect] entry created once and updated in place,
+    so drawing a frame allocates no sprite objects no matter how many sprites
+    come and go. The active sprites are the first `count` slots. After every
+    draw, both the rects the sprites covered before and the ones they cover
+    now are reported, so only the changed regions are presented.
+
+    Attributes
+    ----------
+    entries : list[list]
+        The [surface, rect] entry of every slot
+    previous : list[pygame.Rect]
+        The rects the slots covered the last time they were reported
+    count : int
+        How many slots are drawn
+    previous_count : int
+        How many slots were drawn the last time they were reported
+    """
+
+    def __init__(self, capacity: int = 16):
+        """
+        Creates the pooled slots
+
+        Parameters
+        ----------
+        capacity : int
+            How many slots to create up front (default 16)
+        """
+        self.entries: list[list] = []
+        self.previous: list[pygame.Rect] = []
+        self.count: int = 0
+        self.previous_count: int = 0
+        self.reserve(capacity)
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Makes sure there are at least a number of slots
+
+        Parameters
+        ----------
+        capacity : int
+            The number of slots needed
+        """
+        while len(self.entries) < capacity:
+            self.entries.append([None, pygame.Rect(0, 0, 0, 0)])
+            self.previous.append(pygame.Rect(0, 0, 0, 0))
+
+    def place(
+            self,
+            index: int,
+            sprite: pygame.Surface,
+            x: float,
+            y: float) -> None:
+        """
+        Updates a slot in place
+
+        Parameters
+        ----------
+        index : int
+            The slot to update
+        sprite : pygame.Surface
+            The surface to draw in the slot
+        x : float
+            The x position of the sprite's top left corner
+        y : float
+            The y position of the sprite's top left corner
+        """
+        entry = self.entries[index]
+        entry[0] = sprite
+        rect = entry[1]
+        rect.x = x
+        rect.y = y
+        rect.size = sprite.get_size()
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """
+        Draws the active slots in one batch
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the sprites onto
+        """
+        surface.blits(islice(self.entries, self.count), False)
+
+    def report(self, dirty_rects: DirtyRects) -> None:
+        """
+        Reports where the sprites were and where they are now
+
+        Parameters
+        ----------
+        dirty_rects : DirtyRects
+            The tracker to report the changed regions to
+        """
+        previous = self.previous
+        entries = self.entries
+
+        # With lots of sprites, their bounding box is one cheaper update
+        if self.count + self.previous_count > dirty_rects.max_rects:
+            rects = [entry[1] for entry in islice(entries, self.count)]
+            rects += previous[:self.previous_count]
+            dirty_rects.add(rects[0].unionall(rects))
+        else:
+            for index in range(self.previous_count):
+                dirty_rects.add(previous[index])
+            for index in range(self.count):
+                dirty_rects.add(entries[index][1])
+
+        # Remember where every sprite is now
+        for index in range(self.count):
+            previous[index].update(entries[index][1])
+        self.previous_count = self.count
+
+class SpriteArray:
+    """
+    A group of sprites whose rects are rows of a NumPy array, drawn with a
+    single Surface.blits call.
+
+    Where SpriteBatch updates one pooled slot per sprite, which is a Python
+    call per sprite every frame, here every rect is written at once by
+    vectorized expressions and every sprite is picked from a table by index,
+    so placing thousands of sprites costs a handful of NumPy calls. Like
+    SpriteBatch, both the rects the sprites covered before and the ones they
+    cover now are reported after every draw.
+
+    Attributes
+    ----------
+    table : numpy.ndarray
+        The sprites that can be drawn, as an array of objects
+    sizes : numpy.ndarray
+        The (width, height) of every sprite of the table
+    sprites : list[pygame.Surface]
+        The sprite drawn in every slot
+    rects : numpy.ndarray
+        The (x, y, width, height) of every slot
+    previous : numpy.ndarray
+        The rects the slots covered the last time they were reported
+    count : int
+        How many slots are drawn
+    previous_count : int
+        How many slots were drawn the last time they were reported
+    """
+
+    def __init__(self, capacity: int = 16):
+        """
+        Creates the slots without any sprites to draw
+
+        Parameters
+        ----------
+        capacity : int
+            How many slots to create up front (default 16)
+        """
+        self.table: np.ndarray = np.empty(0, dtype=object)
+        self.sizes: np.ndarray = np.empty((0, 2), dtype=np.int64)
+        self.sprites: list[pygame.Surface] = []
+        self.rects: np.ndarray = np.zeros((0, 4), dtype=np.int64)
+        self.previous: np.ndarray = np.zeros((0, 4), dtype=np.int64)
+        self.count: int = 0
+        self.previous_count: int = 0
+        self.reserve(capacity)
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Makes sure there are at least a number of slots
+
+        Parameters
+        ----------
+        capacity : int
+            The number of slots needed
+        """
+        extra = capacity - len(self.rects)
+        if extra > 0:
+            self.rects = np.concatenate((self.rects, np.zeros((extra, 4), np.int64)))
+            self.previous = np.concatenate(
+                (self.previous, np.zeros((extra, 4), np.int64))
+            )
+
+    def set_table(self, sprites: list) -> None:
+        """
+        Replaces the sprites the slots pick from
+
+        Parameters
+        ----------
+        sprites : list[pygame.Surface]
+            The sprites that can be drawn
+        """
+        self.table = np.empty(len(sprites), dtype=object)
+        self.table[:] = sprites
+        self.sizes = np.array([sprite.get_size() for sprite in sprites], np.int64)
+
+    def place(
+            self,
+            indices: np.ndarray,
+            x: np.ndarray,
+            y: np.ndarray,
+            anchor: tuple = (0.0, 0.0)) -> None:
+        """
+        Fills the first slots with sprites of the table, drawn in order
+
+        Parameters
+        ----------
+        indices : numpy.ndarray
+            The index in the table of every slot's sprite
+        x : numpy.ndarray
+            The x position of every sprite's anchor
+        y : numpy.ndarray
+            The y position of every sprite's anchor
+        anchor : tuple
+            Which point of a sprite its position is, as fractions of its
+            (width, height) (default (0.0, 0.0), the top left corner)
+        """
+        count = len(indices)
+        self.reserve(count)
+        sizes = self.sizes[indices]
+        rects = self.rects[:count]
+        for axis, position in enumerate((x, y)):
+            corner = position - sizes[:, axis] * anchor[axis]
+            # Rounded half away from zero, the way pygame.Rect stores them
+            rects[:, axis] = np.trunc(corner + np.copysign(0.5, corner))
+        rects[:, 2:] = sizes
+        self.sprites = self.table[indices].tolist()
+        self.count = count
+
+    def draw(self, surface: pygame.Surface) -> None:
+        """
+        Draws the active slots in one batch
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the sprites onto
+        """
+        surface.blits(
+            zip(self.sprites, self.rects[:self.count, :2].tolist()),
+            False
+        )
+
+    def report(self, dirty_rects: DirtyRects) -> None:
+        """
+        Reports where the sprites were and where they are now
+
+        Parameters
+        ----------
+        dirty_rects : DirtyRects
+            The tracker to report the changed regions to
+        """
+        rects = np.concatenate(
+            (self.previous[:self.previous_count], self.rects[:self.count])
+        )
+
+        # With lots of sprites, their bounding box is one cheaper update
+        if len(rects) > dirty_rects.max_rects:
+            left, top = rects[:, :2].min(axis=0)
+            right, bottom = (rects[:, :2] + rects[:, 2:]).max(axis=0)
+            dirty_rects.add((left, top, right - left, bottom - top))
+        else:
+            for rect in rects.tolist():
+                dirty_rects.add(rect)
+
+        # Remember where every sprite is now
+        self.previous[:self.count] = self.rects[:self.count]
+        self.previous_count = self.count
+
+class GoalMouth:
+    """
+    An animated goalie defending the goal against a stream of shots.
+
+    The balls are simulated as NumPy arrays: every shot flies in a straight
+    line from around the penalty spot to a point in the goal mouth, spinning
+    as it goes, and is immediately replaced by a new shot when it arrives.
+    Raising the ball count turns the goal into a penalty-shootout replay wall
+    for stress testing. The goalie slides toward whichever shot arrives next,
+    leaning into the dive. Everything is drawn from the asset atlas through a
+    single SpriteBatch.
+
+    Attributes
+    ----------
+    artist : Artist
+        The Artist whose random generator places shots and whose dirty rect
+        tracker the sprites report to
+    assets : AssetManager
+        Provides the goalie and ball sprites
+    batch : SpriteBatch
+        The pooled slots the goalie (slot 0) and the balls are drawn with
+    ball_count : int
+        How many balls are in play
+    start : numpy.ndarray
+        The (x, y) position every shot started at
+    target : numpy.ndarray
+        The (x, y) position every shot is heading to
+    progress : numpy.ndarray
+        How far along every shot is, from 0 to 1
+    rate : numpy.ndarray
+        How much of its way every shot covers each step
+    spin : numpy.ndarray
+        The rotation of every ball, in steps of SPIN_ANGLE
+    goalie_x : float
+        The x position of the goalie's left edge
+    goalie_lean : int
+        How many degrees the goalie leans (positive to the left)
+    shots : int
+        How many shots reached the goal (the teams take turns shooting)
+    goals : list[int]
+        How many shots of every team beat the goalie
+    saves : int
+        How many shots the goalie stopped
+    dark_sprites : dict[tuple, pygame.Surface]
+        Darkened copies of the sprites for night with the lights off
+    ball_sprites : list[pygame.Surface]
+        The ball sprite of every spin step
+    ball_half_sizes : numpy.ndarray
+        Half the (width, height) of every spin step's sprite
+    ball_sprites_dark : bool
+        Whether or not ball_sprites are the darkened ones (None until they
+        are looked up)
+    shown_progress : numpy.ndarray
+        Preallocated room for how far along every shot is drawn
+    positions : numpy.ndarray
+        Preallocated room for where every ball sprite is drawn
+    spin_steps : numpy.ndarray
+        Preallocated room for the spin step every ball is drawn at
+    half_sizes : numpy.ndarray
+        Preallocated room for half the size of every ball sprite drawn
+    """
+
+    # The goalie stands on the goal line, between the posts
+    GOALIE_SIZE = (64, 48)
+    GOALIE_X = (320, 416)
+    GOALIE_Y = 174
+    GOALIE_SPEED = 2.0
+    # The goalie leans up to this many degrees, in steps of LEAN_STEP
+    GOALIE_LEAN = 15
+    LEAN_STEP = 5
+
+    # Shots start around the penalty spot and end inside the goal mouth
+    BALL_SIZE = (12, 12)
+    BALL_HALF_SIZE = (BALL_SIZE[0] / 2, BALL_SIZE[1] / 2)
+    SHOT_START_X = (330, 470)
+    SHOT_START_Y = (330, 420)
+    SHOT_TARGET_X = (322, 466)
+    SHOT_TARGET_Y = (146, 206)
+    SHOT_STEPS = (40, 90)
+    # Balls spin in steps of this many degrees, one step per SPIN_RATE
+    SPIN_ANGLE = 45
+    SPIN_RATE = 4
+
+    def __init__(
+            self,
+            artist: Artist,
+            assets: AssetManager,
+            ball_count: int = 1):
+        """
+        Places the goalie and the first shots
+
+        Parameters
+        ----------
+        artist : Artist
+            The Artist whose random generator places shots
+        assets : AssetManager
+            Provides the goalie and ball sprites
+        ball_count : int
+            How many balls are in play (default 1)
+        """
+        self.artist: Artist = artist
+        self.assets: AssetManager = assets
+        self.batch: SpriteBatch = SpriteBatch(ball_count + 1)
+
+        self.ball_count: int = 0
+        self.start: np.ndarray = np.empty((0, 2))
+        self.target: np.ndarray = np.empty((0, 2))
+        self.progress: np.ndarray = np.empty(0)
+        self.rate: np.ndarray = np.empty(0)
+        self.spin: np.ndarray = np.empty(0, dtype=np.int64)
+
+        self.goalie_x: float = sum(self.GOALIE_X) / 2
+        self.goalie_lean: int = 0
+        self.shots: int = 0
+        self.goals: list[int] = [0, 0]
+        self.saves: int = 0
+        self.dark_sprites: dict[tuple, pygame.Surface] = {}
+        self.ball_sprites: list[pygame.Surface] = []
+        self.ball_half_sizes: np.ndarray = np.zeros((360 // self.SPIN_ANGLE, 2))
+        self.ball_sprites_dark: bool = None
+
+        self.shown_progress: np.ndarray = np.empty(0)
+        self.positions: np.ndarray = np.empty((0, 2))
+        self.spin_steps: np.ndarray = np.empty(0, dtype=np.int64)
+        self.half_sizes: np.ndarray = np.empty((0, 2))
+
+        self.set_ball_count(ball_count)
+
+    def set_ball_count(self, ball_count: int) -> None:
+        """
+        Adds or removes balls
+
+        Removed balls keep their slots, so adding them back allocates nothing
+
+        Parameters
+        ----------
+        ball_count : int
+            How many balls should be in play
+        """
+        capacity = len(self.progress)
+        if ball_count > capacity:
+            # Grow geometrically so adding balls one by one stays cheap
+            capacity = max(ball_count, capacity * 2)
+            extra = capacity - len(self.progress)
+            self.start = np.concatenate((self.start, np.zeros((extra, 2))))
+            self.target = np.concatenate((self.target, np.zeros((extra, 2))))
+            self.progress = np.concatenate((self.progress, np.zeros(extra)))
+            self.rate = np.concatenate((self.rate, np.zeros(extra)))
+            self.spin = np.concatenate((self.spin, np.zeros(extra, np.int64)))
+            self.batch.reserve(capacity + 1)
+
+            # The room draw works in is overwritten every frame
+            self.shown_progress = np.empty(capacity)
+            self.positions = np.empty((capacity, 2))
+            self.spin_steps = np.empty(capacity, dtype=np.int64)
+            self.half_sizes = np.empty((capacity, 2))
+
+        # New balls are spread out along their way, so they don't arrive at once
+        added = slice(self.ball_count, ball_count)
+        if ball_count > self.ball_count:
+            self.spawn(added)
+            self.progress[added] = self.artist.rng.random(ball_count - self.ball_count)
+
+        self.ball_count = ball_count
+
+    def spawn(self, balls) -> None:
+        """
+        Starts new shots
+
+        Parameters
+        ----------
+        balls : slice | numpy.ndarray
+            The balls that start a new shot
+        """
+        rng = self.artist.rng
+        count = len(self.progress[balls])
+
+        self.start[balls, 0] = rng.integers(*self.SHOT_START_X, count)
+        self.start[balls, 1] = rng.integers(*self.SHOT_START_Y, count)
+        self.target[balls, 0] = rng.integers(*self.SHOT_TARGET_X, count)
+        self.target[balls, 1] = rng.integers(*self.SHOT_TARGET_Y, count)
+        self.progress[balls] = 0.0
+        self.rate[balls] = 1 / rng.integers(*self.SHOT_STEPS, count)
+
+    def step(self) -> None:
+        """Moves every shot and the goalie by a single simulation step"""
+        balls = slice(0, self.ball_count)
+        progress = self.progress[balls]
+        progress += self.rate[balls]
+        self.spin[balls] += 1
+
+        # Shots that reached the goal are scored and replaced by new ones
+        arrived = np.flatnonzero(progress >= 1)
+        if len(arrived):
+            self.score(arrived)
+            self.spawn(arrived)
+
+        self.move_goalie()
+
+    def score(self, balls: np.ndarray) -> None:
+        """
+        Counts arriving shots as saves if they hit the goalie, else as goals
+
+        Shots over the goalie's head (into the top of the net) always go in.
+        The two teams take turns shooting
+
+        Parameters
+        ----------
+        balls : numpy.ndarray
+            The balls that reached the goal
+        """
+        ball_x = self.target[balls, 0] + self.BALL_SIZE[0] / 2
+        ball_y = self.target[balls, 1] + self.BALL_SIZE[1] / 2
+        goalie_x = self.goalie_x + self.GOALIE_SIZE[0] / 2
+        saved = (
+            (np.abs(ball_x - goalie_x) < self.GOALIE_SIZE[0] / 2)
+            & (ball_y > self.GOALIE_Y)
+        )
+        team = (self.shots + np.arange(len(balls))) % 2
+        goals = np.bincount(team[~saved], minlength=2)
+
+        self.shots += len(balls)
+        self.saves += int(np.count_nonzero(saved))
+        self.goals[0] += int(goals[0])
+        self.goals[1] += int(goals[1])
+
+    def move_goalie(self) -> None:
+        """Slides the goalie toward the shot that arrives next"""
+        if not self.ball_count:
+            return
+
+        next_shot = int(np.argmax(self.progress[:self.ball_count]))
+        ball_center = self.target[next_shot, 0] + self.BALL_SIZE[0] / 2
+        wanted = min(
+            max(ball_center - self.GOALIE_SIZE[0] / 2, self.GOALIE_X[0]),
+            self.GOALIE_X[1]
+        )
+
+        move = min(max(wanted - self.goalie_x, -self.GOALIE_SPEED), self.GOALIE_SPEED)
+        self.goalie_x += move
+
+        # Lean into the dive, in whole steps so the rotated sprites get reused
+        lean = -move / self.GOALIE_SPEED * self.GOALIE_LEAN
+        self.goalie_lean = int(round(lean / self.LEAN_STEP)) * self.LEAN_STEP
+
+    def get_sprite(
+            self,
+            name: str,
+            size: tuple,
+            angle: int,
+            dark: bool) -> pygame.Surface:
+        """
+        Returns a sprite variant, darkened if needed
+
+        Parameters
+        ----------
+        name : str
+            The name of the sprite
+        size : tuple
+            The (width, height) of the sprite
+        angle : int
+            How many degrees the sprite is rotated counterclockwise
+        dark : bool
+            Whether or not it's night with the lights off
+
+        Returns
+        -------
+        sprite : pygame.Surface
+            The sprite to draw
+        """
+        sprite = self.assets.get(name, size, angle)
+        if not dark:
+            return sprite
+
+        key = (name, size, angle)
+        dark_sprite = self.dark_sprites.get(key)
+        if dark_sprite is None:
+            dark_sprite = sprite.copy()
+            self.artist.darken_surface(dark_sprite)
+            self.dark_sprites[key] = dark_sprite
+        return dark_sprite
+
+    def update_ball_sprites(self, dark: bool) -> None:
+        """
+        Looks up the ball sprite of every spin step and its size
+
+        Only a handful of spin steps exist, so this only happens when the
+        lights change, not every frame
+
+        Parameters
+        ----------
+        dark : bool
+            Whether or not it's night with the lights off
+        """
+        self.ball_sprites = [
+            self.get_sprite('ball', self.BALL_SIZE, spin * self.SPIN_ANGLE, dark)
+            for spin in range(len(self.ball_half_sizes))
+        ]
+        for spin, sprite in enumerate(self.ball_sprites):
+            width, height = sprite.get_size()
+            self.ball_half_sizes[spin] = (width / 2, height / 2)
+        self.ball_sprites_dark = dark
+
+    def draw(
+            self,
+            surface: pygame.Surface,
+            dark: bool = False,
+            alpha: float = 0.0) -> None:
+        """
+        Draws the goalie and the balls and reports what changed
+
+        Parameters
+        ----------
+        surface : pygame.Surface
+            The surface to draw the sprites onto
+        dark : bool
+            Whether or not it's night with the lights off (default False)
+        alpha : float
+            How far into the next simulation step to extrapolate the balls
+            (default 0.0)
+        """
+        batch = self.batch
+
+        goalie = self.get_sprite('goalie', self.GOALIE_SIZE, self.goalie_lean, dark)
+        # Rotating grows the sprite, so keep it centered on the same spot
+        width, height = goalie.get_size()
+        batch.place(
+            0,
+            goalie,
+            self.goalie_x + (self.GOALIE_SIZE[0] - width) / 2,
+            self.GOALIE_Y + (self.GOALIE_SIZE[1] - height) / 2
+        )
+
+        if dark != self.ball_sprites_dark:
+            self.update_ball_sprites(dark)
+
+        # Work everything out in the preallocated room, allocating no arrays
+        count = self.ball_count
+        progress = self.shown_progress[:count]
+        np.multiply(self.rate[:count], alpha, out=progress)
+        np.add(progress, self.progress[:count], out=progress)
+        np.minimum(progress, 1, out=progress)
+
+        start = self.start[:count]
+        positions = self.positions[:count]
+        np.subtract(self.target[:count], start, out=positions)
+        np.multiply(positions, progress[:, np.newaxis], out=positions)
+        np.add(positions, start, out=positions)
+
+        spin_steps = self.spin_steps[:count]
+        np.floor_divide(self.spin[:count], self.SPIN_RATE, out=spin_steps)
+        np.remainder(spin_steps, len(self.ball_sprites), out=spin_steps)
+
+        # Rotated balls are slightly larger, so center them
+        half_sizes = self.half_sizes[:count]
+        np.take(self.ball_half_sizes, spin_steps, axis=0, out=half_sizes)
+        np.add(positions, self.BALL_HALF_SIZE, out=positions)
+        np.subtract(positions, half_sizes, out=positions)
+
+        ball_sprites = self.ball_sprites
+        place = batch.place
+        for index in range(count):
+            place(
+                index + 1,
+                ball_sprites[spin_steps.item(index)],
+                positions.item(index, 0),
+                positions.item(index, 1)
+            )
+
+        batch.count = count + 1
+        batch.draw(surface)
+        batch.report(self.artist.dirty_rects)